@@ -0,0 +1,101 @@
+# Concurrency benchmark for the Autosys Incident Analytics API
+#
+# Fires parallel GET /incidents requests at a running API server while a
+# separate client polls GET /health. Health latency shows whether slow
+# queries block the event loop for everyone else.
+#
+# Usage:
+#   python autosys_incident_dashboard.py            # API on :8000
+#   python autosys_api_benchmark.py --url http://localhost:8000 --concurrency 1 10 50
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def run_level(url, params, total, concurrency):
+    """Send ``total`` requests from ``concurrency`` threads; returns latency stats in ms"""
+    local = threading.local()
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one_request(_):
+        nonlocal errors
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            ok = session.get(f"{url}/incidents", params=params, timeout=60).ok
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    # Probe the event loop with a trivial endpoint while the load runs
+    probe_latencies, stop = [], threading.Event()
+
+    def probe():
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                session.get(f"{url}/health", timeout=60)
+            except requests.RequestException:
+                pass
+            probe_latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    prober = threading.Thread(target=probe, daemon=True)
+    started = time.perf_counter()
+    prober.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": percentile(latencies, 95),
+        "health_p95_ms": percentile(probe_latencies, 95),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for the Autosys Incident Analytics API")
+    parser.add_argument("--url", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="Parallel clients")
+    parser.add_argument("--limit", type=int, default=100, help="Page size requested from /incidents")
+    parser.add_argument("--state", help="Optional state filter, to benchmark a filtered scan")
+    args = parser.parse_args()
+
+    params = {"limit": args.limit}
+    if args.state:
+        params["state"] = args.state
+
+    print(f"{'clients':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'health p95':>11} {'errors':>7}")
+    for concurrency in args.concurrency:
+        result = run_level(args.url, params, args.requests, concurrency)
+        print(f"{concurrency:>8} {result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+              f"{result['health_p95_ms']:>11.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
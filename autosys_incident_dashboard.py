@@ -1,25 +1,43 @@
 # Autosys-ServiceNow Incident Analytics Dashboard
 # Simplified version for testing
+#
+# Load-test data: python autosys_incident_dashboard.py --sample --sample-size 10000000 --seed 42 --generate-only
+#
+# Database settings (environment or .env):
+#   AUTOSYS_DATABASE_URL            default sqlite:///autosys_incidents.db
+#   AUTOSYS_DB_POOL_SIZE / AUTOSYS_DB_MAX_OVERFLOW / AUTOSYS_DB_POOL_TIMEOUT / AUTOSYS_DB_POOL_RECYCLE
+#   AUTOSYS_SQLITE_SYNCHRONOUS / AUTOSYS_SQLITE_BUSY_TIMEOUT_MS / AUTOSYS_SQLITE_MMAP_MB / AUTOSYS_SQLITE_CACHE_MB
+# Pool checkout and wait metrics: GET /metrics/db
+#
+# Incident patterns: python autosys_incident_dashboard.py --verify-patterns | --rebuild-patterns
 
 import os
 import json
-import re
+import base64
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import gradio as gr
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 import uvicorn
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, func, desc
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, func, desc, cast, case, select, true, tuple_, delete, bindparam, and_, or_, inspect
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import event, exc as sqlalchemy_exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 import requests
 from requests.auth import HTTPBasicAuth
 import threading
 import time
-import random
 import logging
 from dotenv import load_dotenv
 
@@ -31,11 +49,149 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Database Configuration
-DATABASE_URL = "sqlite:///autosys_incidents.db"
-engine = create_engine(DATABASE_URL, echo=False)
+# AUTOSYS_DATABASE_URL rather than DATABASE_URL, which belongs to the Django app
+DATABASE_URL = os.getenv("AUTOSYS_DATABASE_URL", "sqlite:///autosys_incidents.db")
+DB_POOL_SIZE = int(os.getenv("AUTOSYS_DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("AUTOSYS_DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("AUTOSYS_DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("AUTOSYS_DB_POOL_RECYCLE", "1800"))
+DB_ECHO = os.getenv("AUTOSYS_DB_ECHO", "False").lower() == "true"
+
+# Applied to every new SQLite connection: WAL lets the Gradio thread read while
+# the API writes, and busy_timeout makes writers wait instead of failing
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": os.getenv("AUTOSYS_SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("AUTOSYS_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("AUTOSYS_SQLITE_MMAP_MB", "256")) * 1024 * 1024,
+    # Negative cache_size is in KiB
+    "cache_size": -int(os.getenv("AUTOSYS_SQLITE_CACHE_MB", "64")) * 1024,
+    "temp_store": "MEMORY",
+}
+
+class PoolMetrics:
+    """Checkout counts and wait times for one connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+    def record_checkout(self, wait_ms: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self, pool) -> Dict:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_ms_total / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                pool_size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+        return stats
+
+def metered_pool_class(base):
+    """``base`` pool class that times every checkout; metrics survive pool recreation"""
+
+    class MeteredPool(base):
+        metrics = PoolMetrics()
+
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                connection = super().connect()
+            except sqlalchemy_exc.TimeoutError:
+                self.metrics.record_checkout((time.perf_counter() - started) * 1000, timed_out=True)
+                raise
+            self.metrics.record_checkout((time.perf_counter() - started) * 1000)
+            return connection
+
+    MeteredPool.__name__ = f"Metered{base.__name__}"
+    return MeteredPool
+
+def engine_options(url: str, pool_base) -> Dict:
+    """create_engine keyword arguments for ``url`` from the AUTOSYS_DB_* settings"""
+    url = make_url(url)
+    options = {"echo": DB_ECHO, "pool_pre_ping": True}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite is one connection per process; keep the dialect's default pool
+        return options
+    options.update(
+        poolclass=metered_pool_class(pool_base),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if url.get_backend_name() == "sqlite":
+        # Pooled connections move between the Gradio, threadpool and server threads
+        options["connect_args"] = {"check_same_thread": False}
+    return options
+
+def configure_engine(engine_):
+    """Count new connections and apply the SQLite pragmas to each one"""
+    sync_engine = getattr(engine_, "sync_engine", engine_)
+    metrics = getattr(sync_engine.pool, "metrics", None)
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        if metrics is not None:
+            metrics.record_connect()
+        if sync_engine.dialect.name == "sqlite":
+            cursor = dbapi_connection.cursor()
+            for pragma, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+            cursor.close()
+
+    return engine_
+
+def async_database_url(url: str) -> str:
+    """The async-driver form of a database URL: aiosqlite for SQLite, asyncpg for PostgreSQL"""
+    url = make_url(url.replace("postgres://", "postgresql://", 1))
+    async_drivers = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+    if url.get_backend_name() in async_drivers:
+        url = url.set(drivername=async_drivers[url.get_backend_name()])
+    return url.render_as_string(hide_password=False)
+
+engine = configure_engine(create_engine(DATABASE_URL, **engine_options(DATABASE_URL, QueuePool)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# The API awaits queries on this engine so they never block the event loop
+ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+async_engine = configure_engine(
+    create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool))
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+def pool_metrics() -> Dict:
+    """Checkout and wait metrics for the sync (dashboard) and async (API) pools"""
+    return {
+        name: getattr(pool, "metrics", PoolMetrics()).snapshot(pool)
+        for name, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool))
+    }
+
 # Database Models
 class AutosysIncident(Base):
     __tablename__ = "autosys_incidents"
@@ -62,128 +218,573 @@ class AutosysIncident(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
 class IncidentPattern(Base):
+    """Incidents sharing a normalized root cause, job and issue type.
+
+    Maintained incrementally by PatternDelta as incidents are written; the
+    running count and resolution sums make the average exact without
+    rescanning incidents.
+    """
     __tablename__ = "incident_patterns"
     
     id = Column(Integer, primary_key=True, index=True)
-    pattern_name = Column(String(200), unique=True)
-    root_cause_pattern = Column(String(500))
-    incident_count = Column(Integer, default=0)
+    pattern_name = Column(String(820), unique=True)
+    root_cause_pattern = Column(String(500), index=True)
+    autosys_job_name = Column(String(200))
+    issue_type = Column(String(100))
+    incident_count = Column(Integer, default=0, index=True)
+    resolved_count = Column(Integer, default=0)
+    total_resolution_hours = Column(Integer, default=0)
     first_occurrence = Column(DateTime)
     last_occurrence = Column(DateTime)
     avg_resolution_time = Column(Integer)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+class SyncState(Base):
+    """Progress of an ingestion job: its watermark and any checkpoint details (JSON)"""
+    __tablename__ = "sync_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, index=True)
+    watermark = Column(DateTime)
+    details = Column(Text)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+# Incident states that count as open
+OPEN_STATES = ['New', 'In Progress', 'On Hold']
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
+# Ingestion
+# Filled in by the classifier, so an ingested update never overwrites them
+CLASSIFIED_COLUMNS = ('issue_type', 'root_cause', 'root_cause_category')
+
+def upsert_incidents(db: Session, rows: List[Dict], preserve=CLASSIFIED_COLUMNS) -> int:
+    """Insert or update incidents keyed by incident_number, in one statement per batch.
+
+    ``rows`` must all have the same keys. Columns in ``preserve`` are written
+    on insert only. Commits, and bumps the data version, before returning.
+    """
+    if not rows:
+        return 0
+    table = AutosysIncident.__table__
+    now = datetime.now()
+    # The last write of an incident in the batch wins
+    rows = list({row['incident_number']: row for row in rows}.values())
+    rows = [{**row, 'updated_at': now} for row in rows]
+    update_columns = [name for name in rows[0] if name not in preserve and name != 'incident_number']
+    dialect = db.get_bind().dialect.name
+
+    # Pattern contributions before and after this batch
+    previous = {
+        row.incident_number: dict(row._mapping) for row in db.execute(
+            select(table.c.incident_number, *[table.c[name] for name in PATTERN_FIELDS]).where(
+                table.c.incident_number.in_([row['incident_number'] for row in rows])
+            )
+        )
+    }
+    patterns = PatternDelta()
+    for row in rows:
+        old = previous.get(row['incident_number'])
+        new = {name: row.get(name) for name in PATTERN_FIELDS} if old is None else {
+            **old, **{name: row[name] for name in update_columns if name in PATTERN_FIELDS}
+        }
+        patterns.change(old, new)
+
+    if dialect in ('sqlite', 'postgresql'):
+        insert_fn = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        stmt = insert_fn(table).values({'created_at': now})
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['incident_number'],
+            set_={name: stmt.excluded[name] for name in update_columns},
+        )
+        db.execute(stmt, rows)
+    else:
+        numbers = [row['incident_number'] for row in rows]
+        existing = set(db.execute(
+            select(table.c.incident_number).where(table.c.incident_number.in_(numbers))
+        ).scalars())
+        inserts = [{**row, 'created_at': now} for row in rows if row['incident_number'] not in existing]
+        updates = [
+            {'b_incident_number': row['incident_number'], **{name: row[name] for name in update_columns}}
+            for row in rows if row['incident_number'] in existing
+        ]
+        if inserts:
+            db.execute(table.insert(), inserts)
+        if updates:
+            db.execute(
+                table.update().where(table.c.incident_number == bindparam('b_incident_number')),
+                updates,
+            )
+
+    patterns.apply(db)
+    db.commit()
+    bump_data_version()
+    return len(rows)
+
+# Dashboard result cache
+class ResultCache:
+    """In-process cache for dashboard query results.
+
+    Entries expire after ``ttl`` seconds and are dropped as soon as the data
+    version moves; every path that writes incidents calls
+    ``bump_data_version`` after committing.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self.version = 0
+        self._entries: Dict[str, Tuple[int, float, object]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == self.version and entry[1] > time.monotonic():
+                return entry[2]
+            version = self.version
+        value = compute()
+        with self._lock:
+            # A write that landed while computing makes this result stale
+            if version == self.version:
+                self._entries[key] = (version, time.monotonic() + self.ttl, value)
+        return value
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+result_cache = ResultCache(ttl=float(os.getenv("DASHBOARD_CACHE_TTL", "30")))
+
+def bump_data_version():
+    """Invalidate cached dashboard results after incident data changes"""
+    result_cache.bump()
+
 # Sample Data Generator
 class SampleDataGenerator:
-    def __init__(self, db: Session):
+    """Bulk-generate realistic Autosys incidents for demos and load tests.
+
+    Columns are drawn with NumPy and written through SQLAlchemy Core
+    ``executemany`` one chunk (and one transaction) at a time, so memory
+    stays flat however many rows are requested. Incident numbers continue
+    from the highest existing number and never collide; pass ``seed`` for
+    a reproducible data set.
+    """
+
+    job_names = [
+        'ETL_DAILY_LOAD', 'BATCH_RECONCILIATION', 'DATA_EXPORT_JOB', 'BACKUP_DAILY',
+        'REPORT_GENERATION', 'FILE_TRANSFER_JOB', 'DATABASE_CLEANUP', 'INVOICE_PROCESSING'
+    ]
+
+    servers = [
+        'autosys-prod-01', 'autosys-prod-02', 'batch-server-03', 'etl-server-01'
+    ]
+
+    issue_types = [
+        'Job Failure', 'Job Hang/Timeout', 'Scheduling Issue', 'Dependency Issue',
+        'Resource Issue', 'Connectivity Issue'
+    ]
+
+    root_causes = {
+        'Infrastructure': ['Server Down', 'Hardware Failure', 'Network Issue', 'Disk Full'],
+        'Application': ['Application Error', 'Code Issue', 'Configuration Error'],
+        'Database': ['Database Connection Failed', 'SQL Error', 'Table Lock'],
+        'External Dependency': ['File Not Found', 'Upstream System Down', 'Third Party Issue']
+    }
+
+    priorities = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
+    open_states = OPEN_STATES
+    closed_states = ['Resolved', 'Closed']
+    severities = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
+
+    assignment_groups = [
+        'Autosys Support', 'Infrastructure Team', 'Database Team', 'Application Support'
+    ]
+
+    history_days = 90
+    closed_ratio = 0.75
+    assigned_ratio = 0.7
+
+    def __init__(self, db: Session, seed: Optional[int] = None):
         self.db = db
-    
-    def generate_sample_data(self, num_incidents: int = 100) -> int:
-        """Generate realistic sample Autosys incident data"""
-        
-        # Sample data
-        job_names = [
-            'ETL_DAILY_LOAD', 'BATCH_RECONCILIATION', 'DATA_EXPORT_JOB', 'BACKUP_DAILY',
-            'REPORT_GENERATION', 'FILE_TRANSFER_JOB', 'DATABASE_CLEANUP', 'INVOICE_PROCESSING'
-        ]
-        
-        servers = [
-            'autosys-prod-01', 'autosys-prod-02', 'batch-server-03', 'etl-server-01'
-        ]
-        
-        issue_types = [
-            'Job Failure', 'Job Hang/Timeout', 'Scheduling Issue', 'Dependency Issue',
-            'Resource Issue', 'Connectivity Issue'
-        ]
-        
-        root_causes = {
-            'Infrastructure': ['Server Down', 'Hardware Failure', 'Network Issue', 'Disk Full'],
-            'Application': ['Application Error', 'Code Issue', 'Configuration Error'],
-            'Database': ['Database Connection Failed', 'SQL Error', 'Table Lock'],
-            'External Dependency': ['File Not Found', 'Upstream System Down', 'Third Party Issue']
+        self.rng = np.random.default_rng(seed)
+
+    def _next_incident_number(self) -> int:
+        """One past the highest numeric INC number already stored"""
+        highest = self.db.query(
+            func.max(cast(func.substr(AutosysIncident.incident_number, 4), Integer))
+        ).filter(AutosysIncident.incident_number.like('INC%')).scalar()
+        return (highest or 1000000) + 1
+
+    def _build_chunk(self, size: int, first_number: int, now: datetime) -> List[Dict]:
+        """Draw ``size`` incidents column by column and return them as insert parameters"""
+        rng = self.rng
+
+        # Root cause: pick a category uniformly, then a cause within it
+        causes = [(category, cause) for category, names in self.root_causes.items() for cause in names]
+        cause_weights = np.array([1 / len(self.root_causes[category]) for category, _ in causes])
+        cause_idx = rng.choice(len(causes), size=size, p=cause_weights / cause_weights.sum())
+        cause_names = np.array([cause for _, cause in causes], dtype=object)
+        cause_categories = np.array([category for category, _ in causes], dtype=object)
+
+        job_idx = rng.integers(len(self.job_names), size=size)
+        server_idx = rng.integers(len(self.servers), size=size)
+        issue_idx = rng.integers(len(self.issue_types), size=size)
+        group_idx = rng.integers(len(self.assignment_groups), size=size)
+
+        # Times: opened within the history window, closed 1-120 hours later
+        opened_at = np.datetime64(now, 'us') - rng.integers(
+            0, self.history_days * 86400, size=size
+        ).astype('timedelta64[s]')
+        is_closed = rng.random(size) < self.closed_ratio
+        resolution_hours = rng.integers(1, 121, size=size)
+        closed_at = np.where(
+            is_closed, opened_at + resolution_hours.astype('timedelta64[h]'), np.datetime64('NaT')
+        )
+
+        states = np.where(
+            is_closed,
+            np.array(self.closed_states, dtype=object)[rng.integers(len(self.closed_states), size=size)],
+            np.array(self.open_states, dtype=object)[rng.integers(len(self.open_states), size=size)],
+        )
+        users = np.array([f"user{n}@company.com" for n in range(1, 101)], dtype=object)
+        assigned_to = np.where(
+            rng.random(size) < self.assigned_ratio, users[rng.integers(len(users), size=size)], None
+        )
+
+        # Text only depends on a few small columns, so render every combination once
+        short_descriptions = np.array(
+            [f"Autosys job {job} failed on {server}" for job in self.job_names for server in self.servers],
+            dtype=object,
+        )
+        descriptions = np.array([
+            f"The Autosys job {job} running on server {server} encountered {cause.lower()}. "
+            f"This resulted in {issue.lower()}."
+            for job in self.job_names for server in self.servers
+            for _, cause in causes for issue in self.issue_types
+        ], dtype=object)
+        work_notes = np.array([
+            f"Root cause confirmed: {cause}. Working on resolution with {group}."
+            for _, cause in causes for group in self.assignment_groups
+        ], dtype=object)
+
+        job_server = job_idx * len(self.servers) + server_idx
+        columns = {
+            'incident_number': [f"INC{n:07d}" for n in range(first_number, first_number + size)],
+            'autosys_job_name': np.array(self.job_names, dtype=object)[job_idx],
+            'autosys_server': np.array(self.servers, dtype=object)[server_idx],
+            'issue_type': np.array(self.issue_types, dtype=object)[issue_idx],
+            'root_cause': cause_names[cause_idx],
+            'root_cause_category': cause_categories[cause_idx],
+            'severity': np.array(self.severities, dtype=object)[rng.integers(len(self.severities), size=size)],
+            'priority': np.array(self.priorities, dtype=object)[rng.integers(len(self.priorities), size=size)],
+            'state': states,
+            'assigned_to': assigned_to,
+            'assignment_group': np.array(self.assignment_groups, dtype=object)[group_idx],
+            'opened_at': opened_at.tolist(),
+            'closed_at': closed_at.tolist(),
+            'resolution_time_hours': np.where(is_closed, resolution_hours, None),
+            'short_description': short_descriptions[job_server],
+            'description': descriptions[
+                (job_server * len(causes) + cause_idx) * len(self.issue_types) + issue_idx
+            ],
+            'work_notes': work_notes[cause_idx * len(self.assignment_groups) + group_idx],
         }
-        
-        priorities = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
-        states = ['New', 'In Progress', 'On Hold', 'Resolved', 'Closed']
-        severities = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
-        
-        assignment_groups = [
-            'Autosys Support', 'Infrastructure Team', 'Database Team', 'Application Support'
+        keys = list(columns) + ['created_at', 'updated_at']
+        values = [
+            column.tolist() if isinstance(column, np.ndarray) else column
+            for column in columns.values()
         ]
-        
+        return [dict(zip(keys, (*row, now, now))) for row in zip(*values)]
+
+    def generate_sample_data(self, num_incidents: int = 100, chunk_size: int = 50000) -> int:
+        """Generate realistic sample Autosys incident data"""
+        insert_stmt = AutosysIncident.__table__.insert()
+        next_number = self._next_incident_number()
+        now = datetime.now()
         created_count = 0
-        
-        for i in range(num_incidents):
-            # Generate random dates within last 90 days
-            opened_date = datetime.now() - timedelta(days=random.randint(0, 90))
-            
-            # Random chance of being closed
-            is_closed = random.choice([True, True, True, False])
-            closed_date = None
-            resolution_hours = None
-            
-            if is_closed:
-                closed_date = opened_date + timedelta(hours=random.randint(1, 120))
-                resolution_hours = int((closed_date - opened_date).total_seconds() / 3600)
-            
-            # Select random data
-            job_name = random.choice(job_names)
-            server = random.choice(servers)
-            issue_type = random.choice(issue_types)
-            
-            # Select root cause category and specific cause
-            root_cause_category = random.choice(list(root_causes.keys()))
-            root_cause = random.choice(root_causes[root_cause_category])
-            
-            priority = random.choice(priorities)
-            state = random.choice(['Resolved', 'Closed']) if is_closed else random.choice(['New', 'In Progress', 'On Hold'])
-            severity = random.choice(severities)
-            assignment_group = random.choice(assignment_groups)
-            assigned_to = f"user{random.randint(1, 100)}@company.com" if random.random() > 0.3 else None
-            
-            # Generate descriptions
-            short_description = f"Autosys job {job_name} failed on {server}"
-            description = f"The Autosys job {job_name} running on server {server} encountered {root_cause.lower()}. This resulted in {issue_type.lower()}."
-            work_notes = f"Root cause confirmed: {root_cause}. Working on resolution with {assignment_group}."
-            
-            # Create incident
-            incident = AutosysIncident(
-                incident_number=f"INC{random.randint(1000000, 9999999)}",
-                autosys_job_name=job_name,
-                autosys_server=server,
-                issue_type=issue_type,
-                root_cause=root_cause,
-                root_cause_category=root_cause_category,
-                severity=severity,
-                priority=priority,
-                state=state,
-                assigned_to=assigned_to,
-                assignment_group=assignment_group,
-                opened_at=opened_date,
-                closed_at=closed_date,
-                resolution_time_hours=resolution_hours,
-                short_description=short_description,
-                description=description,
-                work_notes=work_notes
-            )
-            
-            self.db.add(incident)
-            created_count += 1
-        
-        self.db.commit()
+
+        while created_count < num_incidents:
+            size = min(chunk_size, num_incidents - created_count)
+            rows = self._build_chunk(size, next_number + created_count, now)
+            self.db.connection().execute(insert_stmt, rows)
+            patterns = PatternDelta()
+            patterns.add_frame(pd.DataFrame(rows, columns=PATTERN_FIELDS))
+            patterns.apply(self.db)
+            self.db.commit()
+            bump_data_version()
+            created_count += size
+            logger.info(f"Inserted {created_count}/{num_incidents} sample incidents")
+
         return created_count
     
     def clear_all_data(self):
-        """Clear all existing data from tables"""
+        """Clear all existing data from tables.
+
+        Sync watermarks and backfill checkpoints go too, so the next
+        ServiceNow sync imports everything again instead of resuming.
+        """
         self.db.query(IncidentPattern).delete()
         self.db.query(AutosysIncident).delete()
+        self.db.query(SyncState).delete()
         self.db.commit()
+        bump_data_version()
         return "All data cleared successfully"
 
+# Pattern Mining
+PATTERN_FIELDS = ['root_cause', 'autosys_job_name', 'issue_type', 'opened_at', 'resolution_time_hours']
+NO_VALUE = 'N/A'
+
+def pattern_key(root_cause: Optional[str], job_name: Optional[str], issue_type: Optional[str]) -> Tuple[str, str, str]:
+    """(normalized root cause, job, issue type); the same normalization as pattern_key_columns"""
+    return ((root_cause or 'unknown').strip().lower(), job_name or NO_VALUE, issue_type or NO_VALUE)
+
+def pattern_key_columns():
+    """pattern_key as SQL expressions over AutosysIncident"""
+    return (
+        func.lower(func.trim(func.coalesce(AutosysIncident.root_cause, 'unknown'))),
+        func.coalesce(AutosysIncident.autosys_job_name, NO_VALUE),
+        func.coalesce(AutosysIncident.issue_type, NO_VALUE),
+    )
+
+def pattern_name(key: Tuple[str, str, str]) -> str:
+    return " | ".join(key)
+
+class PatternDelta:
+    """Net change to IncidentPattern rows from a batch of incident writes.
+
+    ``apply`` runs in the caller's transaction, so patterns commit together
+    with the incidents that changed them.
+    """
+
+    def __init__(self):
+        self.groups: Dict[Tuple[str, str, str], Dict] = {}
+
+    def _group(self, key):
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {
+                'count': 0, 'resolved': 0, 'hours': 0, 'first': None, 'last': None, 'shrunk': False
+            }
+        return group
+
+    def add(self, incident: Dict, sign: int = 1):
+        group = self._group(pattern_key(
+            incident.get('root_cause'), incident.get('autosys_job_name'), incident.get('issue_type')
+        ))
+        group['count'] += sign
+        hours = incident.get('resolution_time_hours')
+        if hours is not None:
+            group['resolved'] += sign
+            group['hours'] += sign * int(hours)
+        opened_at = incident.get('opened_at')
+        if sign < 0:
+            # A running min/max cannot be un-applied; recompute it in apply()
+            group['shrunk'] = True
+        elif opened_at is not None:
+            group['first'] = opened_at if group['first'] is None else min(group['first'], opened_at)
+            group['last'] = opened_at if group['last'] is None else max(group['last'], opened_at)
+
+    def remove(self, incident: Dict):
+        self.add(incident, sign=-1)
+
+    def change(self, old: Optional[Dict], new: Dict):
+        """Move one incident's contribution from its old state to its new one"""
+        if old is None:
+            self.add(new)
+            return
+        old_key = pattern_key(old.get('root_cause'), old.get('autosys_job_name'), old.get('issue_type'))
+        new_key = pattern_key(new.get('root_cause'), new.get('autosys_job_name'), new.get('issue_type'))
+        if old_key == new_key and old.get('opened_at') == new.get('opened_at'):
+            # Same pattern (e.g. the incident was closed): only the resolution sums move
+            old_hours, new_hours = old.get('resolution_time_hours'), new.get('resolution_time_hours')
+            group = self._group(new_key)
+            group['resolved'] += (new_hours is not None) - (old_hours is not None)
+            group['hours'] += int(new_hours or 0) - int(old_hours or 0)
+            return
+        self.remove(old)
+        self.add(new)
+
+    def add_frame(self, df: pd.DataFrame):
+        """Add many new incidents (PATTERN_FIELDS columns) with one groupby"""
+        if df.empty:
+            return
+        keys = pd.DataFrame({
+            'root_cause': df['root_cause'].fillna('unknown').str.strip().str.lower(),
+            'job': df['autosys_job_name'].fillna(NO_VALUE),
+            'issue': df['issue_type'].fillna(NO_VALUE),
+        })
+        hours = pd.to_numeric(df['resolution_time_hours'], errors='coerce')
+        opened_at = pd.to_datetime(df['opened_at'])
+        grouped = pd.DataFrame({
+            'hours': hours, 'opened_at': opened_at, **keys
+        }).groupby(['root_cause', 'job', 'issue']).agg(
+            count=('opened_at', 'size'),
+            resolved=('hours', 'count'),
+            hours=('hours', 'sum'),
+            first=('opened_at', 'min'),
+            last=('opened_at', 'max'),
+        )
+        for key, row in zip(grouped.index, grouped.itertuples(index=False)):
+            group = self._group(key)
+            group['count'] += int(row.count)
+            group['resolved'] += int(row.resolved)
+            group['hours'] += int(row.hours)
+            for bound, value, pick in (('first', row.first, min), ('last', row.last, max)):
+                if not pd.isna(value):
+                    value = value.to_pydatetime()
+                    group[bound] = value if group[bound] is None else pick(group[bound], value)
+
+    def apply(self, db: Session):
+        changed = {
+            key: group for key, group in self.groups.items()
+            if group['count'] or group['resolved'] or group['hours'] or group['shrunk']
+        }
+        if not changed:
+            return
+        table = IncidentPattern.__table__
+        now = datetime.now()
+
+        # Create missing patterns, then apply every delta as an in-database increment
+        new_rows = [{
+            'pattern_name': pattern_name(key), 'root_cause_pattern': key[0],
+            'autosys_job_name': key[1], 'issue_type': key[2],
+            'incident_count': 0, 'resolved_count': 0, 'total_resolution_hours': 0,
+            'created_at': now, 'updated_at': now,
+        } for key in changed]
+        dialect = db.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert_fn = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+            db.execute(insert_fn(table).on_conflict_do_nothing(index_elements=['pattern_name']), new_rows)
+        else:
+            existing = set(db.execute(
+                select(table.c.pattern_name).where(table.c.pattern_name.in_([row['pattern_name'] for row in new_rows]))
+            ).scalars())
+            missing = [row for row in new_rows if row['pattern_name'] not in existing]
+            if missing:
+                db.execute(table.insert(), missing)
+
+        first = bindparam('d_first', type_=DateTime)
+        last = bindparam('d_last', type_=DateTime)
+        resolved = table.c.resolved_count + bindparam('d_resolved')
+        hours = table.c.total_resolution_hours + bindparam('d_hours')
+        db.execute(
+            table.update().where(table.c.pattern_name == bindparam('b_name')).values(
+                incident_count=table.c.incident_count + bindparam('d_count'),
+                resolved_count=resolved,
+                total_resolution_hours=hours,
+                avg_resolution_time=cast(hours / func.nullif(resolved, 0), Integer),
+                first_occurrence=case(
+                    (and_(first.isnot(None), or_(table.c.first_occurrence.is_(None), table.c.first_occurrence > first)), first),
+                    else_=table.c.first_occurrence,
+                ),
+                last_occurrence=case(
+                    (and_(last.isnot(None), or_(table.c.last_occurrence.is_(None), table.c.last_occurrence < last)), last),
+                    else_=table.c.last_occurrence,
+                ),
+                updated_at=now,
+            ),
+            [{
+                'b_name': pattern_name(key), 'd_count': group['count'], 'd_resolved': group['resolved'],
+                'd_hours': group['hours'], 'd_first': group['first'], 'd_last': group['last'],
+            } for key, group in changed.items()],
+        )
+
+        db.execute(table.delete().where(table.c.incident_count <= 0))
+        shrunk = [key for key, group in changed.items() if group['shrunk']]
+        if shrunk:
+            refresh_pattern_bounds(db, shrunk)
+
+def refresh_pattern_bounds(db: Session, keys: List[Tuple[str, str, str]]):
+    """Recompute first/last occurrence of patterns that lost incidents"""
+    table = IncidentPattern.__table__
+    columns = pattern_key_columns()
+    wanted = set(keys)
+    # The key expressions are not indexable, so take every bound in one grouped scan
+    # rather than one scan per pattern
+    bounds = {
+        (root_cause, job, issue): (first, last)
+        for root_cause, job, issue, first, last in db.execute(
+            select(*columns, func.min(AutosysIncident.opened_at), func.max(AutosysIncident.opened_at))
+            .where(columns[0].in_({key[0] for key in wanted}))
+            .group_by(*columns)
+        )
+        if (root_cause, job, issue) in wanted
+    }
+    db.execute(table.update().where(table.c.pattern_name == bindparam('b_name')).values(
+        first_occurrence=bindparam('v_first', type_=DateTime), last_occurrence=bindparam('v_last', type_=DateTime),
+    ), [
+        {'b_name': pattern_name(key), 'v_first': bounds.get(key, (None, None))[0],
+         'v_last': bounds.get(key, (None, None))[1]}
+        for key in wanted
+    ])
+
+def compute_patterns(chunk_size: int = 100000) -> PatternDelta:
+    """Aggregate every incident from scratch, streaming in chunks (memory bounded by pattern count)"""
+    delta = PatternDelta()
+    stmt = select(*[AutosysIncident.__table__.c[name] for name in PATTERN_FIELDS])
+    with engine.connect() as conn:
+        for chunk in pd.read_sql(stmt, conn.execution_options(stream_results=True), chunksize=chunk_size):
+            delta.add_frame(chunk)
+    return delta
+
+def verify_patterns() -> Dict:
+    """Compare stored IncidentPattern rows with a full recomputation"""
+    expected = {
+        pattern_name(key): group for key, group in compute_patterns().groups.items() if group['count']
+    }
+    db = SessionLocal()
+    try:
+        stored = {pattern.pattern_name: pattern for pattern in db.query(IncidentPattern)}
+    finally:
+        db.close()
+
+    mismatched = []
+    for name, group in expected.items():
+        pattern = stored.get(name)
+        actual = None if pattern is None else (
+            pattern.incident_count, pattern.resolved_count, pattern.total_resolution_hours,
+            pattern.first_occurrence, pattern.last_occurrence,
+        )
+        wanted = (group['count'], group['resolved'], group['hours'], group['first'], group['last'])
+        if actual != wanted:
+            mismatched.append({'pattern': name, 'stored': actual, 'expected': wanted})
+    unexpected = sorted(set(stored) - set(expected))
+    return {
+        'patterns': len(expected),
+        'consistent': not mismatched and not unexpected,
+        'mismatched': mismatched[:20],
+        'mismatched_count': len(mismatched),
+        'unexpected': unexpected[:20],
+    }
+
+def rebuild_patterns() -> int:
+    """Replace every IncidentPattern row with a full recomputation; returns the pattern count"""
+    delta = compute_patterns()
+    db = SessionLocal()
+    try:
+        db.query(IncidentPattern).delete()
+        delta.apply(db)
+        db.commit()
+        bump_data_version()
+        return db.query(IncidentPattern).count()
+    finally:
+        db.close()
+
+def ensure_pattern_schema():
+    """Recreate incident_patterns if it predates the running-sum columns; its rows are derived data"""
+    columns = {column['name'] for column in inspect(engine).get_columns(IncidentPattern.__tablename__)}
+    if 'total_resolution_hours' in columns:
+        return
+    logger.info("Upgrading incident_patterns and rebuilding it from incidents")
+    IncidentPattern.__table__.drop(bind=engine)
+    IncidentPattern.__table__.create(bind=engine)
+    rebuild_patterns()
+
+ensure_pattern_schema()
+
 # FastAPI Application
 app = FastAPI(title="Autosys Incident Analytics API", version="1.0.0")
 
@@ -194,33 +795,308 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@app.get("/health")
+async def health():
+    """Liveness check; stays fast while queries are in flight"""
+    return {"status": "ok"}
+
+@app.get("/metrics/db")
+async def db_metrics():
+    """Connection pool checkouts, waits and current usage"""
+    return pool_metrics()
+
+# Bulk generation is NumPy and executemany work, so it stays synchronous;
+# FastAPI runs plain def endpoints in its threadpool, off the event loop
 @app.post("/sample-data/generate")
-async def generate_sample_data(num_incidents: int = 100, db: Session = Depends(get_db)):
+def generate_sample_data(num_incidents: int = 100, seed: Optional[int] = None, db: Session = Depends(get_db)):
     """Generate sample Autosys incident data"""
     try:
-        generator = SampleDataGenerator(db)
+        generator = SampleDataGenerator(db, seed=seed)
         count = generator.generate_sample_data(num_incidents)
         return {"message": f"Successfully generated {count} sample incidents"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating sample data: {str(e)}")
 
 @app.delete("/sample-data/clear")
-async def clear_sample_data(db: Session = Depends(get_db)):
-    """Clear all sample data"""
+async def clear_sample_data(db: AsyncSession = Depends(get_async_db)):
+    """Clear all incidents, patterns and sync progress (the next sync imports everything again)"""
     try:
-        generator = SampleDataGenerator(db)
-        result = generator.clear_all_data()
-        return {"message": result}
+        await db.execute(delete(IncidentPattern))
+        await db.execute(delete(AutosysIncident))
+        await db.execute(delete(SyncState))
+        await db.commit()
+        bump_data_version()
+        return {"message": "All data cleared successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing data: {str(e)}")
 
-@app.get("/incidents")
-async def get_incidents(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get Autosys incidents"""
-    incidents = db.query(AutosysIncident).order_by(desc(AutosysIncident.opened_at)).offset(skip).limit(limit).all()
-    return incidents
+@app.post("/servicenow/sync")
+def sync_servicenow():
+    """Run one incremental ServiceNow sync now (the --sync worker also runs it on a timer)"""
+    from servicenow_sync import ServiceNowClient, ServiceNowSync
+    try:
+        return ServiceNowSync(ServiceNowClient.from_env()).run_once()
+    except (ValueError, requests.RequestException) as e:
+        raise HTTPException(status_code=502, detail=f"ServiceNow sync failed: {str(e)}")
+
+@app.post("/classifier/reclassify")
+def reclassify_incidents(force: bool = False, workers: Optional[int] = Query(None, ge=1)):
+    """Relabel root cause and issue type of every incident if the classifier rules changed"""
+    from root_cause_classifier import reclassify_all
+    try:
+        return reclassify_all(workers=workers, force=force)
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=500, detail=f"Reclassification failed: {str(e)}")
+
+class IncidentOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    incident_number: Optional[str] = None
+    autosys_job_name: Optional[str] = None
+    autosys_server: Optional[str] = None
+    issue_type: Optional[str] = None
+    root_cause: Optional[str] = None
+    root_cause_category: Optional[str] = None
+    severity: Optional[str] = None
+    priority: Optional[str] = None
+    state: Optional[str] = None
+    assigned_to: Optional[str] = None
+    assignment_group: Optional[str] = None
+    opened_at: Optional[datetime] = None
+    closed_at: Optional[datetime] = None
+    resolution_time_hours: Optional[int] = None
+    short_description: Optional[str] = None
+    description: Optional[str] = None
+    work_notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class IncidentPage(BaseModel):
+    items: List[IncidentOut]
+    next_cursor: Optional[str] = None
+
+def encode_cursor(opened_at: Optional[datetime], incident_id: int) -> str:
+    opened = opened_at.isoformat() if opened_at else ""
+    return base64.urlsafe_b64encode(f"{opened}|{incident_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        opened_at, incident_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(opened_at) if opened_at else None), int(incident_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Selected fields are validated against IncidentOut; the ones not asked for are left out
+@app.get("/incidents", response_model=IncidentPage, response_model_exclude_unset=True,
+         response_class=ORJSONResponse)
+async def get_incidents(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    state: Optional[str] = None,
+    server: Optional[str] = None,
+    job: Optional[str] = None,
+    category: Optional[str] = None,
+    opened_from: Optional[datetime] = None,
+    opened_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get Autosys incidents, newest first, one keyset page at a time
+
+    Incidents without an opened_at come last, newest id first, unless a date
+    range is given. ``id`` is always returned.
+    """
+    if fields:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = set(selected) - set(IncidentOut.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        selected = list(dict.fromkeys(["id"] + selected))
+    else:
+        selected = list(IncidentOut.model_fields)
+
+    table = AutosysIncident.__table__
+    # The cursor needs opened_at and id even when they are not returned
+    columns = list(dict.fromkeys(selected + ["opened_at", "id"]))
+    stmt = select(*[table.c[name] for name in columns])
+
+    for column, value in (
+        (AutosysIncident.state, state),
+        (AutosysIncident.autosys_server, server),
+        (AutosysIncident.autosys_job_name, job),
+        (AutosysIncident.root_cause_category, category),
+    ):
+        if value:
+            stmt = stmt.where(column == value)
+    if opened_from:
+        stmt = stmt.where(AutosysIncident.opened_at >= opened_from)
+    if opened_to:
+        stmt = stmt.where(AutosysIncident.opened_at < opened_to)
+    # Dated incidents first, walking the opened_at index; a cursor without a
+    # date continues through the undated ones by id
+    cursor_opened_at, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+    undated = stmt.where(AutosysIncident.opened_at.is_(None)).order_by(desc(AutosysIncident.id))
+    if cursor_id is not None and cursor_opened_at is None:
+        undated = undated.where(AutosysIncident.id < cursor_id)
+
+    rows = []
+    if cursor_id is None or cursor_opened_at is not None:
+        dated = stmt.where(AutosysIncident.opened_at.isnot(None))
+        if cursor_id is not None:
+            # Row-value comparison lets the planner seek the opened_at index (rows with equal opened_at are ordered by id)
+            dated = dated.where(tuple_(AutosysIncident.opened_at, AutosysIncident.id) < (cursor_opened_at, cursor_id))
+        # One extra row tells whether another page exists
+        dated = dated.order_by(desc(AutosysIncident.opened_at), desc(AutosysIncident.id)).limit(limit + 1)
+        rows = list((await db.execute(dated)).mappings().all())
+    if len(rows) <= limit and not (opened_from or opened_to):
+        rows += (await db.execute(undated.limit(limit + 1 - len(rows)))).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["opened_at"], rows[-1]["id"])
+
+    return {
+        "items": [{name: row[name] for name in selected} for row in rows],
+        "next_cursor": next_cursor,
+    }
 
 # Dashboard Functions
+def compute_statistics() -> Dict:
+    """Headline metrics in a single statement: totals in one aggregate pass, joined to the top root cause"""
+    totals = select(
+        func.count(AutosysIncident.id).label('total'),
+        func.coalesce(func.sum(case((AutosysIncident.state.in_(OPEN_STATES), 1), else_=0)), 0).label('open_count'),
+        func.avg(AutosysIncident.resolution_time_hours).label('avg_resolution'),
+    ).subquery()
+    top_cause = select(
+        AutosysIncident.root_cause,
+        func.count(AutosysIncident.id).label('cause_count'),
+    ).filter(
+        AutosysIncident.root_cause != 'Unknown'
+    ).group_by(AutosysIncident.root_cause).order_by(desc('cause_count')).limit(1).subquery()
+
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(totals, top_cause.c.root_cause, top_cause.c.cause_count).select_from(
+                totals.outerjoin(top_cause, true())
+            )
+        ).one()
+
+    return {
+        "Total Incidents": row.total,
+        "Open Incidents": row.open_count,
+        "Closed Incidents": row.total - row.open_count,
+        "Average Resolution Time (hours)": round(row.avg_resolution or 0, 1),
+        "Most Common Root Cause": row.root_cause or "N/A",
+        "Most Common Cause Count": row.cause_count or 0
+    }
+
+# Incidents table: display name -> column, in display order
+INCIDENT_TABLE_COLUMNS = {
+    'Incident Number': AutosysIncident.incident_number,
+    'Date': AutosysIncident.opened_at,
+    'Job Name': AutosysIncident.autosys_job_name,
+    'Server': AutosysIncident.autosys_server,
+    'Issue Type': AutosysIncident.issue_type,
+    'Root Cause': AutosysIncident.root_cause,
+    'Category': AutosysIncident.root_cause_category,
+    'Priority': AutosysIncident.priority,
+    'State': AutosysIncident.state,
+    'Resolution Hours': AutosysIncident.resolution_time_hours,
+}
+ALL_FILTER = 'All'
+LIKE_ESCAPE = '\\'
+
+def escape_like(value: str) -> str:
+    """``value`` with the LIKE wildcards escaped by LIKE_ESCAPE, to match literally"""
+    return value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace('%', LIKE_ESCAPE + '%').replace('_', LIKE_ESCAPE + '_')
+
+def _incident_filters(state: Optional[str] = None, category: Optional[str] = None,
+                      job_name: Optional[str] = None) -> list:
+    conditions = []
+    if state and state != ALL_FILTER:
+        conditions.append(AutosysIncident.state == state)
+    if category and category != ALL_FILTER:
+        conditions.append(AutosysIncident.root_cause_category == category)
+    if job_name:
+        # Prefix match so the autosys_job_name index can be used
+        # Job names contain underscores, which LIKE would treat as wildcards
+        conditions.append(AutosysIncident.autosys_job_name.like(
+            f"{escape_like(job_name.strip().upper())}%", escape=LIKE_ESCAPE
+        ))
+    return conditions
+
+def count_incidents(state: Optional[str] = None, category: Optional[str] = None,
+                    job_name: Optional[str] = None) -> int:
+    """Number of incidents matching the table filters, cached until the data changes"""
+    conditions = _incident_filters(state, category, job_name)
+
+    def compute():
+        with engine.connect() as conn:
+            return conn.execute(select(func.count(AutosysIncident.id)).where(*conditions)).scalar()
+
+    return result_cache.get_or_compute(f"incident_count:{state}:{category}:{job_name}", compute)
+
+def query_incidents_page(page: int = 1, page_size: int = 50, sort_by: str = 'Date', descending: bool = True,
+                         state: Optional[str] = None, category: Optional[str] = None,
+                         job_name: Optional[str] = None) -> pd.DataFrame:
+    """One page of the incidents table, reading only the displayed columns"""
+    sort_column = INCIDENT_TABLE_COLUMNS.get(sort_by, AutosysIncident.opened_at)
+    # id breaks ties so rows never repeat or vanish between pages
+    ordering = [desc(sort_column), desc(AutosysIncident.id)] if descending else [sort_column, AutosysIncident.id]
+    stmt = select(*[column.label(name) for name, column in INCIDENT_TABLE_COLUMNS.items()]).where(
+        *_incident_filters(state, category, job_name)
+    ).order_by(*ordering).offset((max(page, 1) - 1) * page_size).limit(page_size)
+
+    with engine.connect() as conn:
+        df = pd.read_sql(stmt, conn)
+
+    df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d %H:%M').fillna('')
+    df[['Job Name', 'Server']] = df[['Job Name', 'Server']].fillna('N/A')
+    df['Resolution Hours'] = df['Resolution Hours'].fillna(0).astype(int)
+    return df
+
+def recurring_patterns(min_count: int = 2, include_unknown: bool = False, limit: int = 50) -> pd.DataFrame:
+    """Most frequent precomputed incident patterns"""
+    stmt = select(
+        IncidentPattern.root_cause_pattern.label('Root Cause'),
+        IncidentPattern.autosys_job_name.label('Job Name'),
+        IncidentPattern.issue_type.label('Issue Type'),
+        IncidentPattern.incident_count.label('Incidents'),
+        (IncidentPattern.incident_count - IncidentPattern.resolved_count).label('Open'),
+        IncidentPattern.avg_resolution_time.label('Avg Resolution Hours'),
+        IncidentPattern.first_occurrence.label('First Seen'),
+        IncidentPattern.last_occurrence.label('Last Seen'),
+    ).where(IncidentPattern.incident_count >= min_count)
+    if not include_unknown:
+        stmt = stmt.where(IncidentPattern.root_cause_pattern != 'unknown')
+    stmt = stmt.order_by(desc(IncidentPattern.incident_count), IncidentPattern.pattern_name).limit(limit)
+
+    def compute():
+        with engine.connect() as conn:
+            df = pd.read_sql(stmt, conn)
+        for column in ('First Seen', 'Last Seen'):
+            df[column] = pd.to_datetime(df[column]).dt.strftime('%Y-%m-%d %H:%M').fillna('')
+        return df
+
+    return result_cache.get_or_compute(f"patterns:{min_count}:{include_unknown}:{limit}", compute)
+
+def distinct_values(column) -> List[str]:
+    """Sorted non-null values of an indexed column, for filter dropdowns"""
+    def compute():
+        with engine.connect() as conn:
+            return [value for value in conn.execute(
+                select(column).where(column.isnot(None)).distinct().order_by(column)
+            ).scalars()]
+
+    return result_cache.get_or_compute(f"distinct:{column.key}", compute)
+
 def create_dashboard():
     def generate_sample_data():
         db = SessionLocal()
@@ -244,29 +1120,14 @@ def create_dashboard():
         finally:
             db.close()
     
-    def get_incidents_data():
-        db = SessionLocal()
-        try:
-            incidents = db.query(AutosysIncident).order_by(desc(AutosysIncident.opened_at)).limit(1000).all()
-            
-            data = []
-            for inc in incidents:
-                data.append({
-                    'Incident Number': inc.incident_number,
-                    'Date': inc.opened_at.strftime('%Y-%m-%d %H:%M') if inc.opened_at else '',
-                    'Job Name': inc.autosys_job_name or 'N/A',
-                    'Server': inc.autosys_server or 'N/A',
-                    'Issue Type': inc.issue_type,
-                    'Root Cause': inc.root_cause,
-                    'Category': inc.root_cause_category,
-                    'Priority': inc.priority,
-                    'State': inc.state,
-                    'Resolution Hours': inc.resolution_time_hours or 0
-                })
-            
-            return pd.DataFrame(data)
-        finally:
-            db.close()
+    def get_incidents_data(page=1, page_size=50, sort_by='Date', order='Descending',
+                           state=ALL_FILTER, category=ALL_FILTER, job_name=''):
+        page_size = int(page_size)
+        total = count_incidents(state, category, job_name)
+        last_page = max((total + page_size - 1) // page_size, 1)
+        page = min(max(int(page or 1), 1), last_page)
+        df = query_incidents_page(page, page_size, sort_by, order == 'Descending', state, category, job_name)
+        return df, page, f"Page {page} of {last_page} · {total:,} matching incidents"
     
     def create_root_cause_chart():
         db = SessionLocal()
@@ -293,34 +1154,7 @@ def create_dashboard():
             db.close()
     
     def get_statistics():
-        db = SessionLocal()
-        try:
-            total = db.query(AutosysIncident).count()
-            open_count = db.query(AutosysIncident).filter(
-                AutosysIncident.state.in_(['New', 'In Progress', 'On Hold'])
-            ).count()
-            
-            avg_resolution = db.query(func.avg(AutosysIncident.resolution_time_hours)).filter(
-                AutosysIncident.resolution_time_hours.isnot(None)
-            ).scalar() or 0
-            
-            most_common_cause = db.query(
-                AutosysIncident.root_cause,
-                func.count(AutosysIncident.id).label('count')
-            ).filter(
-                AutosysIncident.root_cause != 'Unknown'
-            ).group_by(AutosysIncident.root_cause).order_by(desc('count')).first()
-            
-            return {
-                "Total Incidents": total,
-                "Open Incidents": open_count,
-                "Closed Incidents": total - open_count,
-                "Average Resolution Time (hours)": round(avg_resolution, 1),
-                "Most Common Root Cause": most_common_cause.root_cause if most_common_cause else "N/A",
-                "Most Common Cause Count": most_common_cause.count if most_common_cause else 0
-            }
-        finally:
-            db.close()
+        return result_cache.get_or_compute("statistics", compute_statistics)
     
     # Create Gradio Interface
     with gr.Blocks(title="Autosys Incident Analytics Dashboard", theme=gr.themes.Soft()) as dashboard:
@@ -347,14 +1181,61 @@ def create_dashboard():
             stats_btn.click(get_statistics, outputs=stats_output)
         
         with gr.Tab("📋 Incidents Table"):
-            refresh_table_btn = gr.Button("🔄 Refresh Data")
+            with gr.Row():
+                state_filter = gr.Dropdown(
+                    [ALL_FILTER] + SampleDataGenerator.open_states + SampleDataGenerator.closed_states,
+                    value=ALL_FILTER, label="State"
+                )
+                category_filter = gr.Dropdown(
+                    [ALL_FILTER] + distinct_values(AutosysIncident.root_cause_category),
+                    value=ALL_FILTER, label="Category", allow_custom_value=True
+                )
+                job_filter = gr.Textbox(label="Job Name (prefix)")
+                sort_by = gr.Dropdown(list(INCIDENT_TABLE_COLUMNS), value="Date", label="Sort By")
+                sort_order = gr.Radio(["Descending", "Ascending"], value="Descending", label="Order")
+            with gr.Row():
+                prev_page_btn = gr.Button("◀ Previous")
+                page_number = gr.Number(value=1, precision=0, label="Page")
+                page_size = gr.Dropdown([25, 50, 100, 250], value=50, label="Rows per Page")
+                next_page_btn = gr.Button("Next ▶")
+                refresh_table_btn = gr.Button("🔄 Refresh Data")
+            page_info = gr.Markdown()
             incidents_table = gr.Dataframe(
-                headers=["Incident Number", "Date", "Job Name", "Server", "Issue Type", 
-                        "Root Cause", "Category", "Priority", "State", "Resolution Hours"],
+                headers=list(INCIDENT_TABLE_COLUMNS),
                 label="Recent Autosys Incidents",
                 interactive=False
             )
-            refresh_table_btn.click(get_incidents_data, outputs=incidents_table)
+
+            table_controls = [page_size, sort_by, sort_order, state_filter, category_filter, job_filter]
+            table_outputs = [incidents_table, page_number, page_info]
+            refresh_table_btn.click(get_incidents_data, inputs=[page_number] + table_controls, outputs=table_outputs)
+            page_number.submit(get_incidents_data, inputs=[page_number] + table_controls, outputs=table_outputs)
+            # A cleared page box counts as page 1
+            prev_page_btn.click(lambda page, *controls: get_incidents_data((page or 1) - 1, *controls),
+                                inputs=[page_number] + table_controls, outputs=table_outputs)
+            next_page_btn.click(lambda page, *controls: get_incidents_data((page or 1) + 1, *controls),
+                                inputs=[page_number] + table_controls, outputs=table_outputs)
+            # Changing a filter, the sort or the page size starts again from page 1;
+            # the job prefix applies on Enter or leaving the box, not per keystroke
+            first_page = lambda *controls: get_incidents_data(1, *controls)
+            for control in table_controls:
+                if control is job_filter:
+                    control.submit(first_page, inputs=table_controls, outputs=table_outputs)
+                    control.blur(first_page, inputs=table_controls, outputs=table_outputs)
+                else:
+                    control.change(first_page, inputs=table_controls, outputs=table_outputs)
+        
+        with gr.Tab("🔁 Recurring Patterns"):
+            gr.Markdown("Incidents grouped by root cause, job and issue type, kept up to date as incidents arrive")
+            with gr.Row():
+                min_occurrences = gr.Slider(1, 100, value=2, step=1, label="Minimum Incidents")
+                include_unknown = gr.Checkbox(value=False, label="Include unknown root causes")
+                refresh_patterns_btn = gr.Button("🔄 Refresh Patterns")
+            patterns_table = gr.Dataframe(label="Recurring Patterns", interactive=False)
+            pattern_inputs = [min_occurrences, include_unknown]
+            refresh_patterns_btn.click(recurring_patterns, inputs=pattern_inputs, outputs=patterns_table)
+            min_occurrences.release(recurring_patterns, inputs=pattern_inputs, outputs=patterns_table)
+            include_unknown.change(recurring_patterns, inputs=pattern_inputs, outputs=patterns_table)
         
         with gr.Tab("📊 Root Cause Analysis"):
             root_cause_btn = gr.Button("📊 Generate Root Cause Chart")
@@ -363,16 +1244,24 @@ def create_dashboard():
         
         # Load initial data
         dashboard.load(get_statistics, outputs=stats_output)
-        dashboard.load(get_incidents_data, outputs=incidents_table)
+        dashboard.load(get_incidents_data, outputs=table_outputs)
     
     return dashboard
 
 # Main execution
 if __name__ == "__main__":
     import sys
+
+    def cli_option(name, default=None):
+        """Integer value following ``name`` on the command line"""
+        if name in sys.argv:
+            return int(sys.argv[sys.argv.index(name) + 1])
+        return default
     
     # Check if sample data should be generated
     generate_sample = "--sample" in sys.argv or "-s" in sys.argv
+    sample_size = cli_option("--sample-size", 150)
+    seed = cli_option("--seed")
     
     print("Initializing Autosys Incident Analytics System...")
     
@@ -380,13 +1269,40 @@ if __name__ == "__main__":
         print("Generating sample data...")
         try:
             db = SessionLocal()
-            generator = SampleDataGenerator(db)
+            generator = SampleDataGenerator(db, seed=seed)
             generator.clear_all_data()  # Clear any existing data
-            sample_count = generator.generate_sample_data(150)  # Generate 150 sample incidents
-            print(f"✅ Generated {sample_count} sample incidents")
+            started = time.perf_counter()
+            sample_count = generator.generate_sample_data(sample_size)
+            elapsed = time.perf_counter() - started
+            print(f"✅ Generated {sample_count} sample incidents in {elapsed:.1f}s "
+                  f"({sample_count / elapsed:,.0f} rows/sec)")
             db.close()
         except Exception as e:
             print(f"❌ Sample data generation failed: {e}")
+
+    # Load-test preparation: fill the database and exit
+    if "--generate-only" in sys.argv:
+        sys.exit(0)
+
+    # Pattern maintenance: check (or rebuild) IncidentPattern against the incidents and exit
+    if "--verify-patterns" in sys.argv:
+        report = verify_patterns()
+        print(json.dumps(report, indent=2, default=str))
+        sys.exit(0 if report["consistent"] else 1)
+    if "--rebuild-patterns" in sys.argv:
+        print(f"✅ Rebuilt {rebuild_patterns()} incident patterns")
+        sys.exit(0)
+    
+    # Keep the store in step with ServiceNow in the background
+    if "--sync" in sys.argv:
+        from servicenow_sync import ServiceNowClient, ServiceNowSync
+        sync_worker = ServiceNowSync(ServiceNowClient.from_env())
+        threading.Thread(
+            target=sync_worker.run_forever,
+            args=(float(os.getenv("SERVICENOW_SYNC_INTERVAL", "300")),),
+            daemon=True,
+        ).start()
+        print("🔁 ServiceNow sync worker started")
     
     # Create and launch dashboard
     dashboard = create_dashboard()
@@ -0,0 +1,70 @@
+"""Gunicorn settings for the workflow system.
+
+Pick a profile with GUNICORN_PROFILE (compare them on the target box with
+`python manage.py benchmark_server_profiles`):
+
+  async     uvicorn workers on the ASGI app, one per CPU (default; needed
+            for the async views and live task streams)
+  threaded  gthread workers on the WSGI app, CPU count workers x
+            GUNICORN_THREADS threads
+  sync      classic pre-fork WSGI workers, 2 x CPUs + 1
+
+WEB_CONCURRENCY (set by Heroku) and GUNICORN_THREADS override the sizing.
+"""
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+profile = os.environ.get('GUNICORN_PROFILE', 'async')
+
+PROFILES = {
+    'async': {
+        'worker_class': 'uvicorn_worker.UvicornWorker',
+        'wsgi_app': 'workflow_system.asgi:application',
+        'workers': cpu_count,
+        'threads': 1,
+    },
+    'threaded': {
+        'worker_class': 'gthread',
+        'wsgi_app': 'workflow_system.wsgi:application',
+        'workers': cpu_count,
+        'threads': 4,
+    },
+    'sync': {
+        'worker_class': 'sync',
+        'wsgi_app': 'workflow_system.wsgi:application',
+        'workers': cpu_count * 2 + 1,
+        'threads': 1,
+    },
+}
+
+if profile not in PROFILES:
+    raise RuntimeError(f"Unknown GUNICORN_PROFILE '{profile}', expected one of: {', '.join(PROFILES)}")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = PROFILES[profile]['worker_class']
+wsgi_app = PROFILES[profile]['wsgi_app']
+workers = int(os.environ.get('WEB_CONCURRENCY', PROFILES[profile]['workers']))
+threads = int(os.environ.get('GUNICORN_THREADS', PROFILES[profile]['threads']))
+
+# Import Django once in the master so workers share the loaded code pages
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() == 'true'
+
+# Recycle workers periodically to cap slow memory leaks; jitter avoids
+# every worker restarting at the same moment
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    # Never share a database connection opened in the preloaded master
+    if server.cfg.preload_app:
+        from django.db import connections
+        connections.close_all()
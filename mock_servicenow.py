@@ -0,0 +1,204 @@
+# Local stand-in for the ServiceNow Table API, for running servicenow_sync.py
+# without an instance.
+#
+# Serves GET /api/now/table/incident with basic auth, sys_updated_on/sys_id
+# comparisons (including ^NQ branches), sysparm_offset/sysparm_limit paging and
+# sysparm_display_value=all records. --latency and --rate-limit simulate a
+# slow or throttling instance (429 with Retry-After).
+#
+# Usage:
+#   python mock_servicenow.py --port 8089 --incidents 5000
+#   SERVICENOW_INSTANCE=http://localhost:8089 SERVICENOW_USERNAME=admin \
+#   SERVICENOW_PASSWORD=admin python servicenow_sync.py
+
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+JOBS = ["ETL_DAILY_LOAD", "BATCH_RECONCILIATION", "DATA_EXPORT_JOB", "BACKUP_DAILY", "INVOICE_PROCESSING"]
+SERVERS = ["autosys-prod-01", "autosys-prod-02", "batch-server-03", "etl-server-01"]
+PROBLEMS = [
+    "disk full on /var/batch", "ORA-00054 resource busy (table lock)", "connection refused by upstream API",
+    "file not found: /data/in/feed.csv", "job exceeded max run time", "out of memory",
+]
+STATES = ["New", "In Progress", "On Hold", "Resolved", "Closed"]
+PRIORITIES = ["1 - Critical", "2 - High", "3 - Moderate", "4 - Low"]
+GROUPS = ["Autosys Support", "Infrastructure Team", "Database Team", "Application Support"]
+
+
+def field(value, display=None):
+    return {"value": value or "", "display_value": display if display is not None else (value or "")}
+
+
+def generate_incidents(count, days, seed):
+    """Deterministic incidents spread over the last ``days`` days, sorted by sys_updated_on"""
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    incidents = []
+    for n in range(count):
+        opened = now - timedelta(seconds=rng.randint(0, days * 86400))
+        closed = opened + timedelta(hours=rng.randint(1, 120)) if rng.random() < 0.75 else None
+        updated = min(closed or opened + timedelta(minutes=rng.randint(0, 600)), now)
+        job, server, problem = rng.choice(JOBS), rng.choice(SERVERS), rng.choice(PROBLEMS)
+        state = rng.choice(STATES[3:]) if closed else rng.choice(STATES[:3])
+        incidents.append({
+            "sys_id": field(f"{n:032x}"),
+            "number": field(f"INC{9000000 + n:07d}"),
+            "short_description": field(f"Autosys job {job} failed on {server}"),
+            "description": field(f"AutoSys JOB: {job} on machine {server} terminated: {problem}"),
+            "work_notes": field("", f"Investigating {problem}"),
+            "state": field(str(STATES.index(state) + 1), state),
+            "priority": field("3", rng.choice(PRIORITIES)),
+            "severity": field("3", rng.choice(PRIORITIES)),
+            "assigned_to": field("", f"user{rng.randint(1, 50)}"),
+            "assignment_group": field("", rng.choice(GROUPS)),
+            "opened_at": field(opened.strftime(DATETIME_FORMAT)),
+            "closed_at": field(closed.strftime(DATETIME_FORMAT) if closed else ""),
+            "resolved_at": field(closed.strftime(DATETIME_FORMAT) if closed else ""),
+            "sys_updated_on": field(updated.strftime(DATETIME_FORMAT)),
+        })
+    incidents.sort(key=lambda record: (record["sys_updated_on"]["value"], record["sys_id"]["value"]))
+    return incidents
+
+
+FIELD_OPERATORS = [">=", "<", ">", "="]
+
+
+def term_matches(record, term):
+    """sys_updated_on and sys_id comparisons (values compare as strings); other terms are accepted as-is"""
+    for name in ("sys_updated_on", "sys_id"):
+        if term.startswith(name):
+            for operator in FIELD_OPERATORS:
+                if term.startswith(name + operator):
+                    value, bound = record[name]["value"], term[len(name + operator):]
+                    return {">=": value >= bound, "<": value < bound, ">": value > bound, "=": value == bound}[operator]
+    return True
+
+
+def matches(record, query):
+    """Evaluate an encoded query: ^NQ-separated branches of ^-joined terms"""
+    terms = [term for term in query.split("^") if not term.startswith("ORDERBY")]
+    branches = [[]]
+    for term in terms:
+        if term.startswith("NQ"):
+            branches.append([])
+            term = term[2:]
+        branches[-1].append(term)
+    return any(all(term_matches(record, term) for term in branch) for branch in branches)
+
+
+class Handler(BaseHTTPRequestHandler):
+    incidents = []
+    credentials = ""
+    latency = 0.0
+    rate_limit = 0
+    requests_served = 0
+    throttled_count = 0
+    _window = [0.0, 0]
+    _lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def throttled(self):
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window[0] >= 1:
+                self._window[:] = [now, 0]
+            self._window[1] += 1
+            if self._window[1] <= self.rate_limit:
+                return False
+            Handler.throttled_count += 1
+            return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/api/now/table/incident":
+            return self.send_json(404, {"error": {"message": "No such table"}})
+        if self.headers.get("Authorization") != f"Basic {self.credentials}":
+            return self.send_json(401, {"error": {"message": "User Not Authenticated"}})
+        if self.throttled():
+            return self.send_json(429, {"error": {"message": "Rate limit exceeded"}}, {"Retry-After": "1"})
+
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self._lock:
+            incidents = list(self.incidents)
+        selected = [record for record in incidents if matches(record, params.get("sysparm_query", ""))]
+        offset = int(params.get("sysparm_offset", 0))
+        limit = int(params.get("sysparm_limit", 10000))
+        page = selected[offset:offset + limit]
+
+        fields = params.get("sysparm_fields")
+        if fields:
+            names = fields.split(",")
+            page = [{name: record[name] for name in names if name in record} for record in page]
+        if params.get("sysparm_display_value") != "all":
+            page = [{name: value["value"] for name, value in record.items() if isinstance(value, dict)} for record in page]
+
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            Handler.requests_served += 1
+        self.send_json(200, {"result": page}, {"X-Total-Count": str(len(selected))})
+
+
+def touch(number, updated_on):
+    """Set an incident's sys_updated_on, as if it were edited in ServiceNow"""
+    with Handler._lock:
+        record = next(record for record in Handler.incidents if record["number"]["value"] == number)
+        record["sys_updated_on"] = field(updated_on.strftime(DATETIME_FORMAT))
+        Handler.incidents.sort(key=lambda record: (record["sys_updated_on"]["value"], record["sys_id"]["value"]))
+    return record
+
+
+def serve(port=8089, incidents=5000, days=365, seed=1, username="admin", password="admin",
+          latency=0.0, rate_limit=0):
+    """Start the mock in a background thread; returns the server (call shutdown() to stop)"""
+    Handler.incidents = generate_incidents(incidents, days, seed)
+    Handler.credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+    Handler.latency = latency
+    Handler.rate_limit = rate_limit
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock ServiceNow Table API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--incidents", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=365, help="History the incidents are spread over")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second before 429s (0 = off)")
+    args = parser.parse_args()
+
+    server = serve(args.port, args.incidents, args.days, args.seed, args.username, args.password,
+                   args.latency, args.rate_limit)
+    print(f"Mock ServiceNow serving {args.incidents} incidents on http://127.0.0.1:{args.port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
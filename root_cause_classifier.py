@@ -0,0 +1,411 @@
+# Rule-based root-cause classifier for Autosys incident text
+#
+# Labels incidents from their short_description, description and work_notes.
+# Each rule set (root causes, issue types) is compiled into ONE regex: all
+# keywords folded into a trie, plus a named group per regex pattern, so a
+# record is scanned once per rule set however many rules there are and
+# relabelling stays cheap enough to redo on every rule change. When several
+# rules match, the one listed first wins, so put specific rules before
+# generic ones.
+#
+# Rules come from the JSON file named by AUTOSYS_CLASSIFIER_RULES, shaped like
+# DEFAULT_RULES (python root_cause_classifier.py --export-rules prints it):
+#   {"root_cause": [{"name", "root_cause", "category", "keywords", "patterns"}, ...],
+#    "issue_type": [{"name", "issue_type", "keywords", "patterns"}, ...]}
+# Keywords match case-insensitively as whole words; patterns are regexes
+# (no named groups) tried at word starts. Prefer keywords: they share one trie
+# and cost little per rule, while every pattern adds a branch at each word.
+#
+# Usage:
+#   python root_cause_classifier.py --classify "ORA-00054 resource busy on batch-server-03"
+#   python root_cause_classifier.py --reclassify [--workers 8] [--force]
+#                                    # relabel every incident when the rules changed
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RULES_STATE_NAME = "root_cause_rules"
+UNMATCHED = "unmatched"
+UNKNOWN = "Unknown"
+
+DEFAULT_RULES = {
+    "root_cause": [
+        {"name": "table_lock", "root_cause": "Table Lock", "category": "Database",
+         "keywords": ["table lock", "deadlock", "lock wait timeout", "resource busy", "ORA-00054", "ORA-00060"],
+         "patterns": []},
+        {"name": "database_connection", "root_cause": "Database Connection Failed", "category": "Database",
+         "keywords": ["database connection failed", "could not connect to database", "connection pool exhausted",
+                      "TNS:no listener", "TNS:could not resolve"],
+         "patterns": [r"ORA-125\d\d"]},
+        {"name": "sql_error", "root_cause": "SQL Error", "category": "Database",
+         "keywords": ["sql error", "sqlstate", "syntax error", "constraint violated"],
+         "patterns": [r"ORA-\d{5}"]},
+        {"name": "disk_full", "root_cause": "Disk Full", "category": "Infrastructure",
+         "keywords": ["disk full", "no space left on device", "filesystem full", "file system full"],
+         "patterns": [r"(?:disk|filesystem|file system|mount)\s+\S*\s*(?:is\s+)?(?:at\s+)?(?:9\d|100)\s*%"]},
+        {"name": "hardware_failure", "root_cause": "Hardware Failure", "category": "Infrastructure",
+         "keywords": ["hardware failure", "hardware fault", "disk failure", "power supply", "memory module"],
+         "patterns": []},
+        {"name": "server_down", "root_cause": "Server Down", "category": "Infrastructure",
+         "keywords": ["server down", "server is down", "host down", "machine down", "node down", "rebooted",
+                      "agent down", "agent is down", "agent not responding"],
+         "patterns": []},
+        {"name": "network_issue", "root_cause": "Network Issue", "category": "Infrastructure",
+         "keywords": ["network issue", "network unreachable", "packet loss", "dns resolution", "connection reset",
+                      "no route to host"],
+         "patterns": []},
+        {"name": "file_not_found", "root_cause": "File Not Found", "category": "External Dependency",
+         "keywords": ["file not found", "no such file", "missing input file", "file watcher", "filewatcher"],
+         "patterns": [r"\bfile\b[^.]{0,60}\b(?:missing|not (?:found|received|arrived))"]},
+        {"name": "upstream_down", "root_cause": "Upstream System Down", "category": "External Dependency",
+         "keywords": ["upstream system down", "upstream", "connection refused", "service unavailable",
+                      "502", "503", "504"],
+         "patterns": []},
+        {"name": "third_party", "root_cause": "Third Party Issue", "category": "External Dependency",
+         "keywords": ["third party issue", "third party", "third-party", "vendor"],
+         "patterns": []},
+        {"name": "configuration_error", "root_cause": "Configuration Error", "category": "Application",
+         "keywords": ["configuration error", "misconfigured", "misconfiguration", "invalid config",
+                      "missing parameter", "wrong profile"],
+         "patterns": []},
+        {"name": "code_issue", "root_cause": "Code Issue", "category": "Application",
+         "keywords": ["code issue", "bug", "nullpointerexception", "null pointer", "regression"],
+         "patterns": []},
+        {"name": "application_error", "root_cause": "Application Error", "category": "Application",
+         "keywords": ["application error", "exception", "stack trace", "segmentation fault", "core dump",
+                      "out of memory"],
+         "patterns": [r"exit code [1-9]\d*"]},
+    ],
+    "issue_type": [
+        {"name": "hang_timeout", "issue_type": "Job Hang/Timeout",
+         "keywords": ["job hang/timeout", "hang", "hung", "timed out", "timeout", "max run time", "long running",
+                      "term_run_time"],
+         "patterns": []},
+        {"name": "scheduling", "issue_type": "Scheduling Issue",
+         "keywords": ["scheduling issue", "did not start", "not scheduled", "missed schedule", "calendar"],
+         "patterns": []},
+        {"name": "dependency", "issue_type": "Dependency Issue",
+         "keywords": ["dependency issue", "dependency", "predecessor", "condition not met", "waiting on"],
+         "patterns": []},
+        {"name": "resource", "issue_type": "Resource Issue",
+         "keywords": ["resource issue", "out of memory", "cpu", "memory limit"],
+         "patterns": []},
+        {"name": "connectivity", "issue_type": "Connectivity Issue",
+         "keywords": ["connectivity issue", "connection refused", "unreachable", "connection reset"],
+         "patterns": []},
+        {"name": "job_failure", "issue_type": "Job Failure",
+         "keywords": ["job failure", "failed", "failure", "terminated", "abend"],
+         "patterns": [r"exit code [1-9]\d*"]},
+    ],
+}
+
+
+def keyword_trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex for a set of literals with shared prefixes factored out ("disk f(?:ailure|ull)"),
+    so the engine walks a trie instead of trying every keyword at each position"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return render(trie)
+
+
+class RuleMatcher:
+    """One combined regex for a list of rules; ``match`` returns the winning rule's index.
+
+    Keywords of all rules share a single trie alternation and are mapped back
+    to their rule by the matched text; regex patterns get a named group per
+    rule. Matches are only attempted at word starts.
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self.keyword_rules: Dict[str, int] = {}
+        alternatives = []
+        for index, rule in enumerate(rules):
+            for keyword in rule.get("keywords", []):
+                self.keyword_rules.setdefault(keyword.lower(), index)
+            if rule.get("patterns"):
+                alternatives.append(f"(?P<r{index}>{'|'.join(f'(?:{pattern})' for pattern in rule['patterns'])})")
+        if self.keyword_rules:
+            alternatives.insert(0, rf"(?P<kw>{keyword_trie_pattern(self.keyword_rules)})\b")
+        self.regex = re.compile(rf"\b(?:{'|'.join(alternatives)})" if alternatives else r"(?!x)x",
+                                re.IGNORECASE | re.ASCII)
+
+    def match(self, text: str) -> Optional[int]:
+        best = None
+        for match in self.regex.finditer(text):
+            group = match.lastgroup
+            index = self.keyword_rules[match.group(group).lower()] if group == "kw" else int(group[1:])
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return best
+
+
+class RootCauseClassifier:
+    """Labels incident text with root cause, category and issue type"""
+
+    def __init__(self, rules: Optional[Dict] = None):
+        self.rules = rules or DEFAULT_RULES
+        self.root_cause_matcher = RuleMatcher(self.rules["root_cause"])
+        self.issue_type_matcher = RuleMatcher(self.rules["issue_type"])
+        self.fingerprint = rules_fingerprint(self.rules)
+
+    def classify(self, *texts: Optional[str]) -> Tuple[Dict, Optional[str], Optional[str]]:
+        """(labels, root cause rule name, issue type rule name) for one incident's text"""
+        text = " \n".join(part for part in texts if part)
+        cause_index = self.root_cause_matcher.match(text)
+        issue_index = self.issue_type_matcher.match(text)
+
+        labels = {"root_cause": UNKNOWN, "root_cause_category": UNKNOWN, "issue_type": None}
+        cause_rule = issue_rule = None
+        if cause_index is not None:
+            rule = self.rules["root_cause"][cause_index]
+            labels["root_cause"], labels["root_cause_category"] = rule["root_cause"], rule["category"]
+            cause_rule = rule["name"]
+        if issue_index is not None:
+            rule = self.rules["issue_type"][issue_index]
+            labels["issue_type"] = rule["issue_type"]
+            issue_rule = rule["name"]
+        return labels, cause_rule, issue_rule
+
+    def classify_rows(self, rows: Iterable[Dict], hits: Optional[Counter] = None) -> List[Dict]:
+        """Set the label columns on incident rows in place; counts the winning rules in ``hits``"""
+        rows = list(rows)
+        for row in rows:
+            labels, cause_rule, issue_rule = self.classify(
+                row.get("short_description"), row.get("description"), row.get("work_notes")
+            )
+            row.update(labels)
+            if hits is not None:
+                hits[f"root_cause:{cause_rule or UNMATCHED}"] += 1
+                hits[f"issue_type:{issue_rule or UNMATCHED}"] += 1
+        return rows
+
+
+def rules_fingerprint(rules: Dict) -> str:
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+
+def load_rules(path: Optional[str] = None) -> Dict:
+    """Rules from ``path`` or AUTOSYS_CLASSIFIER_RULES, else DEFAULT_RULES"""
+    path = path or os.getenv("AUTOSYS_CLASSIFIER_RULES")
+    if not path:
+        return DEFAULT_RULES
+    with open(path) as rules_file:
+        return json.load(rules_file)
+
+
+_classifier = None
+
+
+def get_classifier() -> RootCauseClassifier:
+    """Process-wide classifier built from the configured rules"""
+    global _classifier
+    if _classifier is None:
+        _classifier = RootCauseClassifier(load_rules())
+    return _classifier
+
+
+def reset_classifier():
+    """Rebuild the process-wide classifier from the configured rules on next use"""
+    global _classifier
+    _classifier = None
+
+
+# Parallel reclassification: worker processes read and label id ranges,
+# the parent is the only writer. Workers start from a forkserver (spawn where
+# there is none) rather than a fork of a parent that may be running server
+# threads and holding pooled connections.
+
+TEXT_FIELDS = ["short_description", "description", "work_notes"]
+LABEL_FIELDS = ["root_cause", "root_cause_category", "issue_type"]
+
+_worker_classifier = None
+
+
+def _worker_context():
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        # Import the dashboard module once in the server instead of in every worker
+        context.set_forkserver_preload(["autosys_incident_dashboard"])
+    return context
+
+
+def _init_worker(rules: Dict):
+    global _worker_classifier
+    from autosys_incident_dashboard import engine
+    # Connections opened while the preloaded module was imported must not be shared
+    engine.dispose(close=False)
+    _worker_classifier = RootCauseClassifier(rules)
+
+
+def _classify_id_range(start_id: int, end_id: int) -> Tuple[List[Dict], Counter, int]:
+    """Label incidents with start_id <= id < end_id; returns the changed ones, rule hits and row count
+
+    Each changed incident carries the columns it was read with, so the parent
+    only writes it if they are still current.
+    """
+    from sqlalchemy import select
+    from autosys_incident_dashboard import AutosysIncident, PATTERN_FIELDS, engine
+
+    table = AutosysIncident.__table__
+    columns = dict.fromkeys(["id"] + TEXT_FIELDS + LABEL_FIELDS + PATTERN_FIELDS)
+    stmt = select(*[table.c[name] for name in columns]).where(table.c.id >= start_id, table.c.id < end_id)
+    with engine.connect() as conn:
+        rows = [dict(row._mapping) for row in conn.execute(stmt)]
+
+    hits = Counter()
+    changed = []
+    for row in rows:
+        labels, cause_rule, issue_rule = _worker_classifier.classify(*(row[name] for name in TEXT_FIELDS))
+        hits[f"root_cause:{cause_rule or UNMATCHED}"] += 1
+        hits[f"issue_type:{issue_rule or UNMATCHED}"] += 1
+        if any(row[name] != labels[name] for name in LABEL_FIELDS):
+            changed.append({"id": row["id"], "read": {name: row[name] for name in columns if name != "id"},
+                            "labels": labels})
+    return changed, hits, len(rows)
+
+
+def reclassify_all(rules: Optional[Dict] = None, workers: Optional[int] = None,
+                   chunk_size: int = 20000, force: bool = False) -> Dict:
+    """Relabel every incident with ``rules`` if they differ from the last run's (or ``force``)
+
+    Each id range commits on its own, so the incident sync keeps writing
+    while a run is in progress. An incident whose text or labels changed
+    after a worker read it is left to the writer that changed it.
+    """
+    from sqlalchemy import and_, bindparam, func, select
+    from autosys_incident_dashboard import (
+        PATTERN_FIELDS, AutosysIncident, PatternDelta, SessionLocal, SyncState, bump_data_version,
+    )
+
+    rules = rules or load_rules()
+    fingerprint = rules_fingerprint(rules)
+    table = AutosysIncident.__table__
+    db = SessionLocal()
+    try:
+        state = db.query(SyncState).filter(SyncState.name == RULES_STATE_NAME).first()
+        if not force and state and state.details and json.loads(state.details).get("fingerprint") == fingerprint:
+            # Another process may have run the relabelling this one's classifier predates
+            reset_classifier()
+            return {"skipped": True, "reason": "rules unchanged", "fingerprint": fingerprint}
+
+        min_id, max_id = db.execute(select(func.min(table.c.id), func.max(table.c.id))).one()
+        ranges = [] if min_id is None else [
+            (start, min(start + chunk_size, max_id + 1)) for start in range(min_id, max_id + 1, chunk_size)
+        ]
+
+        # Only write an incident whose text, labels and pattern fields are as the worker read them
+        guarded = list(dict.fromkeys(TEXT_FIELDS + LABEL_FIELDS + PATTERN_FIELDS))
+        update_stmt = table.update().where(and_(
+            table.c.id == bindparam("b_id"),
+            *[table.c[name].is_not_distinct_from(bindparam(f"o_{name}", type_=table.c[name].type))
+              for name in guarded],
+        )).values({name: bindparam(f"v_{name}") for name in LABEL_FIELDS})
+
+        def params(item):
+            return {
+                "b_id": item["id"],
+                **{f"o_{name}": item["read"][name] for name in guarded},
+                **{f"v_{name}": item["labels"][name] for name in LABEL_FIELDS},
+            }
+
+        def write_range(changed):
+            """Relabel one range's incidents and their patterns in one transaction; returns the count written"""
+            batched = db.get_bind().dialect.supports_sane_multi_rowcount
+            if not batched or db.execute(update_stmt, [params(item) for item in changed]).rowcount != len(changed):
+                # Something else wrote some of these incidents meanwhile: redo the
+                # range row by row to learn which updates applied
+                db.rollback()
+                changed = [item for item in changed if db.execute(update_stmt, params(item)).rowcount == 1]
+            patterns = PatternDelta()
+            for item in changed:
+                old = {name: item["read"][name] for name in PATTERN_FIELDS}
+                patterns.change(old, {**old, **item["labels"]})
+            patterns.apply(db)
+            db.commit()
+            bump_data_version()
+            return len(changed)
+
+        # The fingerprint is stored once every range is written; an interrupted
+        # run is redone, and its workers only report incidents still to relabel
+        hits, records, changed_count, superseded = Counter(), 0, 0, 0
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=_worker_context(),
+                                 initializer=_init_worker, initargs=(rules,)) as pool:
+            futures = [pool.submit(_classify_id_range, start, end) for start, end in ranges]
+            for future in as_completed(futures):
+                changed, range_hits, range_records = future.result()
+                hits.update(range_hits)
+                records += range_records
+                if changed:
+                    written = write_range(changed)
+                    changed_count += written
+                    superseded += len(changed) - written
+
+        state = db.query(SyncState).filter(SyncState.name == RULES_STATE_NAME).first()
+        if state is None:
+            state = SyncState(name=RULES_STATE_NAME)
+            db.add(state)
+        state.details = json.dumps({"fingerprint": fingerprint, "records": records, "changed": changed_count})
+        db.commit()
+        elapsed = time.perf_counter() - started
+        reset_classifier()
+        return {
+            "records": records,
+            "changed": changed_count,
+            "superseded": superseded,
+            "seconds": round(elapsed, 2),
+            "records_per_second": round(records / elapsed, 1) if elapsed else None,
+            "rule_hits": dict(hits.most_common()),
+        }
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rule-based root-cause classifier for Autosys incidents")
+    parser.add_argument("--classify", metavar="TEXT", help="Label one piece of incident text")
+    parser.add_argument("--reclassify", action="store_true", help="Relabel every incident if the rules changed")
+    parser.add_argument("--force", action="store_true", help="With --reclassify, run even if the rules are unchanged")
+    parser.add_argument("--workers", type=int, help="Classifier processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="Incident ids per worker task")
+    parser.add_argument("--export-rules", action="store_true", help="Print the default rules as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.export_rules:
+        print(json.dumps(DEFAULT_RULES, indent=2))
+    elif args.classify:
+        labels, cause_rule, issue_rule = get_classifier().classify(args.classify)
+        print(json.dumps({**labels, "root_cause_rule": cause_rule, "issue_type_rule": issue_rule}, indent=2))
+    elif args.reclassify:
+        print(json.dumps(reclassify_all(workers=args.workers, chunk_size=args.chunk_size, force=args.force), indent=2))
+    else:
+        parser.print_help()
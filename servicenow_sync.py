@@ -0,0 +1,486 @@
+# ServiceNow -> Autosys incident store sync worker
+#
+# Pages through the ServiceNow Table API (incident table) ordered by
+# sys_updated_on, starting at the watermark saved by the previous run, and
+# upserts the records into AutosysIncident keyed by incident_number.
+#
+# Settings (environment or .env):
+#   SERVICENOW_INSTANCE         e.g. https://dev12345.service-now.com
+#   SERVICENOW_USERNAME / SERVICENOW_PASSWORD
+#   SERVICENOW_QUERY            extra encoded query (default: Autosys incidents)
+#   SERVICENOW_PAGE_SIZE        records per request (default 1000)
+#   SERVICENOW_SYNC_INTERVAL    seconds between runs in --loop mode (default 300)
+#   SERVICENOW_SYNC_LAG         seconds the upper bound trails now, to absorb clock
+#                               skew and in-flight ServiceNow transactions (default 60)
+#
+# Usage:
+#   python servicenow_sync.py            # one incremental run
+#   python servicenow_sync.py --loop     # run every SERVICENOW_SYNC_INTERVAL seconds
+#   python servicenow_sync.py --backfill --since 2021-01-01 --window-days 7 --workers 8 --rate 20
+#                                        # parallel historical import; rerun the same
+#                                        # command to resume an interrupted backfill
+#
+# A local stand-in for the Table API: mock_servicenow.py
+
+import os
+import re
+import json
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+
+from autosys_incident_dashboard import SessionLocal, SyncState, upsert_incidents
+from root_cause_classifier import get_classifier
+
+logger = logging.getLogger(__name__)
+
+SERVICENOW_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+SYNC_NAME = "servicenow_incidents"
+DEFAULT_QUERY = "short_descriptionLIKEautosys^ORdescriptionLIKEautosys"
+# Watermark for a first run
+EPOCH = datetime(1970, 1, 1)
+
+INCIDENT_FIELDS = [
+    "sys_id", "number", "short_description", "description", "work_notes", "state", "priority", "severity",
+    "assigned_to", "assignment_group", "opened_at", "closed_at", "resolved_at", "sys_updated_on",
+]
+
+# "Autosys job ETL_DAILY_LOAD failed", "JOB: ETL_DAILY_LOAD", "job_name=ETL_DAILY_LOAD"
+JOB_NAME_RE = re.compile(r"\bjob(?:[ _]?name)?\s*[:=]?\s*([A-Za-z0-9][A-Za-z0-9_.#-]*_[A-Za-z0-9_.#-]+)", re.IGNORECASE)
+# "on autosys-prod-01", "server batch-server-03", "host=etl-server-01", "machine: autosys-prod-02"
+SERVER_RE = re.compile(r"\b(?:on\s+server|server|host|machine|on)\s*[:=]?\s*([A-Za-z][A-Za-z0-9]*(?:[-.][A-Za-z0-9]+)+)", re.IGNORECASE)
+
+
+def parse_job_and_server(*texts: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """First Autosys job name and server mentioned in the given texts"""
+    job_name = server = None
+    for text in texts:
+        if not text:
+            continue
+        if job_name is None:
+            match = JOB_NAME_RE.search(text)
+            if match:
+                job_name = match.group(1).upper()
+        if server is None:
+            match = SERVER_RE.search(text)
+            if match:
+                server = match.group(1).lower()
+        if job_name and server:
+            break
+    return job_name, server
+
+
+def _value(record: Dict, name: str, display: bool = False) -> Optional[str]:
+    """A field from a sysparm_display_value=all record (or a plain one); empty -> None"""
+    field = record.get(name)
+    if isinstance(field, dict):
+        field = field.get("display_value" if display else "value")
+    return field or None
+
+
+def parse_servicenow_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.strptime(value, SERVICENOW_DATETIME_FORMAT) if value else None
+
+
+def incident_row(record: Dict) -> Dict:
+    """Map a ServiceNow incident record to AutosysIncident columns"""
+    short_description = _value(record, "short_description")
+    description = _value(record, "description")
+    work_notes = _value(record, "work_notes", display=True)
+    job_name, server = parse_job_and_server(short_description, description, work_notes)
+
+    # Times stay in UTC, as the Table API returns raw values in UTC
+    opened_at = parse_servicenow_datetime(_value(record, "opened_at"))
+    closed_at = parse_servicenow_datetime(_value(record, "closed_at") or _value(record, "resolved_at"))
+    resolution_hours = None
+    if opened_at and closed_at:
+        resolution_hours = int((closed_at - opened_at).total_seconds() // 3600)
+
+    return {
+        "incident_number": _value(record, "number"),
+        "autosys_job_name": job_name,
+        "autosys_server": server,
+        "severity": _value(record, "severity", display=True),
+        "priority": _value(record, "priority", display=True),
+        "state": _value(record, "state", display=True),
+        "assigned_to": _value(record, "assigned_to", display=True),
+        "assignment_group": _value(record, "assignment_group", display=True),
+        "opened_at": opened_at,
+        "closed_at": closed_at,
+        "resolution_time_hours": resolution_hours,
+        "short_description": short_description,
+        "description": description,
+        "work_notes": work_notes,
+    }
+
+
+def store_page(db, page: List[Dict]) -> int:
+    """Map, classify and upsert one page of ServiceNow records"""
+    rows = get_classifier().classify_rows(incident_row(record) for record in page)
+    # Labels come from the current rules, so updates relabel too
+    return upsert_incidents(db, rows, preserve=())
+
+
+def build_session(username: str, password: str, pool_size: int = 10) -> requests.Session:
+    """Pooled, authenticated session that retries throttling and transient errors"""
+    session = requests.Session()
+    session.auth = HTTPBasicAuth(username, password)
+    session.headers.update({"Accept": "application/json"})
+    retry = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RateLimiter:
+    """Token bucket shared by threads: at most ``rate`` calls per second, bursting to ``burst``"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(int(rate), 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ServiceNowClient:
+    """Reads incidents from the ServiceNow Table API; safe to share between threads"""
+
+    def __init__(self, instance: str, username: str, password: str, query: str = DEFAULT_QUERY,
+                 page_size: int = 1000, pool_size: int = 10, timeout: float = 60,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.table_url = f"{instance.rstrip('/')}/api/now/table/incident"
+        self.query = query
+        self.page_size = page_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._credentials = (username, password, pool_size)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """This thread's pooled session (sessions keep cookies, so they are not shared)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = build_session(*self._credentials)
+        return session
+
+    @classmethod
+    def from_env(cls, **overrides) -> "ServiceNowClient":
+        options = {
+            "instance": os.getenv("SERVICENOW_INSTANCE"),
+            "username": os.getenv("SERVICENOW_USERNAME"),
+            "password": os.getenv("SERVICENOW_PASSWORD"),
+            "query": os.getenv("SERVICENOW_QUERY", DEFAULT_QUERY),
+            "page_size": int(os.getenv("SERVICENOW_PAGE_SIZE", "1000")),
+            **overrides,
+        }
+        if not options["instance"]:
+            raise ValueError("SERVICENOW_INSTANCE is not set")
+        return cls(**options)
+
+    def window_query(self, start: datetime, end: datetime, after: Optional[Tuple[str, str]] = None) -> str:
+        """Encoded query for records updated in [start, end), oldest first.
+
+        With ``after`` (the sys_updated_on, sys_id of the last record seen) only
+        the records that sort after it: updated later, or at the same second
+        with a greater sys_id. ^NQ starts the second OR-ed branch.
+        """
+        upper = f"^sys_updated_on<{end.strftime(SERVICENOW_DATETIME_FORMAT)}"
+        if self.query:
+            upper += f"^{self.query}"
+        if after is None:
+            query = f"sys_updated_on>={start.strftime(SERVICENOW_DATETIME_FORMAT)}{upper}"
+        else:
+            updated_on, sys_id = after
+            query = f"sys_updated_on>{updated_on}{upper}^NQsys_updated_on={updated_on}^sys_id>{sys_id}{upper}"
+        return query + "^ORDERBYsys_updated_on^ORDERBYsys_id"
+
+    def fetch_page(self, start: datetime, end: datetime, after: Optional[Tuple[str, str]] = None) -> List[Dict]:
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        response = self.session.get(
+            self.table_url,
+            params={
+                "sysparm_query": self.window_query(start, end, after),
+                "sysparm_fields": ",".join(INCIDENT_FIELDS),
+                "sysparm_display_value": "all",
+                "sysparm_exclude_reference_link": "true",
+                "sysparm_limit": self.page_size,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json().get("result", [])
+
+    def iter_pages(self, start: datetime, end: datetime) -> Iterator[List[Dict]]:
+        """Pages of records updated in [start, end).
+
+        Each page resumes after the last (sys_updated_on, sys_id) seen rather
+        than at an offset: a record updated during the walk leaves the window
+        (its sys_updated_on moves past ``end``, where the next run picks it
+        up), and with offsets every later record would shift down one place
+        and one of them would be skipped.
+        """
+        after = None
+        while True:
+            page = self.fetch_page(start, end, after)
+            if page:
+                yield page
+            if len(page) < self.page_size:
+                return
+            after = (_value(page[-1], "sys_updated_on"), _value(page[-1], "sys_id"))
+
+
+def load_state(db, name: str) -> SyncState:
+    state = db.query(SyncState).filter(SyncState.name == name).first()
+    if state is None:
+        state = SyncState(name=name)
+        db.add(state)
+        db.commit()
+    return state
+
+
+class ServiceNowSync:
+    """Incremental sync: everything updated since the saved watermark"""
+
+    def __init__(self, client: ServiceNowClient, name: str = SYNC_NAME,
+                 lag_seconds: Optional[int] = None):
+        self.client = client
+        self.name = name
+        self.lag = timedelta(seconds=lag_seconds if lag_seconds is not None
+                             else int(os.getenv("SERVICENOW_SYNC_LAG", "60")))
+
+    def run_once(self) -> Dict:
+        db = SessionLocal()
+        try:
+            state = load_state(db, self.name)
+            start = state.watermark or EPOCH
+            end = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) - self.lag
+            if end <= start:
+                return {"synced": 0, "watermark": start.isoformat()}
+
+            started = time.perf_counter()
+            synced = 0
+            for page in self.client.iter_pages(start, end):
+                synced += store_page(db, page)
+
+            # Only advance once the whole window is stored, so a failed run repeats it
+            state.watermark = end
+            db.commit()
+            elapsed = time.perf_counter() - started
+            logger.info(f"ServiceNow sync stored {synced} incidents updated before {end} in {elapsed:.1f}s")
+            return {"synced": synced, "watermark": end.isoformat(), "seconds": round(elapsed, 2)}
+        finally:
+            db.close()
+
+    def run_forever(self, interval: float, stop_event: Optional[threading.Event] = None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"ServiceNow sync failed: {e}")
+            stop_event.wait(interval)
+
+
+class ServiceNowBackfill:
+    """Historical import of [since, until) split into windows fetched in parallel.
+
+    Fetch threads page through their windows and hand each page to a queue;
+    one writer thread owns the database session and upserts pages in arrival
+    order, so SQLite never sees concurrent writers. A window's end marker
+    follows its last page through the queue, so a window is checkpointed only
+    after all of its rows are stored. Rerunning the same backfill skips the
+    finished windows.
+
+    Checkpoints are keyed on ``since`` and the window length. Without
+    ``until`` the first run resolves it to now minus SERVICENOW_SYNC_LAG and
+    saves it, and later runs resume up to that same bound.
+    """
+
+    def __init__(self, client: ServiceNowClient, since: datetime, until: Optional[datetime] = None,
+                 window: timedelta = timedelta(days=7), workers: int = 4, queue_size: int = 32):
+        self.client = client
+        self.since = since
+        self.until = until
+        self.window = window
+        self.workers = workers
+        self.queue_size = queue_size
+        self.name = f"backfill:{since:%Y%m%d%H%M%S}:{int(window.total_seconds())}s"
+
+    def resolve_until(self, saved: Optional[str]) -> datetime:
+        """The saved bound of an earlier run, else the requested one, else now minus the lag"""
+        if saved is not None:
+            saved = datetime.fromisoformat(saved)
+            if self.until is not None and self.until != saved:
+                raise ValueError(
+                    f"Backfill {self.name} was started with until={saved.isoformat()}; "
+                    f"rerun with that bound or without --until to resume it"
+                )
+            return saved
+        if self.until is not None:
+            return self.until
+        lag = timedelta(seconds=int(os.getenv("SERVICENOW_SYNC_LAG", "60")))
+        return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0) - lag
+
+    def windows(self) -> List[Tuple[datetime, datetime]]:
+        windows, start = [], self.since
+        while start < self.until:
+            end = min(start + self.window, self.until)
+            windows.append((start, end))
+            start = end
+        return windows
+
+    def run(self) -> Dict:
+        db = SessionLocal()
+        try:
+            state = load_state(db, self.name)
+            details = json.loads(state.details) if state.details else {}
+            done = set(details.get("done", []))
+            self.until = self.resolve_until(details.get("until"))
+            state.details = json.dumps({"until": self.until.isoformat(), "done": sorted(done)})
+            db.commit()
+            pending = [window for window in self.windows() if window[0].isoformat() not in done]
+            logger.info(f"Backfill {self.name}: {len(pending)} of {len(self.windows())} windows to fetch")
+
+            pages = queue.Queue(maxsize=self.queue_size)
+            stop = threading.Event()
+            stored = [0]
+            writer_errors = []
+
+            def write():
+                while True:
+                    item = pages.get()
+                    if item is None:
+                        return
+                    if writer_errors:
+                        continue
+                    kind, window_start, payload = item
+                    try:
+                        if kind == "page":
+                            stored[0] += store_page(db, payload)
+                        else:
+                            done.add(window_start.isoformat())
+                            state.details = json.dumps({"until": self.until.isoformat(), "done": sorted(done)})
+                            db.commit()
+                    except Exception as e:
+                        logger.error(f"Backfill writer failed: {e}")
+                        writer_errors.append(e)
+                        stop.set()
+
+            def fetch(window):
+                start, end = window
+                for page in self.client.iter_pages(start, end):
+                    if stop.is_set():
+                        return
+                    pages.put(("page", start, page))
+                pages.put(("window", start, None))
+
+            started = time.perf_counter()
+            writer = threading.Thread(target=write, name="backfill-writer")
+            writer.start()
+            failed = []
+            try:
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill-fetch") as pool:
+                    futures = {pool.submit(fetch, window): window for window in pending}
+                    try:
+                        for future, window in futures.items():
+                            try:
+                                future.result()
+                            except Exception as e:
+                                logger.error(f"Backfill window {window[0]} - {window[1]} failed: {e}")
+                                failed.append(window)
+                    except KeyboardInterrupt:
+                        # Inside the with block: leaving it waits for the pool, so drop the
+                        # queued windows and stop the running ones after their current page
+                        stop.set()
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        raise
+            finally:
+                pages.put(None)
+                writer.join()
+
+            if writer_errors:
+                raise writer_errors[0]
+
+            complete = not failed and len(done) == len(self.windows())
+            if complete:
+                # Incremental sync carries on from where the history ends
+                sync_state = load_state(db, SYNC_NAME)
+                if sync_state.watermark is None or sync_state.watermark < self.until:
+                    sync_state.watermark = self.until
+                    db.commit()
+
+            elapsed = time.perf_counter() - started
+            return {
+                "stored": stored[0],
+                "windows_fetched": len(pending) - len(failed),
+                "windows_failed": [start.isoformat() for start, _ in failed],
+                "complete": complete,
+                "seconds": round(elapsed, 2),
+                "records_per_second": round(stored[0] / elapsed, 1) if elapsed else None,
+            }
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sync ServiceNow incidents into the Autosys incident store")
+    parser.add_argument("--loop", action="store_true", help="Sync every SERVICENOW_SYNC_INTERVAL seconds")
+    parser.add_argument("--backfill", action="store_true", help="Parallel import of a historical range")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Backfill start (UTC, ISO date)")
+    parser.add_argument("--until", type=datetime.fromisoformat,
+                        help="Backfill end (UTC, ISO date; default now minus SERVICENOW_SYNC_LAG, "
+                             "fixed by the first run of a backfill)")
+    parser.add_argument("--window-days", type=float, default=7, help="Backfill window length")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent backfill fetchers")
+    parser.add_argument("--rate", type=float, default=10, help="Max Table API requests per second")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.backfill:
+        if not args.since:
+            parser.error("--backfill needs --since")
+        client = ServiceNowClient.from_env(pool_size=args.workers, rate_limiter=RateLimiter(args.rate))
+        backfill = ServiceNowBackfill(client, args.since, args.until, timedelta(days=args.window_days), args.workers)
+        try:
+            print(backfill.run())
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        sync = ServiceNowSync(ServiceNowClient.from_env())
+        if args.loop:
+            sync.run_forever(float(os.getenv("SERVICENOW_SYNC_INTERVAL", "300")))
+        else:
+            print(sync.run_once())
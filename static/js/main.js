@@ -65,6 +65,18 @@ document.addEventListener('DOMContentLoaded', function() {
                 }
             })
             .catch(error => {
+                if (!navigator.onLine) {
+                    // Replayed by the service worker once the connection is back
+                    queueOfflineTaskOperation({
+                        op: 'update',
+                        task_id: Number(taskId),
+                        fields: {status: newStatus},
+                        updated_at: new Date().toISOString()
+                    }).then(() => {
+                        showNotification('You are offline. The status change will sync when you reconnect.', 'warning');
+                    });
+                    return;
+                }
                 console.error('Error:', error);
                 showNotification('An error occurred while updating status', 'danger');
                 selectElement.value = originalValue;
@@ -292,8 +304,9 @@ function getCookie(name) {
     return cookieValue;
 }
 
-// Helper function to show notifications
-function showNotification(message, type = 'info') {
+// Helper function to show notifications. The message is set as text, so it
+// may contain user data; pass `link` ({text, href}) for a trailing link.
+function showNotification(message, type = 'info', link = null) {
     const alertDiv = document.createElement('div');
     alertDiv.className = `alert alert-${type} alert-dismissible fade show position-fixed`;
     
@@ -304,10 +317,19 @@ function showNotification(message, type = 'info') {
         alertDiv.style.cssText = 'top: 20px; right: 20px; z-index: 1050; min-width: 300px;';
     }
     
-    alertDiv.innerHTML = `
-        ${message}
-        <button type="button" class="btn-close" data-bs-dismiss="alert" aria-label="Close"></button>
-    `;
+    alertDiv.textContent = message;
+    if (link) {
+        const anchor = document.createElement('a');
+        anchor.href = link.href;
+        anchor.textContent = link.text;
+        alertDiv.append(' ', anchor);
+    }
+    const closeButton = document.createElement('button');
+    closeButton.type = 'button';
+    closeButton.className = 'btn-close';
+    closeButton.dataset.bsDismiss = 'alert';
+    closeButton.setAttribute('aria-label', 'Close');
+    alertDiv.appendChild(closeButton);
     
     document.body.appendChild(alertDiv);
     
@@ -345,6 +367,73 @@ function updateStatusBadges(taskId, newStatus) {
     });
 }
 
+// Helper function to queue a task operation for the service worker's background sync
+function queueOfflineTaskOperation(operation) {
+    operation.idempotency_key = operation.idempotency_key ||
+        (window.crypto && crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`);
+
+    return new Promise((resolve, reject) => {
+        const request = indexedDB.open('sb-vws-offline', 1);
+        request.onupgradeneeded = () => {
+            request.result.createObjectStore('operations', { keyPath: 'seq', autoIncrement: true });
+        };
+        request.onerror = () => reject(request.error);
+        request.onsuccess = () => {
+            const tx = request.result.transaction('operations', 'readwrite');
+            tx.objectStore('operations').add({operation: operation, csrfToken: getCookie('csrftoken')});
+            tx.oncomplete = () => resolve(operation);
+            tx.onerror = () => reject(tx.error);
+        };
+    }).then(queued => {
+        if ('serviceWorker' in navigator && 'SyncManager' in window) {
+            navigator.serviceWorker.ready.then(registration => registration.sync.register('background-sync'));
+        }
+        return queued;
+    });
+}
+
+// Helper function to subscribe to live task events (Server-Sent Events)
+function subscribeToTaskEvents(handlers) {
+    if (!window.EventSource) return null;
+
+    const source = new EventSource('/tasks/events/');
+    ['created', 'updated', 'deleted'].forEach(eventType => {
+        if (handlers[eventType]) {
+            source.addEventListener(eventType, function(e) {
+                handlers[eventType](JSON.parse(e.data));
+            });
+        }
+    });
+
+    // Close the stream on navigation so the server releases it promptly
+    window.addEventListener('pagehide', () => source.close());
+    return source;
+}
+
+// Helper function to patch status and priority badges for a task in place
+function applyTaskUpdate(task) {
+    const statusClasses = {
+        'pending': 'bg-warning',
+        'in_progress': 'bg-info',
+        'completed': 'bg-success',
+        'cancelled': 'bg-danger'
+    };
+
+    document.querySelectorAll(`[data-task-row="${task.id}"]`).forEach(row => {
+        row.querySelectorAll('.task-status-badge').forEach(badge => {
+            badge.textContent = task.status_display;
+            badge.className = badge.className.replace(/bg-\w+/, '');
+            badge.classList.add(statusClasses[task.status] || 'bg-secondary');
+        });
+
+        row.querySelectorAll('.task-priority-badge').forEach(badge => {
+            badge.textContent = task.priority_display;
+            badge.className = badge.className.replace(/badge-\w+/, '');
+            badge.classList.add(task.priority_badge_class);
+        });
+    });
+}
+
 // Form validation enhancement
 document.addEventListener('submit', function(e) {
     const form = e.target;
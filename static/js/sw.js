@@ -58,12 +58,84 @@ self.addEventListener('sync', function(event) {
   }
 });
 
+// Offline operations queued by the pages (see queueOfflineTaskOperation in main.js)
+const OFFLINE_DB_NAME = 'sb-vws-offline';
+const OFFLINE_STORE = 'operations';
+const SYNC_BATCH_SIZE = 100;
+
+function openOfflineQueue() {
+  return new Promise(function(resolve, reject) {
+    const request = indexedDB.open(OFFLINE_DB_NAME, 1);
+    request.onupgradeneeded = function() {
+      request.result.createObjectStore(OFFLINE_STORE, { keyPath: 'seq', autoIncrement: true });
+    };
+    request.onsuccess = function() { resolve(request.result); };
+    request.onerror = function() { reject(request.error); };
+  });
+}
+
+function readQueuedOperations(db) {
+  return new Promise(function(resolve, reject) {
+    const request = db.transaction(OFFLINE_STORE, 'readonly').objectStore(OFFLINE_STORE).getAll();
+    request.onsuccess = function() { resolve(request.result); };
+    request.onerror = function() { reject(request.error); };
+  });
+}
+
+function removeQueuedOperations(db, entries) {
+  return new Promise(function(resolve, reject) {
+    const tx = db.transaction(OFFLINE_STORE, 'readwrite');
+    entries.forEach(function(entry) {
+      tx.objectStore(OFFLINE_STORE).delete(entry.seq);
+    });
+    tx.oncomplete = function() { resolve(); };
+    tx.onerror = function() { reject(tx.error); };
+  });
+}
+
 function doBackgroundSync() {
-  // Handle offline form submissions
-  return new Promise(function(resolve) {
-    // Check for pending form submissions in IndexedDB
-    // and sync them when back online
-    resolve();
+  // Flush queued offline submissions in batches, oldest first. A rejected
+  // promise makes the browser retry the sync later; the idempotency keys make
+  // re-sending an already applied operation harmless.
+  return openOfflineQueue().then(function(db) {
+    return readQueuedOperations(db).then(function(entries) {
+      if (!entries.length) {
+        return;
+      }
+      const batch = entries.slice(0, SYNC_BATCH_SIZE);
+
+      return fetch('/tasks/sync/', {
+        method: 'POST',
+        credentials: 'same-origin',
+        headers: {
+          'Content-Type': 'application/json',
+          'X-CSRFToken': batch[batch.length - 1].csrfToken
+        },
+        body: JSON.stringify({
+          operations: batch.map(function(entry) { return entry.operation; })
+        })
+      })
+        .then(function(response) {
+          if (!response.ok) {
+            throw new Error('Background sync failed with status ' + response.status);
+          }
+          return response.json();
+        })
+        .then(function(data) {
+          return removeQueuedOperations(db, batch).then(function() {
+            return self.clients.matchAll().then(function(clientList) {
+              clientList.forEach(function(client) {
+                client.postMessage({ type: 'sync-results', results: data.results });
+              });
+            });
+          });
+        })
+        .then(function() {
+          if (entries.length > batch.length) {
+            return doBackgroundSync();
+          }
+        });
+    });
   });
 }
 
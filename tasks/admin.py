@@ -1,5 +1,73 @@
-from django.contrib import admin
-from .models import Task, Assignee
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from .bulk import bulk_update_tasks, reassign_tasks, bulk_delete_tasks, bulk_delete_assignees
+from .counts import get_counts
+from .db import run_serialized
+from .forms import ReassignTasksForm
+from .models import Task, Assignee, TASK_SEARCH_DOCUMENT_SQL
+import functools
+import re
+
+
+class CachedAllValuesFieldListFilter(admin.AllValuesFieldListFilter):
+    """Distinct-values filter whose SELECT DISTINCT is cached between page loads"""
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        choices = self.lookup_choices
+        self.lookup_choices = cache.get_or_set(
+            f'admin_filter_choices:{model._meta.label_lower}.{field_path}',
+            lambda: list(choices),
+            settings.TASK_ADMIN_FILTER_CACHE_SECONDS,
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Use the maintained table count for the unfiltered changelist"""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return get_counts()['total_all_tasks']
+        return super().count
+
+
+def confirm_bulk_action(modeladmin, request, queryset, action, title, message, **extra_context):
+    """Intermediate confirmation page for a bulk action; re-posts the selection"""
+    opts = modeladmin.model._meta
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        'title': title,
+        'message': message,
+        'opts': opts,
+        'action': action,
+        'count': queryset.count(),
+        'preview': queryset[:20],
+        'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+        'select_across': request.POST.get('select_across', '0'),
+        'action_checkbox_name': ACTION_CHECKBOX_NAME,
+        **extra_context,
+    }
+    return TemplateResponse(request, 'admin/tasks/bulk_action_confirmation.html', context)
+
+
+def set_task_field_action(field, value, label):
+    """Admin action setting ``field`` to ``value`` on the selection with one UPDATE"""
+    @admin.action(description=f'Set {field} to "{label}"', permissions=['change'])
+    def action(modeladmin, request, queryset):
+        count = run_serialized(bulk_update_tasks, queryset, request.user, **{field: value})
+        modeladmin.message_user(request, f'{count} tasks set to {label}.', messages.SUCCESS)
+    
+    action.__name__ = f'set_{field}_{value}'
+    return action
 
 
 @admin.register(Assignee)
@@ -19,16 +87,47 @@ class AssigneeAdmin(admin.ModelAdmin):
         }),
     )
     readonly_fields = ['created_at', 'updated_at']
+    actions = ['delete_assignees']
+    
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Replaced by delete_assignees, which doesn't load and delete row by row
+        actions.pop('delete_selected', None)
+        return actions
+    
+    @admin.action(description='Delete selected assignees', permissions=['delete'])
+    def delete_assignees(self, request, queryset):
+        if request.POST.get('post') != 'yes':
+            return confirm_bulk_action(
+                self, request, queryset, 'delete_assignees', 'Delete assignees',
+                'Tasks keep the assignee name, email and location they were created with.',
+            )
+        count = run_serialized(bulk_delete_assignees, queryset, log_deletions=functools.partial(self.log_deletions, request))
+        self.message_user(request, f'{count} assignees deleted.', messages.SUCCESS)
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ['title', 'owner', 'assigned_by', 'assignee_name', 'status', 'priority', 'due_date', 'created_at']
-    list_filter = ['status', 'priority', 'created_at', 'due_date', 'assignee_location']
+    list_filter = ['status', 'priority', 'created_at', 'due_date', ('assignee_location', CachedAllValuesFieldListFilter)]
     search_fields = ['title', 'description', 'assignee_name', 'assignee_email']
     list_editable = ['status', 'priority']
+    autocomplete_fields = ['owner', 'assigned_by']
     ordering = ['-created_at']
     
+    actions = [
+        *(set_task_field_action('status', value, label) for value, label in Task.STATUS_CHOICES),
+        *(set_task_field_action('priority', value, label) for value, label in Task.PRIORITY_CHOICES),
+        'reassign_selected',
+        'delete_tasks',
+    ]
+    
+    if settings.TASK_ADMIN_SCALABLE:
+        show_full_result_count = False
+        show_facets = admin.ShowFacets.NEVER
+        paginator = EstimatedCountPaginator
+        list_per_page = 50
+    
     fieldsets = (
         ('Task Information', {
             'fields': ('title', 'description', 'status', 'priority')
@@ -47,4 +146,51 @@ class TaskAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('owner', 'assigned_by')
\ No newline at end of file
+        return super().get_queryset(request).select_related('owner', 'assigned_by')
+    
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Replaced by delete_tasks, which doesn't email and log every row separately
+        actions.pop('delete_selected', None)
+        return actions
+    
+    @admin.action(description='Reassign selected tasks', permissions=['change'])
+    def reassign_selected(self, request, queryset):
+        form = ReassignTasksForm(request.POST if request.POST.get('post') == 'yes' else None)
+        if not form.is_valid():
+            return confirm_bulk_action(
+                self, request, queryset, 'reassign_selected', 'Reassign tasks',
+                'Choose the assignee who should take over these tasks.',
+                form=form,
+            )
+        assignee = form.cleaned_data['assignee']
+        count = run_serialized(reassign_tasks, queryset, assignee, request.user)
+        self.message_user(request, f'{count} tasks reassigned to {assignee.name}.', messages.SUCCESS)
+    
+    @admin.action(description='Delete selected tasks', permissions=['delete'])
+    def delete_tasks(self, request, queryset):
+        if request.POST.get('post') != 'yes':
+            return confirm_bulk_action(
+                self, request, queryset, 'delete_tasks', 'Delete tasks',
+                'Each assignee receives one email listing their deleted tasks.',
+            )
+        count = run_serialized(
+            bulk_delete_tasks, queryset, request.user, log_deletions=functools.partial(self.log_deletions, request)
+        )
+        self.message_user(request, f'{count} tasks deleted.', messages.SUCCESS)
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not (settings.TASK_ADMIN_SCALABLE and connection.vendor == 'postgresql'):
+            return super().get_search_results(request, queryset, search_term)
+        
+        # Prefix-match every word against the full-text index
+        words = re.findall(r'\w+', search_term)
+        if not words:
+            return queryset, False
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        match = RawSQL(
+            f"{TASK_SEARCH_DOCUMENT_SQL} @@ to_tsquery('simple', %s)",
+            (tsquery,),
+            output_field=BooleanField(),
+        )
+        return queryset.filter(match), False
@@ -0,0 +1,69 @@
+"""Move old completed/cancelled tasks out of the hot tasks_task table"""
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+from .db import run_serialized
+from .models import Task, ArchivedTask
+from .signals import tasks_bulk_changed
+
+ARCHIVABLE_STATUSES = ['completed', 'cancelled']
+
+# Columns shared by Task and ArchivedTask, in Task's column order
+TASK_COLUMNS = [field.attname for field in Task._meta.concrete_fields]
+
+
+def _archivable(cutoff):
+    return Task.objects.filter(status__in=ARCHIVABLE_STATUSES, updated_at__lt=cutoff)
+
+
+def _archive_batch(task_ids, cutoff):
+    with transaction.atomic():
+        # A task reopened or edited since the id scan is no longer archivable;
+        # lock the rows that still are (SQLite's write lock serializes instead)
+        candidates = _archivable(cutoff).filter(pk__in=task_ids)
+        if connection.features.has_select_for_update:
+            candidates = candidates.select_for_update()
+        rows = list(candidates.values(*TASK_COLUMNS))
+        ArchivedTask.objects.bulk_create([ArchivedTask(**row) for row in rows])
+        # Set-based delete: no per-row post_delete, so no "task deleted" emails
+        queryset = Task.objects.filter(pk__in=[row['id'] for row in rows])
+        queryset._raw_delete(queryset.db)
+        tasks_bulk_changed.send(
+            sender=Task,
+            changes=[(row['id'], row['owner_id'], 'archived') for row in rows],
+        )
+    return len(rows)
+
+
+def archive_tasks(older_than_days, batch_size=500):
+    """Archive tasks completed/cancelled more than ``older_than_days`` ago.
+
+    Works in batches of ``batch_size`` rows, each in its own short
+    transaction, and returns the number of tasks archived.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        task_ids = list(
+            _archivable(cutoff)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not task_ids:
+            return archived
+        archived += run_serialized(_archive_batch, task_ids, cutoff)
+
+
+def tasks_with_archived(task_queryset, archived_queryset):
+    """Union of live and archived tasks, returned as Task instances.
+
+    Every row carries an ``is_archived`` attribute.
+    """
+    live = task_queryset.order_by().annotate(is_archived=Value(False, output_field=BooleanField()))
+    cold = (
+        archived_queryset.order_by()
+        .annotate(is_archived=Value(True, output_field=BooleanField()))
+        .values_list(*TASK_COLUMNS, 'is_archived')
+    )
+    return live.union(cold, all=True)
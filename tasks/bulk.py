@@ -0,0 +1,138 @@
+"""Set-based bulk edits behind the Task and Assignee admin actions.
+
+Each operation is a single UPDATE or DELETE inside one transaction, so
+per-row model signals don't fire. The change log, live streams and cached
+counts are kept in step through ``tasks_bulk_changed``, and every affected
+assignee gets one summary email listing their tasks instead of one email
+per row.
+
+Deletes go through ``QuerySet._raw_delete``, a private Django API: one
+DELETE with no collector, cascades or signals. That is safe only while
+nothing references Task or Assignee rows with on_delete behaviour, so
+recheck both (and this call) when adding such a relation or upgrading
+Django. Callers pass ``log_deletions`` (e.g. ModelAdmin.log_deletions) to
+write the admin audit trail, in the same transaction, before the rows go.
+"""
+import functools
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
+from .cache import task_cache
+from .counts import adjust_count
+from .models import Task, Assignee
+from .signals import tasks_bulk_changed, send_task_notification
+
+# Columns read before a bulk change: enough for the change log and the emails
+SUMMARY_COLUMNS = ['id', 'owner_id', 'title', 'status', 'priority', 'assignee_name', 'assignee_email', 'due_date']
+
+SUMMARY_SUBJECTS = {
+    'updated': 'Tasks Updated',
+    'assigned': 'Tasks Assigned to You',
+    'reassigned': 'Tasks Reassigned',
+    'deleted': 'Tasks Deleted',
+}
+
+
+def _display_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
+def _affected_rows(queryset):
+    return list(queryset.order_by('pk').values(*SUMMARY_COLUMNS))
+
+
+def queue_summary_notifications(rows, action, actor):
+    """Email each assignee once, after commit, listing their affected tasks"""
+    if not getattr(settings, 'TASK_EMAIL_NOTIFICATIONS', True):
+        return
+
+    by_assignee = defaultdict(list)
+    for row in rows:
+        if row['assignee_email']:
+            by_assignee[row['assignee_email']].append(row)
+
+    status_labels = dict(Task.STATUS_CHOICES)
+    priority_labels = dict(Task.PRIORITY_CHOICES)
+    for recipient_email, tasks in by_assignee.items():
+        for task in tasks:
+            task['status_display'] = status_labels.get(task['status'], task['status'])
+            task['priority_display'] = priority_labels.get(task['priority'], task['priority'])
+        context = {
+            'tasks': tasks,
+            'action': action,
+            'owner_name': _display_name(actor),
+            'assignee_name': tasks[0]['assignee_name'],
+        }
+        subject = f"{SUMMARY_SUBJECTS[action]} ({len(tasks)})"
+        html_message = render_to_string('emails/task_summary_notification.html', context)
+        plain_message = strip_tags(html_message)
+        transaction.on_commit(functools.partial(
+            send_task_notification,
+            subject, plain_message, html_message, recipient_email,
+            f"Task {action} summary sent to {recipient_email} for {len(tasks)} tasks",
+        ))
+
+
+def bulk_update_tasks(queryset, actor, **values):
+    """Apply ``values`` to every task in ``queryset`` with one UPDATE"""
+    with transaction.atomic():
+        rows = _affected_rows(queryset)
+        if not rows:
+            return 0
+        count = Task.objects.filter(pk__in=[row['id'] for row in rows]).update(
+            updated_at=timezone.now(), **values
+        )
+        tasks_bulk_changed.send(sender=Task, changes=[(row['id'], row['owner_id'], 'updated') for row in rows])
+        queue_summary_notifications([{**row, **values} for row in rows], 'updated', actor)
+    return count
+
+
+def reassign_tasks(queryset, assignee, actor):
+    """Hand every task in ``queryset`` to ``assignee`` with one UPDATE"""
+    values = {
+        'assignee_name': assignee.name,
+        'assignee_email': assignee.email,
+        'assignee_location': assignee.location,
+    }
+    with transaction.atomic():
+        rows = _affected_rows(queryset)
+        if not rows:
+            return 0
+        count = Task.objects.filter(pk__in=[row['id'] for row in rows]).update(
+            updated_at=timezone.now(), **values
+        )
+        tasks_bulk_changed.send(sender=Task, changes=[(row['id'], row['owner_id'], 'updated') for row in rows])
+        # Previous assignees hear the tasks moved on; the new one gets the full list
+        queue_summary_notifications([row for row in rows if row['assignee_email'] != assignee.email], 'reassigned', actor)
+        queue_summary_notifications([{**row, **values} for row in rows], 'assigned', actor)
+    return count
+
+
+def bulk_delete_tasks(queryset, actor, log_deletions=None):
+    """Delete every task in ``queryset`` with one DELETE"""
+    with transaction.atomic():
+        rows = _affected_rows(queryset)
+        if not rows:
+            return 0
+        targets = Task.objects.filter(pk__in=[row['id'] for row in rows])
+        if log_deletions:
+            log_deletions(targets)
+        count = targets._raw_delete(targets.db)
+        tasks_bulk_changed.send(sender=Task, changes=[(row['id'], row['owner_id'], 'deleted') for row in rows])
+        queue_summary_notifications(rows, 'deleted', actor)
+    return count
+
+
+def bulk_delete_assignees(queryset, log_deletions=None):
+    """Delete every assignee in ``queryset`` with one DELETE (tasks keep their copied details)"""
+    with transaction.atomic():
+        targets = Assignee.objects.filter(pk__in=list(queryset.values_list('pk', flat=True)))
+        if log_deletions:
+            log_deletions(targets)
+        count = targets._raw_delete(targets.db)
+        adjust_count(Assignee, -count)
+        task_cache.invalidate_on_commit('assignees')
+    return count
@@ -0,0 +1,185 @@
+"""Two-tier cache for the tasks app.
+
+L1 is a bounded in-process LRU with a short TTL; L2 is the shared Django
+cache (``CACHES['default']``: file, database or Redis). Keys belong to a
+family ("assignees", "users") and embed that family's version number,
+kept in L2. Model signals call ``invalidate``, which bumps the version so
+every worker misses on its next lookup; L1 copies of the version expire
+after TASK_CACHE_L1_TTL seconds. Hits and misses are
+counted per family and reported by /metrics/.
+
+File and database caches cull entries past MAX_ENTRIES, version keys
+included, so a version that has to be recreated starts from the current
+time in microseconds rather than 1: it is always ahead of any version whose
+entries may still be in L2.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from .metrics import register
+from .models import Assignee
+from .snapshots import get_snapshot
+
+KEY_PREFIX = 'tasks'
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TwoTierCache:
+    def __init__(self, alias='default', max_entries=1024, ttl=5.0):
+        self.alias = alias
+        self.l1 = LRUCache(max_entries, ttl)
+        self._stats = defaultdict(lambda: {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'invalidations': 0})
+        self._stats_lock = threading.Lock()
+
+    @property
+    def l2(self):
+        return caches[self.alias]
+
+    def _count(self, family, outcome):
+        with self._stats_lock:
+            self._stats[family][outcome] += 1
+
+    def _version_key(self, family, scope):
+        return f'{KEY_PREFIX}:version:{family}' + (f':{scope}' if scope is not None else '')
+
+    @staticmethod
+    def _initial_version():
+        return time.time_ns() // 1000
+
+    def _version(self, family, scope):
+        version_key = self._version_key(family, scope)
+        version = self.l1.get(version_key)
+        if version is _MISSING:
+            version = self.l2.get(version_key)
+            if version is None:
+                version = self._initial_version()
+                if not self.l2.add(version_key, version, timeout=None):
+                    # Another worker created it first
+                    version = self.l2.get(version_key, version)
+            self.l1.set(version_key, version)
+        return version
+
+    def get_or_set(self, family, key, default, scope=None, timeout=None):
+        """Return the cached value, calling ``default()`` on a miss in both tiers"""
+        full_key = f'{KEY_PREFIX}:{family}:v{self._version(family, scope)}:{key}'
+
+        value = self.l1.get(full_key)
+        if value is not _MISSING:
+            self._count(family, 'l1_hits')
+            return value
+
+        value = self.l2.get(full_key, _MISSING)
+        if value is not _MISSING:
+            self._count(family, 'l2_hits')
+        else:
+            self._count(family, 'misses')
+            value = default()
+            self.l2.set(full_key, value, timeout=timeout or settings.CACHE_TIMEOUT)
+        self.l1.set(full_key, value)
+        return value
+
+    def invalidate(self, family, scope=None):
+        """Retire every cached key of the family (or of one scope within it)"""
+        version_key = self._version_key(family, scope)
+        try:
+            self.l2.incr(version_key)
+        except ValueError:
+            self.l2.set(version_key, self._initial_version(), timeout=None)
+        self.l1.delete(version_key)
+        self._count(family, 'invalidations')
+
+    def invalidate_on_commit(self, family, scope=None):
+        """Invalidate once the current transaction commits, so readers can't re-cache old rows"""
+        transaction.on_commit(lambda: self.invalidate(family, scope))
+
+    def stats(self):
+        with self._stats_lock:
+            families = {family: dict(counts) for family, counts in self._stats.items()}
+        for counts in families.values():
+            lookups = counts['l1_hits'] + counts['l2_hits'] + counts['misses']
+            counts['hit_rate'] = round((counts['l1_hits'] + counts['l2_hits']) / lookups, 3) if lookups else None
+        return {'l1_entries': len(self.l1), 'l1_max_entries': self.l1.max_entries, 'families': families}
+
+
+task_cache = TwoTierCache(
+    max_entries=getattr(settings, 'TASK_CACHE_L1_MAX_ENTRIES', 1024),
+    ttl=getattr(settings, 'TASK_CACHE_L1_TTL', 5.0),
+)
+
+register('cache', task_cache.stats)
+
+
+# Helpers for the views and forms
+
+def assignee_choices():
+    """(name, name) choices for the task form's assignee select"""
+    return task_cache.get_or_set(
+        'assignees', 'choices',
+        lambda: list(Assignee.objects.order_by('name').values_list('name', 'name')),
+    )
+
+
+def lookup_assignee(name):
+    """Email and location for an assignee name, or None if there is no such assignee"""
+    directory = task_cache.get_or_set(
+        'assignees', 'directory',
+        lambda: {
+            name: {'email': email, 'location': location}
+            for name, email, location in Assignee.objects.values_list('name', 'email', 'location')
+        },
+    )
+    return directory.get(name)
+
+
+def user_choices():
+    """(id, display name) choices for the task form's "assigned by" select"""
+    return task_cache.get_or_set(
+        'users', 'choices',
+        lambda: [(user.id, user.get_full_name() or user.username) for user in User.objects.all()],
+    )
+
+
+def task_stats(owner_id=None):
+    """Dashboard task counts for one owner (or all tasks), served from the precomputed snapshot"""
+    return get_snapshot(owner_id)['stats']
@@ -0,0 +1,68 @@
+"""Constant-time global row counts for the staff pages.
+
+Counts live in TableCount and are adjusted by signals as rows come and go,
+so reading them is one small query no matter how large the tables grow.
+``refresh_counts`` corrects any drift: it is run in the background by the
+``refresh_table_counts`` command and on demand from the admin panel.
+Missing rows are seeded from PostgreSQL's ``reltuples`` estimate (constant
+time) or, on other databases, from an exact count.
+"""
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Task, Assignee, TableCount
+
+# Context key -> counted model
+COUNTED_MODELS = {
+    'total_assignees': Assignee,
+    'total_users': User,
+    'total_all_tasks': Task,
+}
+
+
+def _estimate(model):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 for a table that was never vacuumed/analyzed
+    return max(row[0], 0) if row else 0
+
+
+def refresh_counts(exact=True, models=None):
+    """Recount the tables (exactly, or from the planner estimate on PostgreSQL)"""
+    now = timezone.now()
+    for model in models or COUNTED_MODELS.values():
+        use_estimate = not exact and connection.vendor == 'postgresql'
+        count = _estimate(model) if use_estimate else model.objects.count()
+        TableCount.objects.update_or_create(
+            table=model._meta.db_table,
+            defaults={'count': count, 'is_exact': not use_estimate, 'refreshed_at': now},
+        )
+
+
+def adjust_count(model, delta):
+    """Apply a row-count delta once the current transaction commits"""
+    if delta:
+        transaction.on_commit(
+            lambda: TableCount.objects.filter(table=model._meta.db_table).update(count=F('count') + delta)
+        )
+
+
+def get_counts():
+    """Return the cached global counts plus their freshness"""
+    tables = {model._meta.db_table: key for key, model in COUNTED_MODELS.items()}
+    rows = {row.table: row for row in TableCount.objects.filter(table__in=tables)}
+
+    missing = [model for model in COUNTED_MODELS.values() if model._meta.db_table not in rows]
+    if missing:
+        refresh_counts(exact=False, models=missing)
+        rows = {row.table: row for row in TableCount.objects.filter(table__in=tables)}
+
+    counts = {key: max(rows[table].count, 0) for table, key in tables.items()}
+    counts['counts_exact'] = all(row.is_exact for row in rows.values())
+    counts['counts_refreshed_at'] = min(row.refreshed_at for row in rows.values())
+    return counts
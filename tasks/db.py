@@ -0,0 +1,51 @@
+"""Write serialization for the production SQLite mode.
+
+SQLite allows one writer at a time. With SQLITE_PRODUCTION enabled, writes
+run through ``run_serialized`` queue on a per-process lock, and the busy
+timeout queues them across processes. A write that still fails with
+"database is locked" is retried with jittered exponential backoff. On other
+databases, or inside an outer transaction that cannot be retried, the
+function simply runs.
+"""
+import logging
+import random
+import threading
+import time
+from django.conf import settings
+from django.db import connection, transaction, OperationalError
+
+logger = logging.getLogger(__name__)
+
+WRITE_RETRIES = 5
+WRITE_BACKOFF_SECONDS = 0.05
+
+_write_lock = threading.Lock()
+
+
+def _is_locked_error(error):
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+
+def run_serialized(func, *args, **kwargs):
+    """Call ``func`` in its own short transaction, one writer at a time"""
+    if (
+        not getattr(settings, 'SQLITE_PRODUCTION', False)
+        or connection.vendor != 'sqlite'
+        or connection.in_atomic_block
+    ):
+        return func(*args, **kwargs)
+
+    attempt = 0
+    while True:
+        with _write_lock:
+            try:
+                with transaction.atomic():
+                    return func(*args, **kwargs)
+            except OperationalError as e:
+                if not _is_locked_error(e) or attempt >= WRITE_RETRIES:
+                    raise
+        attempt += 1
+        delay = WRITE_BACKOFF_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+        logger.warning(f"SQLite write locked, retry {attempt}/{WRITE_RETRIES} in {delay:.2f}s")
+        time.sleep(delay)
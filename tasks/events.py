@@ -0,0 +1,183 @@
+"""Live task updates for Server-Sent Events streams.
+
+Changes are read from the TaskChange log, so a change committed by any
+process (another ASGI worker, the Procfile worker, archive_tasks, admin bulk
+actions) reaches every stream. One TaskChangePoller per process polls the log
+for the users with open streams and hands events to the in-process
+TaskEventBus, which fans them out to those streams (async, on the ASGI event
+loop). Each subscriber owns a bounded asyncio queue, so a slow browser can
+only drop its own events and never blocks the poller.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task, TaskChange
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 100
+POLL_BATCH_SIZE = 1000
+
+
+def serialize_task(task):
+    """Return the fields the task pages need to patch a row in place"""
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'status': task.status,
+        'status_display': task.get_status_display(),
+        'priority': task.priority,
+        'priority_display': task.get_priority_display(),
+        'priority_badge_class': task.get_priority_badge_class(),
+        'assignee_name': task.assignee_name,
+        'updated_at': task.updated_at.isoformat() if task.updated_at else None,
+    }
+
+
+class Subscription:
+    """A single SSE connection listening for one user's task events"""
+
+    def __init__(self, user_id, loop):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping task event for user {self.user_id}: subscriber queue full")
+
+
+class TaskEventBus:
+    """Fan task events out to every open stream of the owning user"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event_type, payload):
+        event = {'type': event_type, 'task': payload}
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Event loop already closed; the stream's cleanup will unsubscribe it
+                pass
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribed_users(self):
+        with self._lock:
+            return list(self._subscribers)
+
+
+class TaskChangePoller:
+    """Publish new TaskChange entries of subscribed users to the bus.
+
+    Polls every TASK_EVENTS_POLL_INTERVAL seconds while anyone is subscribed.
+    Log ids are allocated at insert, not commit, so the cursor (``floor``) only
+    moves past entries older than SYNC_FEED_SAFETY_LAG; newer ones are read
+    again on each poll and delivered once.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.floor = None
+        self._delivered = set()
+        self._task = None
+
+    def ensure_running(self):
+        """Start polling on the running event loop if it is not already"""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            # A new poller starts from the log's end
+            self.floor = None
+            self._delivered = set()
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        self.floor = await sync_to_async(self.latest_id)()
+        while self.bus.subscribed_users():
+            try:
+                await sync_to_async(self.poll)()
+            except Exception:
+                logger.exception("Polling the task change log failed")
+            await asyncio.sleep(settings.TASK_EVENTS_POLL_INTERVAL)
+
+    @staticmethod
+    def latest_id():
+        return TaskChange.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    def poll(self):
+        """Publish the entries committed since the last poll"""
+        user_ids = self.bus.subscribed_users()
+        if not user_ids:
+            return
+        horizon = timezone.now() - timedelta(seconds=settings.SYNC_FEED_SAFETY_LAG)
+        entries = list(
+            TaskChange.objects.filter(owner_id__in=user_ids, id__gt=self.floor)
+            .order_by('id')
+            .values_list('id', 'owner_id', 'task_id', 'action', 'created_at')[:POLL_BATCH_SIZE]
+        )
+        new = [entry for entry in entries if entry[0] not in self._delivered]
+        self._delivered.update(entry[0] for entry in new)
+        for change_id, *_, created_at in entries:
+            if created_at > horizon:
+                break
+            self.floor = change_id
+        self._delivered = {change_id for change_id in self._delivered if change_id > self.floor}
+        self.publish(new)
+
+    def publish(self, entries):
+        # Latest action per task, in log order
+        latest = {}
+        for _, owner_id, task_id, action, _ in entries:
+            previous = latest.pop(task_id, (None, None))[1]
+            # A task created and then edited in one poll is still news to the list page
+            latest[task_id] = (owner_id, 'created' if previous == 'created' and action == 'updated' else action)
+        live = Task.objects.in_bulk(
+            [task_id for task_id, (_, action) in latest.items() if action in ('created', 'updated')]
+        )
+        for task_id, (owner_id, action) in latest.items():
+            task = live.get(task_id)
+            if task is None:
+                self.bus.publish(owner_id, 'deleted', {'id': task_id})
+            else:
+                self.bus.publish(owner_id, action, serialize_task(task))
+
+
+task_events = TaskEventBus()
+task_change_poller = TaskChangePoller(task_events)
+
+
+def format_sse(event):
+    """Encode an event as a Server-Sent Events frame"""
+    return f"event: {event['type']}\ndata: {json.dumps(event['task'])}\n\n"
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from .cache import assignee_choices, user_choices
 from .models import Task, Assignee
 
 
@@ -50,6 +51,11 @@ class BulkAssigneeUploadForm(forms.Form):
         return csv_file
 
 
+class ReassignTasksForm(forms.Form):
+    """Assignee picker on the admin's "Reassign selected tasks" confirmation page"""
+    assignee = forms.ModelChoiceField(queryset=Assignee.objects.only('pk', 'name', 'email'))
+
+
 class TaskForm(forms.ModelForm):
     class Meta:
         model = Task
@@ -104,13 +110,9 @@ class TaskForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         # Populate assignee choices
-        self.fields['assignee_name'].choices = [('', 'Select assignee...')] + [
-            (assignee.name, assignee.name) for assignee in Assignee.objects.all()
-        ]
+        self.fields['assignee_name'].choices = [('', 'Select assignee...')] + assignee_choices()
         # Populate assigned_by choices with users
-        self.fields['assigned_by'].choices = [('', 'Select user...')] + [
-            (user.id, f"{user.get_full_name() or user.username}") for user in User.objects.all()
-        ]
+        self.fields['assigned_by'].choices = [('', 'Select user...')] + user_choices()
 
 
 class CustomUserCreationForm(UserCreationForm):
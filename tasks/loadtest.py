@@ -0,0 +1,93 @@
+"""Minimal concurrent HTTP load generator used by the benchmark commands"""
+import statistics
+import time
+from collections import Counter
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY
+from django.utils.crypto import get_random_string
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report a redirect as the response instead of timing the page it points to"""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _send(spec):
+    """Send one request and return (status, latency_seconds); status is None if no response arrived"""
+    request = urllib.request.Request(
+        spec['url'],
+        data=spec.get('body'),
+        headers=spec.get('headers', {}),
+        method=spec.get('method', 'GET'),
+    )
+    started = time.perf_counter()
+    try:
+        with _opener.open(request, timeout=spec.get('timeout', 30)) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = None
+    return status, time.perf_counter() - started
+
+
+def run_load(spec, total=500, concurrency=20):
+    """Fire ``total`` copies of ``spec`` with ``concurrency`` parallel clients.
+
+    Returns a dict with throughput, latency percentiles (ms), the count of
+    responses by status and the error count: anything but a 2xx, redirects
+    included, is an error.
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(_send, [spec] * total))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    statuses = Counter(status for status, _ in results)
+    errors = sum(count for status, count in statuses.items() if status is None or not 200 <= status < 300)
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000
+
+    return {
+        'requests': total,
+        'concurrency': concurrency,
+        'errors': errors,
+        'statuses': dict(statuses),
+        'elapsed': elapsed,
+        'rps': total / elapsed if elapsed else 0.0,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(0.50) if latencies else 0.0,
+        'p95_ms': percentile(0.95) if latencies else 0.0,
+    }
+
+
+def login_session(user, expiry=3600):
+    """Create a logged-in session for ``user``.
+
+    Returns ``(session, cookie_header, csrf_token)``; delete the session when done.
+    """
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.set_expiry(expiry)
+    session.save()
+
+    csrf_token = get_random_string(32)
+    cookie = (
+        f'{settings.SESSION_COOKIE_NAME}={session.session_key}; '
+        f'{settings.CSRF_COOKIE_NAME}={csrf_token}'
+    )
+    return session, cookie, csrf_token
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from tasks.archive import archive_tasks
+import time
+
+
+class Command(BaseCommand):
+    help = 'Move old completed/cancelled tasks into the archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.TASK_ARCHIVE_AFTER_DAYS,
+            help='Archive tasks last updated more than this many days ago',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TASK_ARCHIVE_BATCH_SIZE,
+            help='Rows moved per transaction',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and archive every INTERVAL seconds (0 = run once)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = archive_tasks(options['days'], batch_size=options['batch_size'])
+            self.stdout.write(
+                self.style.SUCCESS(f"Archived {count} tasks older than {options['days']} days")
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,88 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from tasks.counts import refresh_counts
+from tasks.models import Task
+import itertools
+import statistics
+import time
+
+
+SEED_BATCH_SIZE = 10000
+
+# label -> changelist query string
+SCENARIOS = {
+    'first page': '',
+    'deep page': '?p=200',
+    'status filter': '?status__exact=pending',
+    'location filter': '?assignee_location=Benchmark+3',
+    'search': '?q=benchmark+42',
+    'sorted by due date': '?o=7',
+}
+
+
+class Command(BaseCommand):
+    help = 'Time the Task admin changelist against a large table (seeds benchmark tasks as needed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000, help='Total tasks to benchmark against')
+        parser.add_argument('--requests', type=int, default=10, help='Requests per scenario')
+        parser.add_argument('--target-ms', type=float, default=500.0, help='p95 latency budget per request')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username='benchmark_admin',
+            defaults={'email': 'benchmark_admin@example.com', 'is_staff': True, 'is_superuser': True},
+        )
+        self._seed(user, options['tasks'])
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+        url = reverse('admin:tasks_task_changelist')
+
+        self.stdout.write(f'Database: {connection.vendor}, {Task.objects.count()} tasks')
+        failures = 0
+        for label, query in SCENARIOS.items():
+            timings = []
+            for _ in range(options['requests']):
+                started = time.perf_counter()
+                response = client.get(url + query, secure=True)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    self.stderr.write(f'{label}: HTTP {response.status_code}')
+                    break
+            timings.sort()
+            p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+            within = p95 <= options['target_ms']
+            failures += not within
+            line = f'{label:>20}: p50 {statistics.median(timings):8.1f} ms   p95 {p95:8.1f} ms'
+            self.stdout.write(self.style.SUCCESS(line) if within else self.style.ERROR(line))
+
+        summary = f"{len(SCENARIOS) - failures}/{len(SCENARIOS)} scenarios within {options['target_ms']:.0f} ms"
+        self.stdout.write(self.style.SUCCESS(summary) if not failures else self.style.WARNING(summary))
+
+    def _seed(self, user, total):
+        missing = total - Task.objects.count()
+        if missing <= 0:
+            return
+        self.stdout.write(f'Seeding {missing} benchmark tasks...')
+        statuses = itertools.cycle([choice for choice, _ in Task.STATUS_CHOICES])
+        priorities = itertools.cycle([choice for choice, _ in Task.PRIORITY_CHOICES])
+        for start in range(0, missing, SEED_BATCH_SIZE):
+            Task.objects.bulk_create([
+                Task(
+                    owner=user,
+                    description=f'benchmark {i}',
+                    status=next(statuses),
+                    priority=next(priorities),
+                    assignee_name=f'Benchmark Volunteer {i % 1000}',
+                    assignee_location=f'Benchmark {i % 50}',
+                )
+                for i in range(start, min(start + SEED_BATCH_SIZE, missing))
+            ])
+        refresh_counts()
+        with connection.cursor() as cursor:
+            # Fresh planner statistics, as after a real bulk load
+            cursor.execute('ANALYZE')
@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from tasks.loadtest import run_load, login_session
+from tasks.models import Task, Assignee
+import json
+from urllib.parse import urlsplit
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure concurrent throughput of the JSON endpoints against one or more '
+        'running servers, e.g. --target sync=http://127.0.0.1:8001 '
+        '--target async=http://127.0.0.1:8002'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            action='append',
+            default=[],
+            help='label=base_url of a running server (repeatable)',
+        )
+        parser.add_argument('--username', default='admin', help='User the requests authenticate as')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=20, help='Parallel clients')
+
+    def handle(self, *args, **options):
+        targets = options['target'] or ['local=http://127.0.0.1:8000']
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        # Benchmark fixtures: no assignee email so status updates don't send mail
+        task, _ = Task.objects.get_or_create(
+            owner=user,
+            description='benchmark_endpoints fixture',
+            defaults={'assignee_email': None},
+        )
+        assignee, _ = Assignee.objects.get_or_create(
+            name='Benchmark Assignee',
+            defaults={'email': 'benchmark@example.com', 'location': 'Benchmark'},
+        )
+
+        session, cookie, csrf_token = login_session(user)
+
+        try:
+            for target in targets:
+                label, _, base_url = target.partition('=')
+                if not base_url:
+                    raise CommandError(f"Invalid --target '{target}', expected label=url")
+                self.stdout.write(self.style.MIGRATE_HEADING(f'\n{label} ({base_url})'))
+                for name, method, path, body, headers in self._endpoints(base_url, task, assignee, cookie, csrf_token):
+                    result = run_load(
+                        {'url': base_url.rstrip('/') + path, 'method': method, 'body': body, 'headers': headers},
+                        total=options['requests'],
+                        concurrency=options['concurrency'],
+                    )
+                    self.stdout.write(
+                        f"  {name:<20} {result['rps']:8.1f} req/s  "
+                        f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                        f"errors {result['errors']}"
+                    )
+                    if result['errors']:
+                        # Redirects or failures were timed, not the endpoint
+                        raise CommandError(
+                            f"{label} {name}: {result['errors']} of {result['requests']} responses were not 2xx "
+                            f"(by status: {result['statuses']})"
+                        )
+        finally:
+            session.delete()
+
+    @staticmethod
+    def _endpoints(base_url, task, assignee, cookie, csrf_token):
+        """(name, method, path, body, headers) for each endpoint measured on ``base_url``"""
+        # Requests arrive as if through the TLS-terminating proxy; over HTTPS the
+        # CSRF check also wants a same-origin Referer on unsafe methods
+        proxy_headers = {'X-Forwarded-Proto': 'https', 'Referer': f'https://{urlsplit(base_url).netloc}/'}
+        auth_headers = {**proxy_headers, 'Cookie': cookie}
+        return [
+            ('dashboard_stats', 'GET', '/dashboard/stats/', None, auth_headers),
+            ('get_assignee_info', 'GET', f'/assignees/get-info/?name={assignee.name.replace(" ", "+")}', None, auth_headers),
+            ('task_status_update', 'POST', f'/tasks/{task.pk}/status/', json.dumps({'status': 'in_progress'}).encode(), {
+                **auth_headers,
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrf_token,
+            }),
+            ('auto_logout', 'POST', '/auto-logout/', b'', proxy_headers),
+        ]
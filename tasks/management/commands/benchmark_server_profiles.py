@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from tasks.loadtest import run_load, login_session
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+PROFILES = ['async', 'threaded', 'sync']
+STARTUP_TIMEOUT_SECONDS = 60
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(url, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            request = urllib.request.Request(url, headers={'X-Forwarded-Proto': 'https'})
+            urllib.request.urlopen(request, timeout=2).close()
+            return True
+        except urllib.error.HTTPError:
+            # Any HTTP response means the server is accepting requests
+            return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+class Command(BaseCommand):
+    help = (
+        'Start gunicorn with each profile from gunicorn.conf.py on this machine and '
+        'report requests/sec per endpoint, to choose GUNICORN_PROFILE and worker counts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profile',
+            action='append',
+            choices=PROFILES,
+            help='Profile to measure (repeatable, default: all)',
+        )
+        parser.add_argument('--username', default='admin', help='User the authenticated requests run as')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=20, help='Parallel clients')
+        parser.add_argument('--workers', type=int, help='Override the profile worker count (WEB_CONCURRENCY)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist")
+
+        session, cookie, _ = login_session(user)
+        # Requests arrive as if through the TLS-terminating proxy
+        headers = {'Cookie': cookie, 'X-Forwarded-Proto': 'https'}
+        endpoints = [
+            ('login_page', '/auth/login/', {'X-Forwarded-Proto': 'https'}),
+            ('dashboard', '/dashboard/', headers),
+            ('dashboard_stats', '/dashboard/stats/', headers),
+            ('task_list', '/tasks/', headers),
+        ]
+
+        summary = {}
+        try:
+            for profile in options['profile'] or PROFILES:
+                summary[profile] = self._run_profile(profile, endpoints, options)
+        finally:
+            session.delete()
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\nRequests/sec summed over endpoints'))
+        for profile, rps in sorted(summary.items(), key=lambda item: -item[1]):
+            self.stdout.write(f'  {profile:<10} {rps:8.1f}')
+
+    def _run_profile(self, profile, endpoints, options):
+        port = _free_port()
+        env = {**os.environ, 'GUNICORN_PROFILE': profile, 'PORT': str(port)}
+        if options['workers']:
+            env['WEB_CONCURRENCY'] = str(options['workers'])
+
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py')],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            if not _wait_until_ready(base_url + '/auth/login/', process):
+                raise CommandError(f"gunicorn did not start with profile '{profile}'")
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{profile} ({base_url})'))
+            total_rps = 0.0
+            for name, path, headers in endpoints:
+                result = run_load(
+                    {'url': base_url + path, 'headers': headers},
+                    total=options['requests'],
+                    concurrency=options['concurrency'],
+                )
+                total_rps += result['rps']
+                self.stdout.write(
+                    f"  {name:<16} {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                    f"errors {result['errors']}"
+                )
+            return total_rps
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
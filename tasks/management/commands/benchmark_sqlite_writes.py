@@ -0,0 +1,84 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, OperationalError
+from tasks.db import run_serialized
+from tasks.models import Task
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import time
+
+
+STATUSES = ['pending', 'in_progress', 'completed']
+
+
+def _write_loop(task_id, deadline):
+    """Update one task's status until the deadline; return (writes, lock_errors)"""
+    writes = errors = 0
+    task = Task.objects.get(pk=task_id)
+    while time.monotonic() < deadline:
+        task.status = STATUSES[writes % len(STATUSES)]
+        try:
+            run_serialized(task.save)
+            writes += 1
+        except OperationalError:
+            errors += 1
+    connection.close()
+    return writes, errors
+
+
+def _writer_process(task_ids, deadline, results):
+    # Never share the parent's SQLite handle across fork
+    connections.close_all()
+    with ThreadPoolExecutor(max_workers=len(task_ids)) as pool:
+        outcomes = list(pool.map(lambda task_id: _write_loop(task_id, deadline), task_ids))
+    results.put((sum(w for w, _ in outcomes), sum(e for _, e in outcomes)))
+
+
+class Command(BaseCommand):
+    help = 'Measure sustained task writes per second with concurrent writer processes (SQLite mode)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='Writer processes (like gunicorn workers)')
+        parser.add_argument('--threads', type=int, default=2, help='Writer threads per process')
+        parser.add_argument('--seconds', type=float, default=10.0, help='Benchmark duration')
+
+    def handle(self, *args, **options):
+        processes, threads = options['processes'], options['threads']
+        writers = processes * threads
+
+        self.stdout.write(
+            f"Database: {connection.vendor} ({connection.settings_dict['NAME']}), "
+            f"options: {connection.settings_dict.get('OPTIONS') or 'default'}"
+        )
+
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'email': 'benchmark@example.com'})
+        task_ids = [
+            Task.objects.create(owner=user, description=f'benchmark_sqlite_writes writer {i}').pk
+            for i in range(writers)
+        ]
+        connections.close_all()
+
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        deadline = time.monotonic() + options['seconds']
+        workers = [
+            context.Process(target=_writer_process, args=(task_ids[i * threads:(i + 1) * threads], deadline, results))
+            for i in range(processes)
+        ]
+        started = time.monotonic()
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.monotonic() - started
+
+        writes = sum(w for w, _ in outcomes)
+        errors = sum(e for _, e in outcomes)
+        Task.objects.filter(pk__in=task_ids).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{writers} writers ({processes} processes x {threads} threads): '
+            f'{writes} writes in {elapsed:.1f}s = {writes / elapsed:.1f} writes/s, '
+            f'{errors} lock errors'
+        ))
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+class Command(BaseCommand):
+    help = (
+        'Boot the project in fresh interpreters and report import time and resident memory '
+        'per installed app, e.g. --env SSO_SAML=False to see what disabling a provider saves'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to boot (medians are reported)')
+        parser.add_argument(
+            '--env',
+            action='append',
+            default=[],
+            help='KEY=VALUE set for the measured processes (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        for assignment in options['env']:
+            key, _, value = assignment.partition('=')
+            if not key or not _:
+                raise CommandError(f"Invalid --env '{assignment}', expected KEY=VALUE")
+            env[key] = value
+
+        runs = [self._boot(env) for _ in range(options['runs'])]
+        steps = [record['step'] for record in runs[0]]
+
+        self.stdout.write(f"{'step':<50} {'ms':>8} {'RSS MB':>8}")
+        total_ms = 0.0
+        for index, step in enumerate(steps):
+            ms = statistics.median(run[index]['ms'] for run in runs)
+            rss_mb = statistics.median(run[index]['rss_kb'] for run in runs) / 1024
+            total_ms += ms
+            self.stdout.write(f'{step:<50} {ms:8.1f} {rss_mb:8.1f}')
+
+        total_rss_mb = statistics.median(sum(record['rss_kb'] for record in run) for run in runs) / 1024
+        self.stdout.write(self.style.SUCCESS(f"{'total':<50} {total_ms:8.1f} {total_rss_mb:8.1f}"))
+
+    def _boot(self, env):
+        result = subprocess.run(
+            [sys.executable, '-m', 'tasks.startup_profile'],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Startup failed:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
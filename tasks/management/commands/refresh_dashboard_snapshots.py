@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from tasks.snapshots import refresh_dirty_snapshots, refresh_snapshot
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recompute dirty dashboard snapshots (run with --interval as a scheduler loop)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild the global snapshot and every user snapshot, dirty or not',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh dirty snapshots every INTERVAL seconds (0 = run once)',
+        )
+
+    def handle(self, *args, **options):
+        if options['all']:
+            owner_ids = [None] + list(User.objects.values_list('pk', flat=True))
+            for owner_id in owner_ids:
+                refresh_snapshot(owner_id)
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(owner_ids)} dashboard snapshots'))
+
+        while True:
+            count = refresh_dirty_snapshots()
+            if count or not options['interval']:
+                self.stdout.write(self.style.SUCCESS(f'Refreshed {count} dirty dashboard snapshots'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
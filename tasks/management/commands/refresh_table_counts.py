@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from tasks.counts import refresh_counts
+import time
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the cached global counts shown on the staff dashboards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estimate',
+            action='store_true',
+            help="Use PostgreSQL's planner estimate instead of an exact COUNT(*)",
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and refresh every INTERVAL seconds (0 = run once)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            refresh_counts(exact=not options['estimate'])
+            self.stdout.write(self.style.SUCCESS('Refreshed table counts'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
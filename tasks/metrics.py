@@ -0,0 +1,68 @@
+"""Application metrics reported by the staff-only /metrics/ endpoint.
+
+Each provider is a zero-argument callable returning a JSON-serializable
+dict; other modules add theirs with ``register``.
+"""
+import logging
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_providers = {}
+
+
+def register(name, provider):
+    """Expose ``provider()`` under ``name`` in the metrics report"""
+    _providers[name] = provider
+
+
+def collect_metrics():
+    report = {}
+    for name, provider in _providers.items():
+        try:
+            report[name] = provider()
+        except Exception as e:
+            logger.error(f"Metrics provider '{name}' failed: {str(e)}")
+            report[name] = {'error': str(e)}
+    return report
+
+
+def database_pool_metrics(connection=None):
+    """Pool size, saturation and checkout wait times for a database connection.
+
+    Works with anything exposing psycopg_pool's ``get_stats()`` as
+    ``connection.pool``; connections without a pool report ``enabled: False``.
+    """
+    connection = connection or connections['default']
+    pool = getattr(connection, 'pool', None)
+    if pool is None:
+        return {'enabled': False, 'vendor': connection.vendor}
+
+    stats = pool.get_stats()
+    requests = stats.get('requests_num', 0)
+    wait_ms = stats.get('requests_wait_ms', 0)
+    return {
+        'enabled': True,
+        'vendor': connection.vendor,
+        'min_size': stats.get('pool_min'),
+        'max_size': stats.get('pool_max'),
+        'size': stats.get('pool_size'),
+        'available': stats.get('pool_available'),
+        'waiting': stats.get('requests_waiting', 0),
+        'requests': requests,
+        'queued_requests': stats.get('requests_queued', 0),
+        'wait_ms_total': wait_ms,
+        'wait_ms_avg': round(wait_ms / requests, 3) if requests else 0.0,
+        'timeouts': stats.get('requests_errors', 0),
+        'bad_connections_returned': stats.get('returns_bad', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+    }
+
+
+def _event_stream_metrics():
+    from .events import task_events
+    return {'subscribers': task_events.subscriber_count()}
+
+
+register('database_pool', database_pool_metrics)
+register('task_event_streams', _event_stream_metrics)
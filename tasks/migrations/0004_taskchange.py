@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_change_log(apps, schema_editor):
+    """Record existing tasks as 'created' so a cursor of 0 yields a full sync"""
+    Task = apps.get_model('tasks', 'Task')
+    TaskChange = apps.get_model('tasks', 'TaskChange')
+    TaskChange.objects.bulk_create(
+        (
+            TaskChange(owner_id=owner_id, task_id=task_id, action='created')
+            for task_id, owner_id in Task.objects.order_by('id').values_list('id', 'owner_id').iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_assignee_task_assigned_by_alter_task_title'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_changes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['owner', 'id'], name='tasks_change_owner_cursor')],
+            },
+        ),
+        migrations.RunPython(seed_change_log, migrations.RunPython.noop),
+    ]
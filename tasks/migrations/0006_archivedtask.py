@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_syncoperation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(choices=[('Create a document for Adult classes', 'Create a document for Adult classes'), ('Organize cultural event', 'Organize cultural event'), ('Coordinate volunteer training', 'Coordinate volunteer training'), ('Manage social media accounts', 'Manage social media accounts'), ('Prepare presentation materials', 'Prepare presentation materials'), ('Coordinate fundraising campaign', 'Coordinate fundraising campaign'), ('Organize community outreach', 'Organize community outreach'), ('Manage website content', 'Manage website content'), ('Coordinate language classes', 'Coordinate language classes'), ('Organize youth programs', 'Organize youth programs'), ('Other', 'Other')], max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('urgent', 'Urgent')], max_length=20)),
+                ('assignee_name', models.CharField(blank=True, max_length=200, null=True)),
+                ('assignee_email', models.EmailField(blank=True, max_length=254, null=True)),
+                ('assignee_location', models.CharField(blank=True, max_length=200, null=True)),
+                ('start_date', models.DateTimeField(blank=True, null=True)),
+                ('due_date', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='taskchange',
+            name='action',
+            field=models.CharField(choices=[('created', 'Created'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('archived', 'Archived')], max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'updated_at'], name='tasks_task_status_updated'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='assigned_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['owner', 'created_at'], name='tasks_archived_owner_created'),
+        ),
+    ]
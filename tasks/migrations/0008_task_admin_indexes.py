@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' "
+    "|| coalesce(assignee_name, '') || ' ' || coalesce(assignee_email, ''))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    """Full-text index for the Task admin search (PostgreSQL only)"""
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS tasks_task_search ON tasks_task USING gin ({SEARCH_DOCUMENT})"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS tasks_task_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_tablecount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at'], name='tasks_task_created'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'created_at'], name='tasks_task_status_created'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
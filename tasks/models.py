@@ -18,6 +18,14 @@ class Assignee(models.Model):
         return f"{self.name} ({self.email})"
 
 
+# Text searched by the Task admin; matches the GIN index created in
+# migration 0008 on PostgreSQL, so keep the two expressions identical
+TASK_SEARCH_DOCUMENT_SQL = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' "
+    "|| coalesce(assignee_name, '') || ' ' || coalesce(assignee_email, ''))"
+)
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -71,6 +79,13 @@ class Task(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Archival scan: old completed/cancelled tasks
+            models.Index(fields=['status', 'updated_at'], name='tasks_task_status_updated'),
+            # Newest-first lists (scanned backwards, so -created_at, -id needs no sort)
+            models.Index(fields=['created_at'], name='tasks_task_created'),
+            models.Index(fields=['status', 'created_at'], name='tasks_task_status_created'),
+        ]
         
     def __str__(self):
         assignee_info = f" -> {self.assignee_name}" if self.assignee_name else ""
@@ -83,4 +98,123 @@ class Task(models.Model):
             'medium': 'badge-primary',
             'high': 'badge-warning',
             'urgent': 'badge-danger'
-        }.get(self.priority, 'badge-primary')
\ No newline at end of file
+        }.get(self.priority, 'badge-primary')
+
+
+class ArchivedTask(models.Model):
+    """Cold storage for old completed/cancelled tasks, moved by ``archive_tasks``.
+
+    Rows keep their original Task id and column values, so archived tasks
+    can be listed alongside live ones and still resolve by id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200, choices=Task.TITLE_CHOICES)
+    description = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Task.PRIORITY_CHOICES)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tasks')
+    assigned_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    assignee_name = models.CharField(max_length=200, blank=True, null=True)
+    assignee_email = models.EmailField(blank=True, null=True)
+    assignee_location = models.CharField(max_length=200, blank=True, null=True)
+    start_date = models.DateTimeField(null=True, blank=True)
+    due_date = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    STATUS_CHOICES = Task.STATUS_CHOICES
+    get_priority_badge_class = Task.get_priority_badge_class
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', 'created_at'], name='tasks_archived_owner_created'),
+        ]
+        
+    def __str__(self):
+        return f"{self.title} - archived ({self.status})"
+
+
+class TaskChange(models.Model):
+    """Append-only change log backing the incremental sync feed.
+
+    The auto-incrementing id is the client's cursor; deletes are kept as
+    tombstones so clients can drop their local copy.
+    """
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+        ('archived', 'Archived'),
+    ]
+    
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_changes')
+    task_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['owner', 'id'], name='tasks_change_owner_cursor'),
+        ]
+        
+    def __str__(self):
+        return f"#{self.id} task {self.task_id} {self.action}"
+
+
+class SyncOperation(models.Model):
+    """Outcome of an offline operation, keyed by its client idempotency key.
+
+    A replayed operation returns the stored result instead of being applied
+    a second time.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sync_operations')
+    idempotency_key = models.CharField(max_length=64)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'idempotency_key'], name='tasks_syncop_owner_key_unique'),
+        ]
+        
+    def __str__(self):
+        return f"{self.owner_id}:{self.idempotency_key}"
+
+
+class TableCount(models.Model):
+    """Cached row count of a large table, so staff pages never run COUNT(*).
+
+    Signals adjust ``count`` as rows are added and removed; ``refresh_counts``
+    recounts exactly (``is_exact``) or seeds from the planner estimate.
+    """
+    table = models.CharField(max_length=100, unique=True)
+    count = models.BigIntegerField(default=0)
+    is_exact = models.BooleanField(default=False)
+    refreshed_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.table}: {self.count}"
+
+
+class DashboardSnapshot(models.Model):
+    """Precomputed dashboard numbers for one user (or all tasks, ``owner=None``).
+
+    Changes bump ``generation``; the snapshot is dirty until a refresh
+    computed from that generation is stored as ``computed_generation``.
+    """
+    key = models.CharField(max_length=50, unique=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    data = models.JSONField(default=dict)
+    generation = models.PositiveIntegerField(default=1)
+    computed_generation = models.PositiveIntegerField(default=0)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    
+    @property
+    def is_dirty(self):
+        return self.generation > self.computed_generation
+    
+    def __str__(self):
+        return f"{self.key} (generation {self.generation})"
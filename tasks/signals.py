@@ -1,14 +1,40 @@
 from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
+from django.dispatch import receiver, Signal
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
-from .models import Task
+from django.contrib.auth.models import User
+from .cache import task_cache
+from .counts import adjust_count
+from .models import Task, Assignee, TaskChange
+from .snapshots import mark_dirty
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sent after set-based operations that bypass per-row model signals.
+# ``changes`` is a list of (task_id, owner_id, action) tuples.
+tasks_bulk_changed = Signal()
+
+
+def send_task_notification(subject, plain_message, html_message, recipient_email, log_message):
+    """Send a rendered task notification email"""
+    try:
+        send_mail(
+            subject=subject,
+            message=plain_message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[recipient_email],
+            html_message=html_message,
+            fail_silently=False,
+        )
+        logger.info(log_message)
+    except Exception as e:
+        logger.error(f"Failed to send task notification to {recipient_email}: {str(e)}")
+
 
 @receiver(post_save, sender=Task)
 def task_saved_handler(sender, instance, created, **kwargs):
@@ -44,17 +70,11 @@ def task_saved_handler(sender, instance, created, **kwargs):
         html_message = render_to_string('emails/task_notification.html', context)
         plain_message = strip_tags(html_message)
         
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        
-        logger.info(f"Task {action} notification sent to {recipient_email} for task: {instance.title}")
+        # Send email after commit so SMTP never runs inside the write transaction
+        transaction.on_commit(lambda: send_task_notification(
+            subject, plain_message, html_message, recipient_email,
+            f"Task {action} notification sent to {recipient_email} for task: {instance.title}",
+        ))
         
     except Exception as e:
         logger.error(f"Failed to send task {action} notification: {str(e)}")
@@ -87,17 +107,87 @@ def task_deleted_handler(sender, instance, **kwargs):
         html_message = render_to_string('emails/task_notification.html', context)
         plain_message = strip_tags(html_message)
         
-        # Send email
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient_email],
-            html_message=html_message,
-            fail_silently=False,
-        )
-        
-        logger.info(f"Task deletion notification sent to {recipient_email} for task: {instance.title}")
+        # Send email after commit so SMTP never runs inside the write transaction
+        transaction.on_commit(lambda: send_task_notification(
+            subject, plain_message, html_message, recipient_email,
+            f"Task deletion notification sent to {recipient_email} for task: {instance.title}",
+        ))
         
     except Exception as e:
         logger.error(f"Failed to send task deletion notification: {str(e)}")
+
+
+@receiver(post_save, sender=Task)
+def record_task_saved(sender, instance, created, **kwargs):
+    """Append to the change log read by the sync feed and the live task streams"""
+    TaskChange.objects.create(
+        owner_id=instance.owner_id,
+        task_id=instance.pk,
+        action='created' if created else 'updated',
+    )
+
+
+def _deleting_owner(origin):
+    """Whether a delete started from a User, i.e. the task's owner is going too"""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is User
+
+
+@receiver(post_delete, sender=Task)
+def record_task_deleted(sender, instance, origin=None, **kwargs):
+    """Leave a tombstone in the change log so clients drop the task"""
+    # The owner's change log is deleted with them; a tombstone would point at the deleted user
+    if _deleting_owner(origin):
+        return
+    TaskChange.objects.create(owner_id=instance.owner_id, task_id=instance.pk, action='deleted')
+
+
+@receiver(tasks_bulk_changed)
+def record_bulk_changes(sender, changes, **kwargs):
+    """Append set-based changes to the change log"""
+    TaskChange.objects.bulk_create(
+        [TaskChange(owner_id=owner_id, task_id=task_id, action=action) for task_id, owner_id, action in changes],
+        batch_size=1000,
+    )
+    adjust_count(Task, -sum(1 for _, _, action in changes if action in ('deleted', 'archived')))
+    mark_dirty([owner_id for _, owner_id, _ in changes])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Assignee)
+@receiver(post_save, sender=User)
+def count_row_created(sender, instance, created, **kwargs):
+    """Keep the cached global counts in step with inserts"""
+    if created:
+        adjust_count(sender, 1)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Assignee)
+@receiver(post_delete, sender=User)
+def count_row_deleted(sender, instance, **kwargs):
+    """Keep the cached global counts in step with deletes"""
+    adjust_count(sender, -1)
+
+
+@receiver(post_save, sender=Assignee)
+@receiver(post_delete, sender=Assignee)
+def invalidate_assignee_cache(sender, **kwargs):
+    """Assignee choices and directory lookups are stale"""
+    task_cache.invalidate_on_commit('assignees')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, update_fields=None, **kwargs):
+    """User choices are stale (logins only touch last_login and don't count)"""
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    task_cache.invalidate_on_commit('users')
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def mark_dashboard_dirty(sender, instance, **kwargs):
+    """The owner's and the global dashboard snapshots need a refresh"""
+    mark_dirty([instance.owner_id])
@@ -0,0 +1,101 @@
+"""Precomputed dashboard snapshots.
+
+Each user's dashboard (and the global, all-tasks view) is stored as one
+DashboardSnapshot row. Task changes only mark the affected snapshots dirty;
+``refresh_dirty_snapshots`` recomputes just those, run in a loop by the
+``refresh_dashboard_snapshots`` command (the Procfile ``worker``).
+
+On read, a user's own dirty snapshot is recomputed right away, so people
+see their edits; the global snapshot waits for the loop. Any snapshot that
+is missing or older than DASHBOARD_SNAPSHOT_MAX_AGE seconds is recomputed
+on read too, which also rolls the overdue counts over. Snapshots are always
+computed from the primary: a lagging replica would store stale numbers as
+clean.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Task, DashboardSnapshot
+
+GLOBAL_KEY = 'global'
+RECENT_TASKS_LIMIT = 5
+OPEN_STATUSES = ['pending', 'in_progress']
+RECENT_TASK_FIELDS = ['id', 'title', 'description', 'status', 'priority', 'created_at']
+
+
+def snapshot_key(owner_id=None):
+    return f'user:{owner_id}' if owner_id is not None else GLOBAL_KEY
+
+
+def compute_snapshot(owner_id=None, using=None):
+    """Status/priority breakdowns, overdue count and recent tasks in two queries"""
+    tasks = Task.objects.using(using) if using else Task.objects.all()
+    if owner_id is not None:
+        tasks = tasks.filter(owner_id=owner_id)
+    aggregates = {'total_tasks': Count('id')}
+    for status, _ in Task.STATUS_CHOICES:
+        aggregates[f'{status}_tasks'] = Count('id', filter=Q(status=status))
+    for priority, _ in Task.PRIORITY_CHOICES:
+        aggregates[f'{priority}_priority_tasks'] = Count('id', filter=Q(priority=priority))
+    aggregates['overdue_tasks'] = Count('id', filter=Q(status__in=OPEN_STATUSES, due_date__lt=timezone.now()))
+
+    recent_tasks = list(tasks.order_by('-created_at').values(*RECENT_TASK_FIELDS)[:RECENT_TASKS_LIMIT])
+    for row in recent_tasks:
+        row['created_at'] = row['created_at'].isoformat()
+    return {'stats': tasks.aggregate(**aggregates), 'recent_tasks': recent_tasks}
+
+
+def refresh_snapshot(owner_id=None):
+    """Recompute one snapshot; a change that lands meanwhile leaves it dirty"""
+    key = snapshot_key(owner_id)
+    snapshot, _ = DashboardSnapshot.objects.get_or_create(key=key, defaults={'owner_id': owner_id})
+    generation = snapshot.generation
+    # Read the tasks where the snapshot is written, never from a replica
+    snapshot.data = compute_snapshot(owner_id, using=router.db_for_write(DashboardSnapshot))
+    snapshot.computed_at = timezone.now()
+    DashboardSnapshot.objects.filter(pk=snapshot.pk, generation=generation).update(
+        data=snapshot.data, computed_generation=generation, computed_at=snapshot.computed_at
+    )
+    return snapshot
+
+
+def refresh_dirty_snapshots(limit=None):
+    """Recompute every dirty snapshot (up to ``limit``); returns how many"""
+    dirty = DashboardSnapshot.objects.filter(generation__gt=F('computed_generation')).values_list('owner_id', flat=True)
+    if limit:
+        dirty = dirty[:limit]
+    owner_ids = list(dirty)
+    for owner_id in owner_ids:
+        refresh_snapshot(owner_id)
+    return len(owner_ids)
+
+
+def mark_dirty(owner_ids):
+    """After commit, flag the owners' snapshots and the global one for refresh"""
+    keys = [snapshot_key(owner_id) for owner_id in set(owner_ids)] + [GLOBAL_KEY]
+    transaction.on_commit(
+        lambda: DashboardSnapshot.objects.filter(key__in=keys).update(generation=F('generation') + 1)
+    )
+
+
+def get_snapshot(owner_id=None):
+    """The snapshot's data, with recent tasks as unsaved Task instances for the templates"""
+    snapshot = DashboardSnapshot.objects.filter(key=snapshot_key(owner_id)).first()
+    max_age = timedelta(seconds=getattr(settings, 'DASHBOARD_SNAPSHOT_MAX_AGE', 300))
+    if (
+        snapshot is None
+        or snapshot.computed_at is None
+        or snapshot.computed_at < timezone.now() - max_age
+        or (owner_id is not None and snapshot.is_dirty)
+    ):
+        snapshot = refresh_snapshot(owner_id)
+
+    data = dict(snapshot.data)
+    data['recent_tasks'] = [
+        Task(**{**row, 'created_at': parse_datetime(row['created_at'])}) for row in data['recent_tasks']
+    ]
+    data['computed_at'] = snapshot.computed_at
+    return data
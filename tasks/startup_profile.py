@@ -0,0 +1,97 @@
+"""Measure what each installed app costs a fresh worker at boot.
+
+Run as ``python -m tasks.startup_profile`` in a clean interpreter (the
+``profile_startup`` command does this); prints a JSON list of steps with
+the import time and resident memory added by each. Django is set up
+inside ``profile`` with per-app instrumentation, so this module must not
+import it at the top level.
+
+Shared dependencies are charged to the first app that imports them, so
+compare totals between flag combinations rather than reading one row alone.
+"""
+import importlib
+import json
+import os
+import resource
+import sys
+import time
+
+
+def rss_kb():
+    """Current resident set size in KB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _timed(record, func, *args):
+    rss_before, started = rss_kb(), time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        record['ms'] += (time.perf_counter() - started) * 1000
+        record['rss_kb'] += rss_kb() - rss_before
+
+
+def _instrument_app_loading(per_app):
+    """Charge each app's package import, models import and ready() to that app"""
+    from django.apps.config import AppConfig
+
+    create = AppConfig.create.__func__
+    import_models = AppConfig.import_models
+
+    def timed_create(cls, entry):
+        record = {'ms': 0.0, 'rss_kb': 0}
+        app_config = _timed(record, create, cls, entry)
+        per_app[app_config.name] = record
+        ready = app_config.ready
+        app_config.ready = lambda: _timed(record, ready)
+        return app_config
+
+    def timed_import_models(self):
+        return _timed(per_app[self.name], import_models, self)
+
+    AppConfig.create = classmethod(timed_create)
+    AppConfig.import_models = timed_import_models
+
+
+def profile():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'workflow_system.settings')
+    steps = [{'step': 'interpreter', 'ms': 0.0, 'rss_kb': rss_kb()}]
+
+    def step(name, func):
+        record = {'step': name, 'ms': 0.0, 'rss_kb': 0}
+        _timed(record, func)
+        steps.append(record)
+
+    step('django', lambda: importlib.import_module('django.core.handlers.wsgi'))
+
+    from django.conf import settings
+    step('settings', lambda: settings.INSTALLED_APPS)
+
+    import django
+    per_app = {}
+    _instrument_app_loading(per_app)
+    setup = {'step': 'app registry (other)', 'ms': 0.0, 'rss_kb': 0}
+    _timed(setup, django.setup)
+    for name, record in per_app.items():
+        steps.append({'step': name, **record})
+        setup['ms'] -= record['ms']
+        setup['rss_kb'] -= record['rss_kb']
+    steps.append(setup)
+
+    step('middleware', lambda: importlib.import_module('django.core.wsgi').get_wsgi_application())
+    step('urls', lambda: importlib.import_module(settings.ROOT_URLCONF))
+
+    for record in steps:
+        record['ms'] = round(record['ms'], 1)
+    return steps
+
+
+if __name__ == '__main__':
+    # Last line of stdout, after anything the apps print while loading
+    print()
+    print(json.dumps(profile()))
@@ -0,0 +1,218 @@
+"""Incremental task synchronization for offline-capable clients (PWA, mobile)"""
+from datetime import timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Task, TaskChange, SyncOperation
+
+CHANGE_FEED_DEFAULT_LIMIT = 200
+CHANGE_FEED_MAX_LIMIT = 1000
+
+MAX_BATCH_OPERATIONS = 100
+
+# Fields an offline client may set; ownership and timestamps stay server-side
+SYNC_FIELDS = [
+    'title', 'description', 'status', 'priority',
+    'assignee_name', 'assignee_email', 'assignee_location',
+    'start_date', 'due_date',
+]
+
+
+class SyncError(Exception):
+    """An offline operation that cannot be applied"""
+
+
+def serialize_task_for_sync(task):
+    """Full task representation a client needs to keep a local copy"""
+    def iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'description': task.description,
+        'status': task.status,
+        'priority': task.priority,
+        'assigned_by': task.assigned_by_id,
+        'assignee_name': task.assignee_name,
+        'assignee_email': task.assignee_email,
+        'assignee_location': task.assignee_location,
+        'start_date': iso(task.start_date),
+        'due_date': iso(task.due_date),
+        'created_at': iso(task.created_at),
+        'updated_at': iso(task.updated_at),
+    }
+
+
+def changes_since(user, cursor=0, limit=CHANGE_FEED_DEFAULT_LIMIT):
+    """Return the user's task changes after ``cursor``.
+
+    Several log entries for the same task collapse into one: the current row
+    for live tasks, or a tombstone if the task no longer exists. The returned
+    cursor is the id of the last log entry consumed, so clients pass it back
+    verbatim on their next call.
+
+    The feed stops at the first entry younger than SYNC_FEED_SAFETY_LAG, so
+    an id allocated by a transaction that has not committed yet is not
+    skipped over; that entry comes with a later call.
+    """
+    limit = max(1, min(limit, CHANGE_FEED_MAX_LIMIT))
+    horizon = timezone.now() - timedelta(seconds=settings.SYNC_FEED_SAFETY_LAG)
+    entries = list(
+        TaskChange.objects.filter(owner=user, id__gt=cursor)
+        .order_by('id')
+        .values_list('id', 'task_id', 'created_at')[:limit + 1]
+    )
+    settled = next((index for index, entry in enumerate(entries) if entry[2] > horizon), len(entries))
+    has_more = settled > limit
+    entries = [(change_id, task_id) for change_id, task_id, _ in entries[:min(settled, limit)]]
+
+    # Latest log position per task, in feed order
+    positions = {}
+    for change_id, task_id in entries:
+        positions[task_id] = change_id
+
+    live = Task.objects.filter(owner=user).in_bulk(list(positions))
+
+    changes = []
+    for task_id, change_id in sorted(positions.items(), key=lambda item: item[1]):
+        task = live.get(task_id)
+        if task is None:
+            changes.append({'cursor': change_id, 'action': 'deleted', 'task_id': task_id, 'task': None})
+        else:
+            changes.append({
+                'cursor': change_id,
+                'action': 'upsert',
+                'task_id': task_id,
+                'task': serialize_task_for_sync(task),
+            })
+
+    return {
+        'cursor': entries[-1][0] if entries else cursor,
+        'has_more': has_more,
+        'changes': changes,
+    }
+
+
+def _parse_timestamp(value):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def _assign_fields(task, fields):
+    unknown = set(fields) - set(SYNC_FIELDS)
+    if unknown:
+        raise SyncError(f"Unsupported fields: {', '.join(sorted(unknown))}")
+    for name, value in fields.items():
+        setattr(task, name, value)
+    try:
+        task.full_clean()
+    except ValidationError as e:
+        raise SyncError('; '.join(f"{field}: {' '.join(errors)}" for field, errors in e.message_dict.items()))
+
+
+def _apply_operation(user, operation):
+    op = operation.get('op')
+    fields = operation.get('fields') or {}
+    if not isinstance(fields, dict):
+        raise SyncError('fields must be an object')
+
+    if op == 'create':
+        task = Task(owner=user, assigned_by=user)
+        _assign_fields(task, fields)
+        task.save()
+        return {'status': 'applied', 'task_id': task.pk, 'task': serialize_task_for_sync(task)}
+
+    if op not in ('update', 'delete'):
+        raise SyncError(f"Unknown op '{op}'")
+
+    task_id = operation.get('task_id')
+    task = Task.objects.select_for_update().filter(owner=user, pk=task_id).first()
+    if task is None:
+        if op == 'delete':
+            # Already gone: the client's intent is satisfied
+            return {'status': 'applied', 'task_id': task_id, 'task': None}
+        raise SyncError('Task not found')
+
+    client_updated_at = _parse_timestamp(operation.get('updated_at'))
+    if client_updated_at is None:
+        raise SyncError('updated_at must be an ISO 8601 timestamp')
+
+    # Last writer wins: a server copy changed after the offline edit is kept
+    if task.updated_at > client_updated_at:
+        return {
+            'status': 'conflict',
+            'task_id': task.pk,
+            'task': serialize_task_for_sync(task),
+            'message': 'Task was changed on the server after this edit',
+        }
+
+    if op == 'delete':
+        task.delete()
+        return {'status': 'applied', 'task_id': task_id, 'task': None}
+
+    _assign_fields(task, fields)
+    task.save()
+    return {'status': 'applied', 'task_id': task.pk, 'task': serialize_task_for_sync(task)}
+
+
+def apply_operations(user, operations):
+    """Apply an ordered batch of offline operations in one transaction.
+
+    Each operation runs in its own savepoint so a failing one does not undo
+    the others. Applied operations are recorded under their idempotency key;
+    replaying the key returns the recorded result with ``replayed: True``.
+    """
+    keys = [operation.get('idempotency_key') for operation in operations]
+    results = []
+
+    with transaction.atomic():
+        recorded = dict(
+            SyncOperation.objects.filter(
+                owner=user, idempotency_key__in=[key for key in keys if isinstance(key, str)]
+            ).values_list('idempotency_key', 'result')
+        )
+
+        for key, operation in zip(keys, operations):
+            if not isinstance(key, str) or not key or len(key) > 64:
+                results.append({
+                    'idempotency_key': key,
+                    'status': 'error',
+                    'message': 'idempotency_key is required (max 64 characters)',
+                })
+                continue
+
+            if key in recorded:
+                results.append({**recorded[key], 'replayed': True})
+                continue
+
+            try:
+                with transaction.atomic():
+                    result = {'idempotency_key': key, **_apply_operation(user, operation)}
+                    if result['status'] == 'applied':
+                        SyncOperation.objects.create(owner=user, idempotency_key=key, result=result)
+                        recorded[key] = result
+            except SyncError as e:
+                result = {'idempotency_key': key, 'status': 'error', 'message': str(e)}
+            except IntegrityError:
+                # A concurrent flush of the same queue recorded this key first,
+                # unless the operation itself violated a constraint
+                recorded_result = (
+                    SyncOperation.objects.filter(owner=user, idempotency_key=key)
+                    .values_list('result', flat=True).first()
+                )
+                if recorded_result is None:
+                    result = {
+                        'idempotency_key': key,
+                        'status': 'error',
+                        'message': 'operation conflicts with existing data',
+                    }
+                else:
+                    result = {**recorded_result, 'replayed': True}
+            results.append(result)
+
+    return results
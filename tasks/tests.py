@@ -1,3 +1,518 @@
-from django.test import TestCase
+import asyncio
+import time
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache.backends.db import DatabaseCache
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, OperationalError, connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from workflow_system.db_routers import (
+    PIN_COOKIE_NAME, REPLICA_ALIAS, ReplicaPinMiddleware, read_from_replica, replica_configured,
+)
+
+from .archive import _archive_batch, archive_tasks, tasks_with_archived
+from .bulk import bulk_delete_assignees, bulk_delete_tasks
+from .cache import TwoTierCache
+from .counts import get_counts, refresh_counts
+from .db import WRITE_BACKOFF_SECONDS, WRITE_RETRIES, run_serialized
+from .events import task_change_poller, task_events
+from .metrics import _providers, collect_metrics, database_pool_metrics, register
+from .models import ArchivedTask, Assignee, DashboardSnapshot, TableCount, Task, TaskChange
+from .snapshots import get_snapshot
+from .sync import apply_operations, changes_since
+
+
+class LoginViewTests(TestCase):
+    def test_context_offers_signup_and_enabled_providers(self):
+        response = self.client.get(reverse('login'), secure=True)
+        self.assertTrue(response.context['show_signup'])
+        self.assertEqual(response.context['social_providers'], settings.SSO_SOCIAL_PROVIDERS)
+
+
+class DashboardSnapshotTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('snapshot-owner', password='pw')
+
+    def create_task(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(owner=self.user, **fields)
+
+    def test_own_dirty_snapshot_is_refreshed_on_read(self):
+        self.create_task(status='pending')
+        self.assertEqual(get_snapshot(self.user.pk)['stats']['total_tasks'], 1)
+
+        self.create_task(status='completed')
+        stats = get_snapshot(self.user.pk)['stats']
+        self.assertEqual(stats['total_tasks'], 2)
+        self.assertEqual(stats['completed_tasks'], 1)
+
+    def test_old_clean_snapshot_is_recomputed_so_overdue_counts_roll_over(self):
+        task = self.create_task(status='pending', due_date=timezone.now() + timedelta(hours=1))
+        self.assertEqual(get_snapshot(self.user.pk)['stats']['overdue_tasks'], 0)
+
+        # The due date passes without any change to the task
+        Task.objects.filter(pk=task.pk).update(due_date=timezone.now() - timedelta(hours=1))
+        DashboardSnapshot.objects.filter(key=f'user:{self.user.pk}').update(
+            computed_at=timezone.now() - timedelta(seconds=settings.DASHBOARD_SNAPSHOT_MAX_AGE + 1)
+        )
+        self.assertEqual(get_snapshot(self.user.pk)['stats']['overdue_tasks'], 1)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TwoTierCacheTests(TestCase):
+    def test_evicted_version_key_does_not_resurrect_old_entries(self):
+        cache = TwoTierCache(ttl=0)
+        self.assertEqual(cache.get_or_set('family', 'key', lambda: 'old'), 'old')
+        cache.invalidate('family')
+        self.assertEqual(cache.get_or_set('family', 'key', lambda: 'new'), 'new')
+
+        # Culling drops the version key but leaves the old entries behind
+        cache.l2.delete(cache._version_key('family', None))
+        self.assertEqual(cache.get_or_set('family', 'key', lambda: 'fresh'), 'fresh')
+
+
+class TaskAdminActionTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(self.admin)
+        self.tasks = [Task.objects.create(owner=self.admin, description=f'task {n}') for n in range(3)]
+        self.changelist = reverse('admin:tasks_task_changelist')
+
+    def post_action(self, action, **data):
+        return self.client.post(self.changelist, {
+            'action': action,
+            ACTION_CHECKBOX_NAME: [task.pk for task in self.tasks],
+            'post': 'yes',
+            **data,
+        }, secure=True)
+
+    def test_reassign_with_invalid_assignee_shows_the_form_again(self):
+        response = self.post_action('reassign_selected', assignee='not-a-number')
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'admin/tasks/bulk_action_confirmation.html')
+        self.assertTrue(response.context['form'].errors)
+
+    def test_reassign_with_valid_assignee(self):
+        assignee = Assignee.objects.create(name='New Owner', email='new@example.com', location='Austin')
+        response = self.post_action('reassign_selected', assignee=assignee.pk)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Task.objects.filter(assignee_name='New Owner').count(), 3)
+
+    def test_bulk_delete_writes_admin_log_entries(self):
+        response = self.post_action('delete_tasks')
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(
+            set(LogEntry.objects.filter(action_flag=DELETION).values_list('object_id', flat=True)),
+            {str(task.pk) for task in self.tasks},
+        )
+
+
+@override_settings(SYNC_FEED_SAFETY_LAG=10)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('feed-reader', password='pw')
+
+    def test_feed_stops_before_entries_younger_than_the_safety_lag(self):
+        settled = Task.objects.create(owner=self.user)
+        recent = Task.objects.create(owner=self.user)
+        TaskChange.objects.filter(task_id=settled.pk).update(created_at=timezone.now() - timedelta(seconds=11))
+
+        feed = changes_since(self.user)
+        self.assertEqual([change['task_id'] for change in feed['changes']], [settled.pk])
+        self.assertFalse(feed['has_more'])
+
+        # The recent entry is handed out once it is older than the lag
+        TaskChange.objects.filter(task_id=recent.pk).update(created_at=timezone.now() - timedelta(seconds=11))
+        feed = changes_since(self.user, cursor=feed['cursor'])
+        self.assertEqual([change['task_id'] for change in feed['changes']], [recent.pk])
+
+
+class UserDeletionTests(TransactionTestCase):
+    """Runs outside a test transaction so SQLite checks foreign keys at each statement"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('leaving-owner', password='pw')
+        self.tasks = [Task.objects.create(owner=self.user) for _ in range(2)]
+
+    def test_deleting_a_user_with_tasks(self):
+        self.user.delete()
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(TaskChange.objects.exists())
+
+    def test_deleting_users_through_a_queryset(self):
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertFalse(TaskChange.objects.exists())
+
+    def test_deleting_a_task_still_leaves_a_tombstone(self):
+        task_id = self.tasks[0].pk
+        self.tasks[0].delete()
+        self.assertTrue(TaskChange.objects.filter(task_id=task_id, action='deleted').exists())
+
+
+@override_settings(TASK_EVENTS_POLL_INTERVAL=0.01)
+class TaskEventStreamTests(TestCase):
+    """Changes reach streams through the change log, whichever process wrote them"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('stream-reader', password='pw')
+        self.task = Task.objects.create(owner=self.user, status='pending')
+
+    async def subscribe(self):
+        subscription = task_events.subscribe(self.user.pk)
+        self.addCleanup(task_events.unsubscribe, subscription)
+        task_change_poller.ensure_running()
+        while task_change_poller.floor is None:
+            await asyncio.sleep(0.01)
+        return subscription
+
+    async def next_event(self, subscription):
+        return await asyncio.wait_for(subscription.queue.get(), timeout=5)
+
+    async def test_saved_task_is_streamed(self):
+        subscription = await self.subscribe()
+        self.task.status = 'completed'
+        await sync_to_async(self.task.save)()
+
+        event = await self.next_event(subscription)
+        self.assertEqual(event['type'], 'updated')
+        self.assertEqual((event['task']['id'], event['task']['status']), (self.task.pk, 'completed'))
+
+    async def test_bulk_change_without_an_in_process_publish_is_streamed(self):
+        subscription = await self.subscribe()
+        # What archive_tasks or an admin bulk action in another process leaves behind
+        await sync_to_async(Task.objects.filter(pk=self.task.pk)._raw_delete)('default')
+        await TaskChange.objects.acreate(owner=self.user, task_id=self.task.pk, action='archived')
+
+        event = await self.next_event(subscription)
+        self.assertEqual(event, {'type': 'deleted', 'task': {'id': self.task.pk}})
+
+    async def test_existing_log_entries_are_not_replayed(self):
+        subscription = await self.subscribe()
+        await asyncio.sleep(0.05)
+        self.assertTrue(subscription.queue.empty())
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('archivist', password='pw')
+        self.client.force_login(self.user)
+        self.old = timezone.now() - timedelta(days=200)
+        self.done = self.create_task('completed', self.old)
+        self.recent = self.create_task('completed', timezone.now())
+        self.open = self.create_task('pending', self.old)
+
+    def create_task(self, status, updated_at):
+        task = Task.objects.create(owner=self.user, status=status)
+        Task.objects.filter(pk=task.pk).update(updated_at=updated_at)
+        return task
+
+    def test_archives_only_old_completed_tasks(self):
+        self.assertEqual(archive_tasks(older_than_days=180), 1)
+        self.assertEqual(list(ArchivedTask.objects.values_list('pk', flat=True)), [self.done.pk])
+        self.assertEqual(set(Task.objects.values_list('pk', flat=True)), {self.recent.pk, self.open.pk})
+
+    def test_task_changed_after_the_id_scan_is_not_archived(self):
+        cutoff = timezone.now() - timedelta(days=180)
+        reopened = self.create_task('completed', self.old)
+        # Between the scan and the batch: one task reopened, one edited
+        Task.objects.filter(pk=reopened.pk).update(status='pending')
+        Task.objects.filter(pk=self.done.pk).update(updated_at=timezone.now())
+
+        self.assertEqual(_archive_batch([self.done.pk, reopened.pk], cutoff), 0)
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertEqual(Task.objects.filter(pk__in=[self.done.pk, reopened.pk]).count(), 2)
+
+    def test_tasks_with_archived_lists_both_tables(self):
+        archive_tasks(older_than_days=180)
+        tasks = tasks_with_archived(Task.objects.filter(owner=self.user), ArchivedTask.objects.filter(owner=self.user))
+        self.assertEqual(
+            {(task.pk, task.is_archived) for task in tasks},
+            {(self.done.pk, True), (self.recent.pk, False), (self.open.pk, False)},
+        )
+
+        response = self.client.get(reverse('task_list'), {'include_archived': '1'}, secure=True)
+        self.assertEqual(
+            {task.pk for task in response.context['page_obj']}, {self.done.pk, self.recent.pk, self.open.pk}
+        )
+
+    def test_task_detail_falls_back_to_the_archive(self):
+        archive_tasks(older_than_days=180)
+        response = self.client.get(reverse('task_detail', args=[self.done.pk]), secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_archived'])
+
+        other = User.objects.create_user('someone-else', password='pw')
+        self.client.force_login(other)
+        response = self.client.get(reverse('task_detail', args=[self.done.pk]), secure=True)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SQLITE_PRODUCTION=True)
+@mock.patch('tasks.db.random.uniform', return_value=1.0)
+@mock.patch('tasks.db.time.sleep')
+class RunSerializedTests(TransactionTestCase):
+    """Not a TestCase: run_serialized only retries outside an atomic block"""
+
+    def locked(self):
+        return OperationalError('database is locked')
+
+    def test_retries_a_locked_write_with_exponential_backoff(self, sleep, uniform):
+        write = mock.Mock(side_effect=[self.locked(), self.locked(), 'written'])
+        self.assertEqual(run_serialized(write, 1, key='value'), 'written')
+        self.assertEqual(write.call_count, 3)
+        write.assert_called_with(1, key='value')
+        self.assertEqual(
+            [call.args[0] for call in sleep.call_args_list],
+            [WRITE_BACKOFF_SECONDS * 2, WRITE_BACKOFF_SECONDS * 4],
+        )
+
+    def test_gives_up_after_the_retry_limit(self, sleep, uniform):
+        write = mock.Mock(side_effect=self.locked())
+        with self.assertRaises(OperationalError):
+            run_serialized(write)
+        self.assertEqual(write.call_count, WRITE_RETRIES + 1)
+        self.assertEqual(sleep.call_count, WRITE_RETRIES)
+
+    def test_other_operational_errors_are_not_retried(self, sleep, uniform):
+        write = mock.Mock(side_effect=OperationalError('no such table: tasks_task'))
+        with self.assertRaises(OperationalError):
+            run_serialized(write)
+        self.assertEqual(write.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_inside_an_atomic_block_the_error_is_raised_without_retrying(self, sleep, uniform):
+        write = mock.Mock(side_effect=self.locked())
+        with self.assertRaises(OperationalError), transaction.atomic():
+            run_serialized(write)
+        self.assertEqual(write.call_count, 1)
+        sleep.assert_not_called()
+
+    def test_runs_its_own_transaction(self, sleep, uniform):
+        user = User.objects.create_user('serialized-writer', password='pw')
+
+        def write():
+            self.assertTrue(transaction.get_connection().in_atomic_block)
+            Task.objects.create(owner=user)
+            raise ValueError('roll back')
+
+        with self.assertRaises(ValueError):
+            run_serialized(write)
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(TASK_EMAIL_NOTIFICATIONS=False)
+class TableCountTests(TestCase):
+    """Cached counts stay exact through the set-based paths that skip per-row signals"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('counted', password='pw')
+        refresh_counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tasks = [Task.objects.create(owner=self.user, status='completed') for _ in range(4)]
+            self.assignees = [
+                Assignee.objects.create(name=f'Assignee {n}', email=f'a{n}@example.com', location='Austin')
+                for n in range(3)
+            ]
+
+    def assertCountsMatch(self):
+        counts = get_counts()
+        self.assertEqual(counts['total_all_tasks'], Task.objects.count())
+        self.assertEqual(counts['total_assignees'], Assignee.objects.count())
+        self.assertEqual(counts['total_users'], User.objects.count())
+
+    def test_counts_follow_row_signals(self):
+        self.assertCountsMatch()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tasks[0].delete()
+        self.assertCountsMatch()
+
+    def test_bulk_task_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_delete_tasks(Task.objects.filter(pk__in=[task.pk for task in self.tasks[:2]]), self.user)
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertCountsMatch()
+
+    def test_bulk_assignee_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_delete_assignees(Assignee.objects.filter(pk=self.assignees[0].pk))
+        self.assertEqual(Assignee.objects.count(), 2)
+        self.assertCountsMatch()
+
+    def test_archive_run(self):
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[:3]]).update(
+            updated_at=timezone.now() - timedelta(days=200)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive_tasks(older_than_days=180), 3)
+        self.assertCountsMatch()
+
+    def test_refresh_corrects_drift(self):
+        TableCount.objects.filter(table=Task._meta.db_table).update(count=999, is_exact=False)
+        self.assertEqual(get_counts()['total_all_tasks'], 999)
+        refresh_counts()
+        self.assertCountsMatch()
+        self.assertTrue(get_counts()['counts_exact'])
+
+
+class ApplyOperationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('offline-client', password='pw')
+
+    def test_replayed_key_returns_the_recorded_result(self):
+        operation = {'idempotency_key': 'op-1', 'op': 'create', 'fields': {'description': 'Offline task'}}
+        first, = apply_operations(self.user, [operation])
+        again, = apply_operations(self.user, [operation])
+        self.assertEqual(first['status'], 'applied')
+        self.assertEqual(again, {**first, 'replayed': True})
+        self.assertEqual(Task.objects.filter(owner=self.user).count(), 1)
+
+    def test_integrity_error_without_a_recorded_key_is_an_error_result(self):
+        with mock.patch('tasks.sync._apply_operation', side_effect=IntegrityError):
+            result, = apply_operations(self.user, [{'idempotency_key': 'op-2', 'op': 'create'}])
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(result['idempotency_key'], 'op-2')
+
+
+class FakePool:
+    def __init__(self, **stats):
+        self.stats = stats
+
+    def get_stats(self):
+        return self.stats
+
+
+class FakeConnection:
+    vendor = 'postgresql'
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+
+class DatabasePoolMetricsTests(TestCase):
+    def test_reports_pool_statistics(self):
+        pool = FakePool(
+            pool_min=2, pool_max=10, pool_size=4, pool_available=1, requests_waiting=3,
+            requests_num=8, requests_queued=2, requests_wait_ms=20, requests_errors=1,
+            returns_bad=1, connections_lost=0,
+        )
+        metrics = database_pool_metrics(FakeConnection(pool))
+        self.assertEqual(metrics, {
+            'enabled': True, 'vendor': 'postgresql', 'min_size': 2, 'max_size': 10, 'size': 4,
+            'available': 1, 'waiting': 3, 'requests': 8, 'queued_requests': 2, 'wait_ms_total': 20,
+            'wait_ms_avg': 2.5, 'timeouts': 1, 'bad_connections_returned': 1, 'connections_lost': 0,
+        })
+
+    def test_fresh_pool_has_no_average_wait(self):
+        metrics = database_pool_metrics(FakeConnection(FakePool(pool_min=2, pool_max=10)))
+        self.assertEqual((metrics['requests'], metrics['wait_ms_avg']), (0, 0.0))
+
+    def test_connection_without_pool(self):
+        self.assertEqual(database_pool_metrics(FakeConnection()), {'enabled': False, 'vendor': 'postgresql'})
+
+    def test_collect_metrics_reports_a_failing_provider(self):
+        register('broken_for_test', lambda: 1 / 0)
+        self.addCleanup(_providers.pop, 'broken_for_test')
+        report = collect_metrics()
+        self.assertIn('error', report['broken_for_test'])
+        self.assertIn('database_pool', report)
+
+
+@mock.patch('workflow_system.db_routers.replica_configured', return_value=True)
+@mock.patch('workflow_system.db_routers.replica_available', return_value=True)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Routing decisions of ReplicaRouter and ReplicaPinMiddleware (no replica connection needed)"""
+
+    def request(self, view, **cookies):
+        request = RequestFactory().get('/')
+        request.COOKIES.update(cookies)
+        return ReplicaPinMiddleware(view)(request)
+
+    @staticmethod
+    def reads_from(request):
+        return HttpResponse(router.db_for_read(Task))
+
+    def test_decorated_view_reads_from_the_replica(self, *mocks):
+        response = self.request(read_from_replica(self.reads_from))
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_undecorated_view_reads_from_the_primary(self, *mocks):
+        self.assertEqual(self.request(self.reads_from).content, b'default')
+
+    def test_write_pins_the_client_to_the_primary(self, *mocks):
+        def writes(request):
+            return HttpResponse(router.db_for_write(Task))
+
+        response = self.request(writes)
+        self.assertEqual(response.content, b'default')
+        self.assertGreater(float(response.cookies[PIN_COOKIE_NAME].value), time.time())
+
+    def test_pinned_client_reads_from_the_primary(self, *mocks):
+        response = self.request(read_from_replica(self.reads_from), **{PIN_COOKIE_NAME: str(time.time() + 60)})
+        self.assertEqual(response.content, b'default')
+
+    def test_expired_or_invalid_pin_is_ignored(self, *mocks):
+        for value in (str(time.time() - 1), 'garbage'):
+            response = self.request(read_from_replica(self.reads_from), **{PIN_COOKIE_NAME: value})
+            self.assertEqual(response.content, b'replica')
+
+    def test_session_and_cache_table_writes_do_not_pin(self, *mocks):
+        cache_entry = DatabaseCache('tasks_cache', {}).cache_model_class
+
+        @read_from_replica
+        def view(request):
+            router.db_for_write(Session)
+            router.db_for_write(cache_entry)
+            return HttpResponse(router.db_for_read(cache_entry))
+
+        response = self.request(view)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn(PIN_COOKIE_NAME, response.cookies)
+
+    def test_unavailable_replica_falls_back_to_the_primary(self, available, configured):
+        available.return_value = False
+        self.assertEqual(self.request(read_from_replica(self.reads_from)).content, b'default')
+
+
+@skipUnless(replica_configured(), 'set REPLICA_DATABASE_URL, e.g. sqlite:///replica.sqlite3')
+class ReplicaDatabaseTests(TransactionTestCase):
+    """Queries against a real second alias; run with a replica configured
+
+    Not a TestCase: the replica is a separate connection to the test database
+    and could not read rows inside the primary's open test transaction.
+    """
+    databases = '__all__'
+
+    def setUp(self):
+        # Tests limited to the default alias make the replica look down for a while
+        mock.patch('workflow_system.db_routers._replica_down_until', 0).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_decorated_view_queries_the_replica_and_writes_go_to_the_primary(self):
+        user = User.objects.create_user('replica-reader', password='pw')
+
+        @read_from_replica
+        def view(request):
+            Task.objects.filter(owner=user).count()
+            Task.objects.create(owner=user)
+            return HttpResponse()
+
+        with CaptureQueriesContext(connections[REPLICA_ALIAS]) as replica_queries, \
+                CaptureQueriesContext(connections['default']) as primary_queries:
+            response = ReplicaPinMiddleware(view)(RequestFactory().get('/'))
+
+        self.assertTrue(any('COUNT' in query['sql'] for query in replica_queries))
+        self.assertFalse(any(query['sql'].startswith('INSERT') for query in replica_queries))
+        self.assertTrue(any(query['sql'].startswith('INSERT') for query in primary_queries))
+        self.assertIn(PIN_COOKIE_NAME, response.cookies)
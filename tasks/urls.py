@@ -4,8 +4,12 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
     path('tasks/', views.task_list, name='task_list'),
     path('tasks/create/', views.task_create, name='task_create'),
+    path('tasks/events/', views.task_events_stream, name='task_events'),
+    path('tasks/changes/', views.task_changes, name='task_changes'),
+    path('tasks/sync/', views.task_sync_batch, name='task_sync_batch'),
     path('tasks/<int:pk>/', views.task_detail, name='task_detail'),
     path('tasks/<int:pk>/edit/', views.task_update, name='task_update'),
     path('tasks/<int:pk>/delete/', views.task_delete, name='task_delete'),
@@ -19,6 +23,8 @@ urlpatterns = [
     path('assignees/bulk-upload/', views.bulk_assignee_upload, name='bulk_assignee_upload'),
     path('assignees/get-info/', views.get_assignee_info, name='get_assignee_info'),
     path('admin-panel/', views.admin_panel, name='admin_panel'),
+    path('admin-panel/refresh-counts/', views.refresh_admin_counts, name='refresh_admin_counts'),
+    path('metrics/', views.metrics, name='metrics'),
     
     path('auth/signup/', views.SignUpView.as_view(), name='signup'),
     path('auth/login/', views.CustomLoginView.as_view(), name='login'),
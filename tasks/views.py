@@ -1,17 +1,29 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import views as auth_views, logout as auth_logout, login
+from django.contrib.auth import views as auth_views, alogout, login
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.db.models import Q
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
-from .models import Task, Assignee
+from workflow_system.db_routers import read_from_replica
+from .archive import tasks_with_archived
+from .models import Task, Assignee, ArchivedTask
 from .forms import TaskForm, CustomUserCreationForm, AssigneeForm, BulkAssigneeUploadForm
+from .cache import lookup_assignee, task_stats
+from .counts import get_counts, refresh_counts
+from .db import run_serialized
+from .snapshots import get_snapshot
+from .events import task_change_poller, task_events, format_sse
+from .metrics import collect_metrics
+from .sync import changes_since, apply_operations, CHANGE_FEED_DEFAULT_LIMIT, MAX_BATCH_OPERATIONS
+from asgiref.sync import sync_to_async
+import asyncio
 import csv
 import io
 import json
@@ -41,21 +53,31 @@ class SignUpView(CreateView):
 
 
 @login_required
+@read_from_replica
 def task_list(request):
     """Display user's tasks with search and filter functionality"""
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
+    include_archived = request.GET.get('include_archived') == '1'
     
-    tasks = Task.objects.filter(owner=request.user)
+    filters = Q(owner=request.user)
     
     if search_query:
-        tasks = tasks.filter(
+        filters &= (
             Q(title__icontains=search_query) | 
             Q(description__icontains=search_query)
         )
     
     if status_filter:
-        tasks = tasks.filter(status=status_filter)
+        filters &= Q(status=status_filter)
+    
+    if include_archived:
+        tasks = tasks_with_archived(
+            Task.objects.filter(filters),
+            ArchivedTask.objects.filter(filters),
+        ).order_by('-created_at')
+    else:
+        tasks = Task.objects.filter(filters)
     
     # Pagination
     paginator = Paginator(tasks, 10)
@@ -66,16 +88,22 @@ def task_list(request):
         'page_obj': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
+        'include_archived': include_archived,
         'status_choices': Task.STATUS_CHOICES,
     }
     return render(request, 'tasks/task_list.html', context)
 
 
 @login_required
+@read_from_replica
 def task_detail(request, pk):
-    """Display detailed view of a task"""
-    task = get_object_or_404(Task, pk=pk, owner=request.user)
-    return render(request, 'tasks/task_detail.html', {'task': task})
+    """Display detailed view of a task (live or archived)"""
+    task = Task.objects.filter(pk=pk, owner=request.user).first()
+    if task is not None:
+        return render(request, 'tasks/task_detail.html', {'task': task})
+    
+    task = get_object_or_404(ArchivedTask, pk=pk, owner=request.user)
+    return render(request, 'tasks/task_detail.html', {'task': task, 'is_archived': True})
 
 
 @login_required
@@ -89,7 +117,7 @@ def task_create(request):
             # Set assigned_by to current user if not specified
             if not task.assigned_by:
                 task.assigned_by = request.user
-            task.save()
+            run_serialized(task.save)
             messages.success(request, 'Task created successfully!')
             return redirect('task_list')
     else:
@@ -109,7 +137,7 @@ def task_update(request, pk):
     if request.method == 'POST':
         form = TaskForm(request.POST, instance=task)
         if form.is_valid():
-            form.save()
+            run_serialized(form.save)
             messages.success(request, 'Task updated successfully!')
             return redirect('task_detail', pk=task.pk)
     else:
@@ -128,7 +156,7 @@ def task_delete(request, pk):
     task = get_object_or_404(Task, pk=pk, owner=request.user)
     
     if request.method == 'POST':
-        task.delete()
+        run_serialized(task.delete)
         messages.success(request, 'Task deleted successfully!')
         return redirect('task_list')
     
@@ -137,9 +165,10 @@ def task_delete(request, pk):
 
 @login_required
 @require_POST
-def task_status_update(request, pk):
-    """AJAX endpoint to update task status"""
-    task = get_object_or_404(Task, pk=pk, owner=request.user)
+async def task_status_update(request, pk):
+    """AJAX endpoint to update task status (async, runs on the ASGI event loop)"""
+    user = await request.auser()
+    task = await aget_object_or_404(Task, pk=pk, owner=user)
     
     try:
         data = json.loads(request.body)
@@ -147,7 +176,7 @@ def task_status_update(request, pk):
         
         if new_status in dict(Task.STATUS_CHOICES):
             task.status = new_status
-            task.save()
+            await sync_to_async(run_serialized)(task.save)
             return JsonResponse({
                 'success': True, 
                 'message': 'Status updated successfully'
@@ -164,38 +193,122 @@ def task_status_update(request, pk):
         })
 
 
+SSE_KEEPALIVE_SECONDS = 20
+
+
+async def _task_event_stream(user_id):
+    subscription = task_events.subscribe(user_id)
+    task_change_poller.ensure_running()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment frame keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        task_events.unsubscribe(subscription)
+
+
 @login_required
-def dashboard(request):
-    """User dashboard with task statistics"""
-    user_tasks = Task.objects.filter(owner=request.user)
+async def task_events_stream(request):
+    """Server-Sent Events stream of the user's task create/update/delete events.
+
+    Must be served over ASGI: the async generator parks on the event loop
+    instead of holding a worker thread for the lifetime of the connection.
+    """
+    user = await request.auser()
+    response = StreamingHttpResponse(_task_event_stream(user.pk), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+def task_changes(request):
+    """Incremental change feed: tasks created, updated or deleted since a cursor"""
+    try:
+        cursor = int(request.GET.get('cursor', 0))
+        limit = int(request.GET.get('limit', CHANGE_FEED_DEFAULT_LIMIT))
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': 'cursor and limit must be integers'
+        }, status=400)
     
-    stats = {
-        'total_tasks': user_tasks.count(),
-        'pending_tasks': user_tasks.filter(status='pending').count(),
-        'in_progress_tasks': user_tasks.filter(status='in_progress').count(),
-        'completed_tasks': user_tasks.filter(status='completed').count(),
-    }
+    feed = changes_since(request.user, cursor=cursor, limit=limit)
+    return JsonResponse({'success': True, **feed})
+
+
+@login_required
+@require_POST
+def task_sync_batch(request):
+    """Apply a queued batch of offline task operations in one round trip"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid JSON data'
+        }, status=400)
+    
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not all(isinstance(op, dict) for op in operations):
+        return JsonResponse({
+            'success': False,
+            'message': 'operations must be a list of objects'
+        }, status=400)
     
-    recent_tasks = user_tasks[:5]
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return JsonResponse({
+            'success': False,
+            'message': f'At most {MAX_BATCH_OPERATIONS} operations per batch'
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'results': run_serialized(apply_operations, request.user, operations)
+    })
+
+
+@login_required
+@read_from_replica
+def dashboard(request):
+    """User dashboard with task statistics (read from the precomputed snapshot)"""
+    snapshot = get_snapshot(request.user.pk)
     
     context = {
-        'stats': stats,
-        'recent_tasks': recent_tasks,
+        'stats': snapshot['stats'],
+        'recent_tasks': snapshot['recent_tasks'],
     }
     
     # Add admin-specific data
     if request.user.is_staff or request.user.is_superuser:
-        context['admin_stats'] = {
-            'total_assignees': Assignee.objects.count(),
-            'total_users': User.objects.count(),
-            'total_all_tasks': Task.objects.count(),
-        }
+        context['admin_stats'] = get_counts()
     
     return render(request, 'tasks/dashboard.html', context)
 
 
+@login_required
+async def dashboard_stats(request):
+    """AJAX endpoint returning the dashboard statistics as JSON (async)"""
+    user = await request.auser()
+    snapshot = await sync_to_async(get_snapshot)(user.pk)
+    
+    data = {'success': True, 'stats': snapshot['stats'], 'computed_at': snapshot['computed_at']}
+    if user.is_staff or user.is_superuser:
+        data['admin_stats'] = await sync_to_async(get_counts)()
+        data['global_stats'] = await sync_to_async(task_stats)()
+    
+    return JsonResponse(data)
+
+
 # Assignee Management Views
 @login_required
+@read_from_replica
 def assignee_list(request):
     """Display list of all assignees"""
     assignees = Assignee.objects.all()
@@ -212,7 +325,7 @@ def assignee_create(request):
     if request.method == 'POST':
         form = AssigneeForm(request.POST)
         if form.is_valid():
-            form.save()
+            run_serialized(form.save)
             messages.success(request, 'Assignee created successfully!')
             return redirect('assignee_list')
     else:
@@ -232,7 +345,7 @@ def assignee_update(request, pk):
     if request.method == 'POST':
         form = AssigneeForm(request.POST, instance=assignee)
         if form.is_valid():
-            form.save()
+            run_serialized(form.save)
             messages.success(request, 'Assignee updated successfully!')
             return redirect('assignee_list')
     else:
@@ -251,7 +364,7 @@ def assignee_delete(request, pk):
     assignee = get_object_or_404(Assignee, pk=pk)
     
     if request.method == 'POST':
-        assignee.delete()
+        run_serialized(assignee.delete)
         messages.success(request, 'Assignee deleted successfully!')
         return redirect('assignee_list')
     
@@ -290,7 +403,8 @@ def bulk_assignee_upload(request):
                             continue
                         
                         # Create new assignee
-                        Assignee.objects.create(
+                        run_serialized(
+                            Assignee.objects.create,
                             name=row['Name'].strip(),
                             email=row['Email'].strip(),
                             location=row['Location'].strip()
@@ -325,21 +439,20 @@ def bulk_assignee_upload(request):
 
 
 @login_required
-def get_assignee_info(request):
-    """AJAX endpoint to get assignee information for auto-population"""
+async def get_assignee_info(request):
+    """AJAX endpoint to get assignee information for auto-population (async)"""
     assignee_name = request.GET.get('name')
-    try:
-        assignee = Assignee.objects.get(name=assignee_name)
-        return JsonResponse({
-            'success': True,
-            'email': assignee.email,
-            'location': assignee.location
-        })
-    except Assignee.DoesNotExist:
+    assignee = await sync_to_async(lookup_assignee)(assignee_name)
+    if assignee is None:
         return JsonResponse({
             'success': False,
             'message': 'Assignee not found'
         })
+    return JsonResponse({
+        'success': True,
+        'email': assignee['email'],
+        'location': assignee['location']
+    })
 
 
 # Custom login view with signup link
@@ -353,15 +466,17 @@ class CustomLoginView(auth_views.LoginView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['show_signup'] = True
+        context['social_providers'] = settings.SSO_SOCIAL_PROVIDERS
         return context
 
 
 @csrf_exempt
 @require_POST
-def auto_logout(request):
-    """Handle auto-logout when browser is closed"""
-    if request.user.is_authenticated:
-        auth_logout(request)
+async def auto_logout(request):
+    """Handle auto-logout when browser is closed (async)"""
+    user = await request.auser()
+    if user.is_authenticated:
+        await alogout(request)
     return JsonResponse({'status': 'logged_out'})
 
 
@@ -372,12 +487,8 @@ def admin_panel(request):
         messages.error(request, "Access denied. Admin privileges required.")
         return redirect('dashboard')
     
-    # Get admin statistics
-    admin_stats = {
-        'total_assignees': Assignee.objects.count(),
-        'total_users': User.objects.count(),
-        'total_all_tasks': Task.objects.count(),
-    }
+    # Get admin statistics (cached counts, constant time regardless of table size)
+    admin_stats = get_counts()
     
     # Get user's personal task stats
     stats = {
@@ -387,6 +498,32 @@ def admin_panel(request):
     context = {
         'admin_stats': admin_stats,
         'stats': stats,
+        'global_stats': task_stats(),
     }
     
-    return render(request, 'tasks/admin_panel.html', context)
\ No newline at end of file
+    return render(request, 'tasks/admin_panel.html', context)
+
+
+@login_required
+def metrics(request):
+    """Staff-only JSON report of application metrics (connection pool, streams, ...)"""
+    if not (request.user.is_staff or request.user.is_superuser):
+        return JsonResponse({
+            'success': False,
+            'message': 'Admin privileges required'
+        }, status=403)
+    
+    return JsonResponse({'success': True, 'metrics': collect_metrics()})
+
+
+@login_required
+@require_POST
+def refresh_admin_counts(request):
+    """Recount the global totals exactly (staff 'refresh' button on the admin panel)"""
+    if not (request.user.is_staff or request.user.is_superuser):
+        messages.error(request, "Access denied. Admin privileges required.")
+        return redirect('dashboard')
+    
+    refresh_counts(exact=True)
+    messages.success(request, 'Statistics recounted.')
+    return redirect('admin_panel')
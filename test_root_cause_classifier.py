@@ -0,0 +1,116 @@
+# Tests for root_cause_classifier.py's parallel relabelling
+#
+# The incident store is a throwaway SQLite file, selected before the
+# dashboard module is imported.
+#
+# Usage:
+#   python -m unittest test_root_cause_classifier
+
+import copy
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+_db_dir = tempfile.mkdtemp(prefix="root-cause-classifier-test-")
+os.environ.setdefault("AUTOSYS_DATABASE_URL", f"sqlite:///{os.path.join(_db_dir, 'incidents.db')}")
+
+import autosys_incident_dashboard as dashboard
+import root_cause_classifier
+from autosys_incident_dashboard import (
+    AutosysIncident, IncidentPattern, SampleDataGenerator, SessionLocal, SyncState, verify_patterns,
+)
+from root_cause_classifier import DEFAULT_RULES, RootCauseClassifier, get_classifier, reclassify_all
+
+
+def renamed_rules(count=4):
+    """DEFAULT_RULES with the first root causes renamed, so their incidents need relabelling"""
+    rules = copy.deepcopy(DEFAULT_RULES)
+    for rule in rules["root_cause"][:count]:
+        rule["root_cause"] += " (renamed)"
+    return rules
+
+
+class ReclassifyAllTests(unittest.TestCase):
+    incidents = 400
+
+    @classmethod
+    def setUpClass(cls):
+        # Worker processes take the database from the environment; keep it the one
+        # this process imported with, whichever test module set it first
+        os.environ["AUTOSYS_DATABASE_URL"] = dashboard.DATABASE_URL
+
+    def setUp(self):
+        db = SessionLocal()
+        for model in (AutosysIncident, IncidentPattern, SyncState):
+            db.query(model).delete()
+        db.commit()
+        SampleDataGenerator(db, seed=7).generate_sample_data(self.incidents)
+        db.close()
+        # Start from labels and a stored fingerprint for the default rules
+        reclassify_all(rules=DEFAULT_RULES, workers=1, chunk_size=100, force=True)
+
+    def labels(self):
+        db = SessionLocal()
+        try:
+            return {row.id: row for row in db.query(
+                AutosysIncident.id, AutosysIncident.short_description, AutosysIncident.description,
+                AutosysIncident.work_notes, AutosysIncident.root_cause, AutosysIncident.root_cause_category,
+                AutosysIncident.issue_type,
+            )}
+        finally:
+            db.close()
+
+    def test_relabels_every_incident_and_keeps_patterns_consistent(self):
+        rules = renamed_rules()
+        stale = get_classifier()
+        result = reclassify_all(rules=rules, workers=1, chunk_size=100)
+
+        self.assertEqual(result["records"], self.incidents)
+        self.assertGreater(result["changed"], 0)
+        self.assertEqual(result["superseded"], 0)
+        classifier = RootCauseClassifier(rules)
+        for row in self.labels().values():
+            labels = classifier.classify(row.short_description, row.description, row.work_notes)[0]
+            self.assertEqual(labels["root_cause"], row.root_cause)
+            self.assertEqual(labels["issue_type"], row.issue_type)
+        self.assertTrue(verify_patterns()["consistent"])
+        self.assertIsNot(get_classifier(), stale)
+
+        self.assertTrue(reclassify_all(rules=rules, workers=1)["skipped"])
+
+    def test_incidents_changed_while_relabelling_are_not_overwritten(self):
+        rules = renamed_rules()
+        edits = []
+        as_completed = root_cause_classifier.as_completed
+
+        def edit_before_writing(futures):
+            # Another writer changes incidents after the worker read them and
+            # before the parent writes its labels
+            for future in as_completed(futures):
+                changed = future.result()[0]
+                if len(changed) >= 2 and not edits:
+                    text_edited, label_edited = changed[0]["id"], changed[1]["id"]
+                    table = AutosysIncident.__table__
+                    with dashboard.engine.begin() as conn:
+                        conn.execute(table.update().where(table.c.id == text_edited)
+                                     .values(short_description="Edited while relabelling"))
+                        conn.execute(table.update().where(table.c.id == label_edited)
+                                     .values(root_cause="Set By Sync"))
+                    edits.extend([text_edited, label_edited])
+                yield future
+
+        with mock.patch.object(root_cause_classifier, "as_completed", edit_before_writing):
+            result = reclassify_all(rules=rules, workers=1, chunk_size=100)
+
+        self.assertEqual(len(edits), 2)
+        self.assertEqual(result["superseded"], 2)
+        rows = self.labels()
+        text_edited, label_edited = edits
+        self.assertEqual(rows[text_edited].short_description, "Edited while relabelling")
+        self.assertNotIn("(renamed)", rows[text_edited].root_cause)
+        self.assertEqual(rows[label_edited].root_cause, "Set By Sync")
+
+
+if __name__ == "__main__":
+    unittest.main()
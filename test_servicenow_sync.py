@@ -0,0 +1,185 @@
+# Tests for servicenow_sync.py against the local mock Table API (mock_servicenow.py)
+#
+# The incident store is a throwaway SQLite file, selected before the
+# dashboard module is imported.
+#
+# Usage:
+#   python -m unittest test_servicenow_sync
+
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+_db_dir = tempfile.mkdtemp(prefix="servicenow-sync-test-")
+os.environ["AUTOSYS_DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'incidents.db')}"
+
+import mock_servicenow
+from autosys_incident_dashboard import (
+    AsyncSessionLocal, AutosysIncident, IncidentPattern, SampleDataGenerator, SessionLocal, SyncState,
+    bump_data_version, clear_sample_data,
+)
+from servicenow_sync import ServiceNowBackfill, ServiceNowClient, ServiceNowSync, parse_job_and_server
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+
+class ServiceNowSyncTests(unittest.TestCase):
+    incidents = 300
+    page_size = 25
+
+    def setUp(self):
+        db = SessionLocal()
+        for model in (AutosysIncident, IncidentPattern, SyncState):
+            db.query(model).delete()
+        db.commit()
+        db.close()
+        bump_data_version()
+
+    def serve(self, **options):
+        server = mock_servicenow.serve(port=0, incidents=self.incidents, days=30, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        instance = f"http://127.0.0.1:{server.server_address[1]}"
+        return ServiceNowClient(instance, "admin", "admin", page_size=self.page_size)
+
+    def stored(self):
+        db = SessionLocal()
+        try:
+            return {number: description for number, description in
+                    db.query(AutosysIncident.incident_number, AutosysIncident.short_description)}
+        finally:
+            db.close()
+
+    def numbers_updated_before(self, end):
+        bound = end.strftime(mock_servicenow.DATETIME_FORMAT)
+        return {record["number"]["value"] for record in mock_servicenow.Handler.incidents
+                if record["sys_updated_on"]["value"] < bound}
+
+    def test_initial_sync_stores_every_record_and_saves_the_watermark(self):
+        client = self.serve()
+        result = ServiceNowSync(client, lag_seconds=0).run_once()
+
+        expected = self.numbers_updated_before(datetime.fromisoformat(result["watermark"]))
+        self.assertEqual(result["synced"], len(expected))
+        self.assertEqual(set(self.stored()), expected)
+        db = SessionLocal()
+        state = db.query(SyncState).filter(SyncState.name == "servicenow_incidents").one()
+        self.assertEqual(state.watermark.isoformat(), result["watermark"])
+        db.close()
+
+    def test_incremental_sync_fetches_only_records_updated_since_the_watermark(self):
+        client = self.serve()
+        first = ServiceNowSync(client, lag_seconds=10 * 86400).run_once()
+        watermark = datetime.fromisoformat(first["watermark"])
+        self.assertEqual(set(self.stored()), self.numbers_updated_before(watermark))
+
+        self.assertEqual(ServiceNowSync(client, lag_seconds=10 * 86400).run_once()["synced"], 0)
+
+        # An already-synced incident edited after the watermark comes back with the new text
+        edited = mock_servicenow.touch(sorted(self.stored())[0], utcnow() - timedelta(days=1))
+        edited["short_description"] = mock_servicenow.field("Autosys job EDITED_JOB failed on etl-server-01")
+
+        second = ServiceNowSync(client, lag_seconds=0).run_once()
+        end = datetime.fromisoformat(second["watermark"])
+        self.assertEqual(second["synced"], len(self.numbers_updated_before(end) - self.numbers_updated_before(watermark)))
+        stored = self.stored()
+        self.assertEqual(set(stored), self.numbers_updated_before(end))
+        self.assertEqual(stored[edited["number"]["value"]], "Autosys job EDITED_JOB failed on etl-server-01")
+
+    def test_record_updated_during_paging_does_not_hide_later_records(self):
+        client = self.serve()
+        fetch_page = client.fetch_page
+        pages = []
+
+        def fetch_and_edit(start, end, after=None):
+            page = fetch_page(start, end, after)
+            if not pages:
+                # Edit a record already fetched: it leaves the window while the walk goes on
+                mock_servicenow.touch(page[0]["number"]["value"], utcnow())
+            pages.append(page)
+            return page
+
+        client.fetch_page = fetch_and_edit
+        result = ServiceNowSync(client, lag_seconds=60).run_once()
+
+        edited = pages[0][0]["number"]["value"]
+        expected = self.numbers_updated_before(datetime.fromisoformat(result["watermark"])) | {edited}
+        self.assertGreater(len(pages), 2)
+        self.assertEqual(set(self.stored()), expected)
+        self.assertEqual(result["synced"], len(expected))
+
+    def test_throttled_requests_are_retried(self):
+        client = self.serve(rate_limit=2)
+        result = ServiceNowSync(client, lag_seconds=0).run_once()
+
+        expected = self.numbers_updated_before(datetime.fromisoformat(result["watermark"]))
+        self.assertGreater(mock_servicenow.Handler.throttled_count, 0)
+        self.assertEqual(set(self.stored()), expected)
+
+    def test_backfill_without_until_resumes_on_rerun(self):
+        client = self.serve()
+        since = utcnow() - timedelta(days=31)
+        first = ServiceNowBackfill(client, since, window=timedelta(days=5), workers=2).run()
+        self.assertTrue(first["complete"])
+        self.assertEqual(first["windows_fetched"], 7)
+
+        again = ServiceNowBackfill(client, since, window=timedelta(days=5), workers=2).run()
+        self.assertTrue(again["complete"])
+        self.assertEqual(again["windows_fetched"], 0)
+        with self.assertRaises(ValueError):
+            ServiceNowBackfill(client, since, utcnow(), window=timedelta(days=5)).run()
+
+    def test_sync_after_clearing_the_data_imports_everything_again(self):
+        client = self.serve()
+        first = ServiceNowSync(client, lag_seconds=0).run_once()
+
+        db = SessionLocal()
+        SampleDataGenerator(db).clear_all_data()
+        db.close()
+        self.assertEqual(self.stored(), {})
+        second = ServiceNowSync(client, lag_seconds=0).run_once()
+        self.assertGreaterEqual(second["synced"], first["synced"])
+        self.assertEqual(set(self.stored()), self.numbers_updated_before(datetime.fromisoformat(second["watermark"])))
+
+    def test_clear_endpoint_resets_sync_progress(self):
+        client = self.serve()
+        ServiceNowSync(client, lag_seconds=0).run_once()
+
+        async def clear():
+            async with AsyncSessionLocal() as db:
+                return await clear_sample_data(db)
+
+        asyncio.run(clear())
+        db = SessionLocal()
+        self.assertEqual(db.query(SyncState).count(), 0)
+        db.close()
+        self.assertEqual(set(self.stored()), set())
+        ServiceNowSync(client, lag_seconds=0).run_once()
+        self.assertTrue(self.stored())
+
+
+class ParseJobAndServerTests(unittest.TestCase):
+    def test_job_and_server_from_short_description(self):
+        self.assertEqual(parse_job_and_server("Autosys job ETL_DAILY_LOAD failed on autosys-prod-01"),
+                         ("ETL_DAILY_LOAD", "autosys-prod-01"))
+
+    def test_labelled_forms(self):
+        self.assertEqual(parse_job_and_server("job_name=batch_reconciliation host=ETL-Server-01"),
+                         ("BATCH_RECONCILIATION", "etl-server-01"))
+        self.assertEqual(parse_job_and_server("AutoSys JOB: DATA_EXPORT_JOB on machine batch-server-03 terminated"),
+                         ("DATA_EXPORT_JOB", "batch-server-03"))
+
+    def test_values_are_taken_from_the_first_text_that_has_them(self):
+        self.assertEqual(parse_job_and_server(None, "Job BACKUP_DAILY failed", "rerun on server autosys-prod-02"),
+                         ("BACKUP_DAILY", "autosys-prod-02"))
+
+    def test_missing_values(self):
+        self.assertEqual(parse_job_and_server("Disk full", None, ""), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Read-replica routing for read-heavy views.
+
+Views decorated with ``read_from_replica`` send their queries to the
+``replica`` database (configured by REPLICA_DATABASE_URL); everything else,
+including all writes, stays on ``default``. A client that wrote recently is
+pinned to the primary for REPLICA_PIN_SECONDS, so it reads its own writes.
+If the replica cannot be reached it is skipped for REPLICA_RETRY_SECONDS.
+"""
+import contextvars
+import functools
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE_NAME = 'primary_pin'
+
+# Writes to these apps don't pin a client: the session is saved on every
+# request, and with CACHE_BACKEND=db so is the cache table
+UNPINNED_APPS = {'sessions', 'django_cache'}
+# Always read from the primary: a lagging cache table would serve entries
+# that were already invalidated there
+PRIMARY_ONLY_APPS = {'django_cache'}
+
+# Per-request routing state: {'pinned': bool, 'wrote': bool, 'read_db': alias or None}
+_request_state = contextvars.ContextVar('db_routing_state', default=None)
+
+_replica_down_until = 0.0
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def replica_available():
+    """True if the replica accepts connections; failures are remembered for a while"""
+    global _replica_down_until
+    if not replica_configured() or time.monotonic() < _replica_down_until:
+        return False
+    try:
+        connections[REPLICA_ALIAS].ensure_connection()
+        return True
+    except Exception as e:
+        _replica_down_until = time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+        logger.warning(f"Read replica unavailable, falling back to primary: {str(e)}")
+        return False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return state['read_db']
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None and model._meta.app_label not in UNPINNED_APPS:
+            state['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def _use_replica(state):
+    if state is not None and not state['pinned'] and replica_available():
+        state['read_db'] = REPLICA_ALIAS
+
+
+def read_from_replica(view_func):
+    """Route the view's reads to the replica unless the client is pinned"""
+    if iscoroutinefunction(view_func):
+        async def _wrapper(request, *args, **kwargs):
+            state = _request_state.get()
+            await sync_to_async(_use_replica)(state)
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                if state is not None:
+                    state['read_db'] = None
+        markcoroutinefunction(_wrapper)
+    else:
+        def _wrapper(request, *args, **kwargs):
+            state = _request_state.get()
+            _use_replica(state)
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                if state is not None:
+                    state['read_db'] = None
+
+    return functools.wraps(view_func)(_wrapper)
+
+
+@sync_and_async_middleware
+def ReplicaPinMiddleware(get_response):
+    """Track writes per request and pin the client to the primary afterwards"""
+
+    def start(request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE_NAME, 0))
+        except ValueError:
+            pinned_until = 0
+        state = {'pinned': pinned_until > time.time(), 'wrote': False, 'read_db': None}
+        return state, _request_state.set(state)
+
+    def finish(state, token, response):
+        _request_state.reset(token)
+        if state['wrote']:
+            pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+            response.set_cookie(
+                PIN_COOKIE_NAME,
+                str(time.time() + pin_seconds),
+                max_age=pin_seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if not replica_configured():
+                return await get_response(request)
+            state, token = start(request)
+            response = await get_response(request)
+            return finish(state, token, response)
+    else:
+        def middleware(request):
+            if not replica_configured():
+                return get_response(request)
+            state, token = start(request)
+            response = get_response(request)
+            return finish(state, token, response)
+
+    return middleware
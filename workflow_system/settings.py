@@ -30,6 +30,20 @@ DEBUG = os.environ.get('DEBUG', 'False').lower() == 'true'
 ALLOWED_HOSTS = ['127.0.0.1', 'localhost', '.herokuapp.com']
 
 
+# Authentication feature flags. Only enabled providers are installed, so a
+# deployment using e.g. just Google or plain passwords doesn't import, run
+# middleware for or route to the others (measure with
+# `manage.py profile_startup`). Everything is enabled by default.
+SSO_SOCIAL_PROVIDERS = [
+    provider.strip()
+    for provider in os.environ.get('SSO_SOCIAL_PROVIDERS', 'google,github,microsoft,linkedin_oauth2').split(',')
+    if provider.strip()
+]
+SSO_ALLAUTH_ENABLED = bool(SSO_SOCIAL_PROVIDERS)
+SSO_OAUTH2_PROVIDER_ENABLED = os.environ.get('SSO_OAUTH2_PROVIDER', 'True').lower() == 'true'
+SSO_SAML_ENABLED = os.environ.get('SSO_SAML', 'True').lower() == 'true'
+
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -43,32 +57,34 @@ INSTALLED_APPS = [
     
     # Production packages
     'corsheaders',
-    
-    # SSO Authentication Apps
-    'allauth',
-    'allauth.account',
-    'allauth.socialaccount',
-    'allauth.socialaccount.providers.google',
-    'allauth.socialaccount.providers.github',
-    'allauth.socialaccount.providers.microsoft',
-    'allauth.socialaccount.providers.linkedin_oauth2',
-    'oauth2_provider',
-    'djangosaml2',
-    
-    # Main Application
-    'tasks',
 ]
 
+# SSO Authentication Apps
+if SSO_ALLAUTH_ENABLED:
+    INSTALLED_APPS += [
+        'allauth',
+        'allauth.account',
+        'allauth.socialaccount',
+    ] + [f'allauth.socialaccount.providers.{provider}' for provider in SSO_SOCIAL_PROVIDERS]
+if SSO_OAUTH2_PROVIDER_ENABLED:
+    INSTALLED_APPS.append('oauth2_provider')
+if SSO_SAML_ENABLED:
+    INSTALLED_APPS.append('djangosaml2')
+
+# Main Application
+INSTALLED_APPS.append('tasks')
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'workflow_system.db_routers.ReplicaPinMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'oauth2_provider.middleware.OAuth2TokenMiddleware',
+    *(['oauth2_provider.middleware.OAuth2TokenMiddleware'] if SSO_OAUTH2_PROVIDER_ENABLED else []),
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'allauth.account.middleware.AccountMiddleware',
+    *(['allauth.account.middleware.AccountMiddleware'] if SSO_ALLAUTH_ENABLED else []),
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -104,9 +120,108 @@ DATABASES = {
     }
 }
 
+# Connection pool for PostgreSQL (psycopg 3 pool, managed by Django).
+# Pooled connections are health-checked (pre-pinged) on checkout.
+DATABASE_POOL = os.environ.get('DATABASE_POOL', 'False').lower() == 'true'
+DATABASE_POOL_MIN_SIZE = int(os.environ.get('DATABASE_POOL_MIN_SIZE', '2'))
+DATABASE_POOL_MAX_SIZE = int(os.environ.get('DATABASE_POOL_MAX_SIZE', '10'))
+DATABASE_POOL_TIMEOUT = float(os.environ.get('DATABASE_POOL_TIMEOUT', '10'))  # seconds to wait for a connection
+
 # Override with Heroku PostgreSQL if DATABASE_URL is available
 if 'DATABASE_URL' in os.environ:
-    DATABASES['default'] = dj_database_url.parse(os.environ['DATABASE_URL'], conn_max_age=600)
+    DATABASES['default'] = dj_database_url.parse(
+        os.environ['DATABASE_URL'],
+        conn_max_age=0 if DATABASE_POOL else 600,  # pooling replaces persistent connections
+        conn_health_checks=True,
+    )
+    if DATABASE_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': DATABASE_POOL_MIN_SIZE,
+            'max_size': DATABASE_POOL_MAX_SIZE,
+            'timeout': DATABASE_POOL_TIMEOUT,
+        }
+
+# Production-grade SQLite for small single-server deployments running several
+# gunicorn workers: WAL lets readers proceed during a write, the busy timeout
+# queues writers instead of failing with "database is locked", and IMMEDIATE
+# transactions take the write lock up front. Writes in the tasks app also go
+# through tasks.db.run_serialized, which retries on lock errors.
+SQLITE_PRODUCTION = os.environ.get('SQLITE_PRODUCTION', 'False').lower() == 'true'
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', '20'))  # seconds
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)))  # bytes
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', '20000'))
+
+if SQLITE_PRODUCTION and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'timeout': SQLITE_BUSY_TIMEOUT,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            f'PRAGMA mmap_size={SQLITE_MMAP_SIZE};'
+            f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB};'
+            'PRAGMA temp_store=MEMORY;'
+        ),
+    })
+
+# Optional read replica for the read-only views (see workflow_system/db_routers.py).
+# Clients are pinned to the primary for REPLICA_PIN_SECONDS after they write.
+REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+REPLICA_RETRY_SECONDS = int(os.environ.get('REPLICA_RETRY_SECONDS', '30'))
+
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=DATABASES['default'].get('CONN_MAX_AGE', 0),
+        conn_health_checks=True,
+        test_options={'MIRROR': 'default'},
+    )
+    if 'pool' in DATABASES['default'].get('OPTIONS', {}) and DATABASES['replica']['ENGINE'] == 'django.db.backends.postgresql':
+        DATABASES['replica'].setdefault('OPTIONS', {})['pool'] = dict(DATABASES['default']['OPTIONS']['pool'])
+
+DATABASE_ROUTERS = ['workflow_system.db_routers.ReplicaRouter']
+
+# Shared cache (L2 behind the tasks app's in-process L1, see tasks/cache.py).
+# REDIS_URL selects Redis (needs the redis package); otherwise CACHE_BACKEND
+# picks 'file' (default, shared by all workers on one host) or 'db'
+# (run `manage.py createcachetable` first).
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'file')
+CACHE_TIMEOUT = int(os.environ.get('CACHE_TIMEOUT', '300'))
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'TIMEOUT': CACHE_TIMEOUT,
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'tasks_cache',
+            'TIMEOUT': CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', '/tmp/workflow_system_cache'),
+            'TIMEOUT': CACHE_TIMEOUT,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# In-process L1 in front of the shared cache: bounded LRU whose entries
+# expire after TASK_CACHE_L1_TTL seconds, which also bounds how long another
+# worker's invalidation can go unnoticed
+TASK_CACHE_L1_MAX_ENTRIES = int(os.environ.get('TASK_CACHE_L1_MAX_ENTRIES', '1024'))
+TASK_CACHE_L1_TTL = float(os.environ.get('TASK_CACHE_L1_TTL', '5'))
 
 
 # Password validation
@@ -174,11 +289,11 @@ SITE_ID = 1
 # =============================================================================
 
 # Django-allauth Configuration (Social Authentication)
-AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
-    'allauth.account.auth_backends.AuthenticationBackend',
-    'oauth2_provider.backends.OAuth2Backend',
-]
+AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+if SSO_ALLAUTH_ENABLED:
+    AUTHENTICATION_BACKENDS.append('allauth.account.auth_backends.AuthenticationBackend')
+if SSO_OAUTH2_PROVIDER_ENABLED:
+    AUTHENTICATION_BACKENDS.append('oauth2_provider.backends.OAuth2Backend')
 
 # Account settings
 ACCOUNT_EMAIL_REQUIRED = True
@@ -319,6 +434,32 @@ SERVER_EMAIL = 'sbvwsdmn@gmail.com'
 # Email settings for task notifications
 TASK_EMAIL_NOTIFICATIONS = True
 
+# Completed/cancelled tasks untouched for this many days are moved to the
+# archive table by `manage.py archive_tasks` (run it from a scheduler)
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get('TASK_ARCHIVE_AFTER_DAYS', '180'))
+TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get('TASK_ARCHIVE_BATCH_SIZE', '500'))
+
+# Dashboards read precomputed snapshots refreshed by
+# `manage.py refresh_dashboard_snapshots --interval N` (the Procfile worker);
+# a snapshot older than this many seconds is recomputed on read instead
+DASHBOARD_SNAPSHOT_MAX_AGE = int(os.environ.get('DASHBOARD_SNAPSHOT_MAX_AGE', '300'))
+
+# The offline sync feed only hands out change log entries at least this many
+# seconds old: ids are allocated at insert, not commit, so a slower
+# transaction can still commit an id below a cursor a client already holds.
+# Keep it above the longest transaction that writes tasks.
+SYNC_FEED_SAFETY_LAG = float(os.environ.get('SYNC_FEED_SAFETY_LAG', '10'))
+
+# Seconds between reads of the change log behind the live task streams
+# (one query per process while any stream is open)
+TASK_EVENTS_POLL_INTERVAL = float(os.environ.get('TASK_EVENTS_POLL_INTERVAL', '1'))
+
+# Large-table mode for the Task admin changelist: no full result count,
+# estimated pagination totals, full-text search (PostgreSQL) and no facets
+TASK_ADMIN_SCALABLE = os.environ.get('TASK_ADMIN_SCALABLE', 'False').lower() == 'true'
+# Seconds to cache the distinct values behind admin filter sidebars
+TASK_ADMIN_FILTER_CACHE_SECONDS = int(os.environ.get('TASK_ADMIN_FILTER_CACHE_SECONDS', '300'))
+
 # Production security settings
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
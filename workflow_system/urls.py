@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
@@ -35,8 +36,12 @@ urlpatterns = [
         template_name='registration/password_change_done.html'
     ), name='password_change_done'),
     
-    # SSO Authentication URLs
-    path('accounts/', include('allauth.urls')),  # Social authentication
-    path('oauth/', include('oauth2_provider.urls', namespace='oauth2_provider')),  # OAuth2
-    path('saml2/', include('djangosaml2.urls')),  # SAML SSO
 ]
+
+# SSO Authentication URLs (only for the providers enabled in settings)
+if settings.SSO_ALLAUTH_ENABLED:
+    urlpatterns.append(path('accounts/', include('allauth.urls')))  # Social authentication
+if settings.SSO_OAUTH2_PROVIDER_ENABLED:
+    urlpatterns.append(path('oauth/', include('oauth2_provider.urls', namespace='oauth2_provider')))  # OAuth2
+if settings.SSO_SAML_ENABLED:
+    urlpatterns.append(path('saml2/', include('djangosaml2.urls')))  # SAML SSO